@@ -0,0 +1,81 @@
+"""Generate a batch of stories, one per random seed, on a pool of worker processes.
+
+The rules and lexical expressions are parsed once, by the parent process, and handed to each worker, which
+reuses them for every story it generates. Where the fork start method is available, the workers inherit the
+compiled rules as they are; otherwise, the rules reach them pickled along with their analysis, and each worker
+only compiles them (see Compiler.compile_rules()). Since each story is generated from a fresh universe with a
+random-number generator seeded by its own seed, the report for a given seed does not depend on the number of
+workers. Run from the repository root:
+
+    python batch.py --seeds 0 1000 --workers 8
+"""
+import os
+import time
+import argparse
+import multiprocessing
+import config
+from compiler import Compiler
+from messy import MESSY
+
+
+# The rules and lexical expressions used by this worker process, which are set by _initialize_worker()
+_rules = None
+_lexical_expressions = None
+
+
+def _initialize_worker(rules, lexical_expressions):
+    """Take on the procedural content parsed by the parent process, compiling the rules if they arrived pickled."""
+    global _rules, _lexical_expressions
+    if any(rule.triggered is None for rule in rules):
+        Compiler.compile_rules(rule_objects=rules, settings=config.Settings(verbosity=0))
+    _rules = rules
+    _lexical_expressions = lexical_expressions
+
+
+def generate_story(seed):
+    """Simulate a universe with the given random seed and return the seed and the text of its report."""
+    settings = config.Settings(verbosity=0, output_to_file=False, random_seed=seed)
+    messy = MESSY(settings=settings, rules=_rules, lexical_expressions=_lexical_expressions)
+    for _ in range(settings.number_of_time_frames):
+        messy.simulate()
+    messy.terminate()
+    return seed, messy.monitor.render(universe=messy.universe)
+
+
+def generate_stories(seeds, number_of_workers):
+    """Generate a story for each of the given seeds, yielding (seed, report) pairs in the order of the seeds."""
+    settings = config.Settings(verbosity=0)
+    rules = Compiler.parse_rules_file(path_to_rules_file=settings.path_to_rules_file, settings=settings)
+    lexical_expressions = Compiler.parse_lexical_expressions_file(
+        path_to_lexical_expressions_file=settings.path_to_lexical_expressions_file,
+        settings=settings
+    )
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+    with multiprocessing.get_context(start_method).Pool(
+        processes=number_of_workers,
+        initializer=_initialize_worker,
+        initargs=(rules, lexical_expressions)
+    ) as pool:
+        yield from pool.imap(generate_story, seeds, chunksize=max(1, len(seeds) // (4 * number_of_workers)))
+
+
+def main():
+    """Generate the stories for the given range of seeds and write a report for each one."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seeds', type=int, nargs=2, metavar=('FIRST', 'STOP'), default=[0, 100])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--reports-directory', default='reports')
+    args = parser.parse_args()
+    seeds = range(*args.seeds)
+    timestamp = int(time.time())
+    start_time = time.perf_counter()
+    for seed, report in generate_stories(seeds=seeds, number_of_workers=args.workers):
+        filename = os.path.join(args.reports_directory, f"report-{timestamp}-{seed}.txt")
+        with open(filename, "w") as report_file:
+            report_file.write(report)
+    elapsed_time = time.perf_counter() - start_time
+    print(f"Generated {len(seeds)} stories in {elapsed_time:.1f}s ({len(seeds) / elapsed_time:.1f} stories/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure the memory allocated per simulated time frame, as a function of cast size.
+
+The candidate bindings of rules and subrules are streamed, one at a time; with --materialize, they are instead
+built up front as full lists, with list(itertools.product(...)), as MESSY did previously, to give a baseline.
+Subrule memoization and domain pruning are turned off, since the subrule cache and the pruned candidate
+domains both take memory that grows with the cast, which would mask that taken in enumerating the bindings.
+Run from the repository root:
+
+    python -m benchmarks.allocation --cast-sizes 11 30 60 --frames 30
+    python -m benchmarks.allocation --cast-sizes 11 30 60 --frames 30 --materialize
+"""
+import sys
+import argparse
+import itertools
+import tracemalloc
+import config
+from messy import MESSY
+from rules import Rule, Subrule
+from symbols import SYMBOL_TABLE
+
+
+def materialized_join(rule, universe, binding_candidates):
+    """Return all candidate bindings of the given rule in which no two references are bound to the same noun.
+
+    Unlike Rule._join(), this builds every binding up front, and prunes none, as MESSY did previously.
+    """
+    variable_ordering = list(rule.header_references)
+    candidate_bindings = list(itertools.product(*binding_candidates))
+    bindings = [dict(zip(variable_ordering, candidates)) for candidates in candidate_bindings]
+    return [binding for binding in bindings if len(set(binding.values())) == len(binding)]
+
+
+def materialized_evaluate(subrule, universe, partial_bindings):
+    """Return whether some binding of the variables local to the given subrule satisfies its sentence list.
+
+    Unlike Subrule._evaluate(), this builds every binding up front, as MESSY did previously.
+    """
+    local_binding_candidates = {
+        name: universe.classes[class_symbol] if noun_symbol is None else [noun_symbol]
+        for name, (class_symbol, noun_symbol) in subrule.domains.items() if name not in partial_bindings
+    }
+    local_variable_ordering = list(local_binding_candidates)
+    candidate_bindings = list(itertools.product(*local_binding_candidates.values()))
+    bindings = [
+        {**partial_bindings, **dict(zip(local_variable_ordering, candidates))} for candidates in candidate_bindings
+    ]
+    for binding in bindings:
+        if subrule.condition(universe, binding):
+            return True
+    return False
+
+
+def enlarge_cast(universe, cast_size):
+    """Pad the cast of the given universe with anonymous extras until it has the given size."""
+    people = universe.classes[SYMBOL_TABLE.encode('PEOPLE')]
+    for i in range(len(people), cast_size):
+        extra = SYMBOL_TABLE.encode(f"EXTRA{i}")
+        people.append(extra)
+        universe.classes[SYMBOL_TABLE.encode('MEN' if i % 2 else 'WOMEN')].append(extra)
+
+
+def measure(cast_size, number_of_frames, seed):
+    """Return the peak memory allocated by each of the given number of frames, in bytes."""
+    settings = config.Settings(
+        verbosity=0,
+        output_to_file=False,
+        random_seed=seed,
+        rules_cache_directory=None,
+        memoize_subrules=False,
+        domain_pruning=False
+    )
+    messy = MESSY(settings=settings)
+    enlarge_cast(universe=messy.universe, cast_size=cast_size)
+    peaks = []
+    tracemalloc.start()
+    for _ in range(number_of_frames):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        messy.simulate()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - baseline)
+    tracemalloc.stop()
+    return peaks
+
+
+def main():
+    """Run the benchmark and print a table of per-frame peak allocations."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cast-sizes', type=int, nargs='+', default=[11, 30, 60])
+    parser.add_argument('--frames', type=int, default=config.Settings().number_of_time_frames)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--materialize', action='store_true', help="build candidate bindings up front, as a baseline")
+    args = parser.parse_args()
+    if args.materialize:
+        Rule._join = materialized_join
+        Subrule._evaluate = materialized_evaluate
+    print(f"{'cast size':>10}{'mean KiB/frame':>16}{'max KiB/frame':>16}")
+    for cast_size in args.cast_sizes:
+        peaks = measure(cast_size=cast_size, number_of_frames=args.frames, seed=args.seed)
+        mean_peak = sum(peaks) / len(peaks) / 1024
+        max_peak = max(peaks) / 1024
+        print(f"{cast_size:>10}{mean_peak:>16.1f}{max_peak:>16.1f}")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure the time taken to fork a semantic network, as a function of the number of triples in it.
+
+Forking a triple store copies its top-level indices (see TripleStore.fork()), which takes time linear in the
+number of their entries, though not in the number of triples they hold. Forking a history likewise copies
+the indices of its records (see History.fork()), which takes time linear in the number of time frames recorded,
+and that is reported too. For scale, the time taken to fork a running simulation instance of the murder story,
+and to simulate one of its time frames, is also reported. Run from the repository root:
+
+    python -m benchmarks.forking --sizes 1000 10000 100000 1000000 --history-lengths 1000 10000 100000
+"""
+import sys
+import time
+import random
+import argparse
+import config
+from messy import MESSY
+from universe import Triple, TripleStore, History
+from symbols import SYMBOL_TABLE
+
+
+def build_store(number_of_triples, seed):
+    """Return a triple store holding the given number of random triples over a storyworld of moderate size."""
+    random_number_generator = random.Random(seed)
+    nouns = [SYMBOL_TABLE.encode(f"NOUN{i}") for i in range(1000)]
+    relations = [SYMBOL_TABLE.encode(f"RELATION{i}") for i in range(50)]
+    store = TripleStore()
+    for i in range(number_of_triples):
+        store.append(
+            Triple(
+                triple_id=i,
+                triple_subject=random_number_generator.choice(nouns),
+                triple_relation=random_number_generator.choice(relations),
+                triple_object=random_number_generator.choice(nouns),
+                time_frame=1700,
+                time_since_start=10 * (i * 30 // number_of_triples)
+            )
+        )
+    return store
+
+
+def build_history(number_of_time_frames):
+    """Return a history of the given number of time frames, recorded over an empty network.
+
+    Forking a history copies references to the records of its time frames, and not the triples in them, so the
+    network they are recorded over makes no difference to the time taken.
+    """
+    history = History(snapshot_interval=config.HISTORY_SNAPSHOT_INTERVAL)
+    network = TripleStore()
+    for i in range(number_of_time_frames):
+        history.record(time_frame=i % 2400, time_since_start=10 * i, network=network)
+    return history
+
+
+def measure(operation, repetitions):
+    """Return the least time, in seconds, taken by the given operation over the given number of repetitions."""
+    best = float('inf')
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def main():
+    """Run the benchmark and print the time per fork for each size of network."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--history-lengths', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'triples':>10}{'index entries':>15}{'ms/fork':>10}{'ns/triple':>11}")
+    for size in args.sizes:
+        store = build_store(number_of_triples=size, seed=args.seed)
+        index_entries = sum(
+            len(index) for index in (
+                store._triples, store._by_subject_relation_object, store._by_subject_relation, store._by_relation,
+                store._by_relation_and_time, store._times_by_relation
+            )
+        )
+        seconds = measure(operation=store.fork, repetitions=args.repetitions)
+        print(f"{size:>10}{index_entries:>15}{seconds * 1e3:>10.2f}{seconds / size * 1e9:>11.1f}")
+        sys.stdout.flush()
+    print(f"\n{'time frames':>11}{'ms/fork':>10}{'ns/frame':>10}")
+    for history_length in args.history_lengths:
+        history = build_history(number_of_time_frames=history_length)
+        seconds = measure(operation=history.fork, repetitions=args.repetitions)
+        print(f"{history_length:>11}{seconds * 1e3:>10.2f}{seconds / history_length * 1e9:>10.1f}")
+        sys.stdout.flush()
+    messy = MESSY(settings=config.Settings(verbosity=0, output_to_file=False, random_seed=args.seed))
+    number_of_frames = messy.settings.number_of_time_frames
+    start_time = time.perf_counter()
+    for _ in range(number_of_frames):
+        messy.simulate()
+    seconds_per_frame = (time.perf_counter() - start_time) / number_of_frames
+    seconds_per_fork = measure(
+        operation=lambda: messy.fork(random_seed=args.seed),
+        repetitions=args.repetitions
+    )
+    print(
+        f"\nMurder story ({len(messy.universe.network)} triples): {seconds_per_fork * 1e3:.2f} ms per fork, "
+        f"{seconds_per_frame * 1e3:.2f} ms per simulated time frame"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure the memory taken per triple in the history of a simulated universe.
+
+The bytes per triple are compared against those of the __dict__-backed triples that MESSY used previously,
+whose components were separate strings for each triple, rather than symbols. Run from the repository root:
+
+    python -m benchmarks.memory --triples 100000 --seed 0
+"""
+import sys
+import random
+import argparse
+import tracemalloc
+import config
+from messy import MESSY
+from universe import Triple
+from symbols import SYMBOL_TABLE
+
+
+class DictTriple:
+    """A triple as MESSY represented it before the introduction of compact triples, used as a baseline."""
+
+    def __init__(self, triple_id, triple_subject, triple_relation, triple_object, time_frame, time_since_start):
+        """Initialize a DictTriple object."""
+        self.id = triple_id
+        self.subject = triple_subject
+        self.relation = triple_relation
+        self.object = triple_object
+        self.time_frame = time_frame
+        self.time_since_start = time_since_start
+        self.initial = self.time_since_start == 0
+
+
+def sample_components(number_of_triples, seed):
+    """Return the names of the components of the given number of triples drawn from the simulated storyworld."""
+    messy = MESSY(settings=config.Settings(verbosity=0, output_to_file=False, random_seed=seed))
+    for _ in range(messy.settings.number_of_time_frames):
+        messy.simulate()
+    triples = [triple for time_frame in messy.universe.history for triple in messy.universe.history[time_frame]]
+    random_number_generator = random.Random(seed)
+    components = []
+    for _ in range(number_of_triples):
+        triple = random_number_generator.choice(triples)
+        symbols = (triple.subject, triple.relation, triple.object)
+        components.append(tuple(SYMBOL_TABLE.decode(symbol) for symbol in symbols))
+    return components
+
+
+def measure(triple_class, components, encode):
+    """Return the number of bytes allocated per triple in building triples of the given class.
+
+    Each component is passed through the given function, which for the baseline builds a fresh copy of the
+    string, and otherwise looks up its symbol.
+    """
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    triples = [
+        triple_class(
+            triple_id=i,
+            triple_subject=encode(triple_subject),
+            triple_relation=encode(triple_relation),
+            triple_object=encode(triple_object) if triple_object is not None else None,
+            time_frame=1700,
+            time_since_start=0
+        )
+        for i, (triple_subject, triple_relation, triple_object) in enumerate(components)
+    ]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (allocated - baseline) / len(triples)
+
+
+def main():
+    """Run the benchmark and print the bytes per triple for each representation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--triples', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    components = sample_components(number_of_triples=args.triples, seed=args.seed)
+    print(f"{'representation':>16}{'bytes/triple':>14}")
+    representations = (
+        ('__dict__', DictTriple, lambda name: name.lower().upper()),
+        ('__slots__', Triple, SYMBOL_TABLE.encode),
+    )
+    for name, triple_class, encode in representations:
+        bytes_per_triple = measure(triple_class=triple_class, components=components, encode=encode)
+        print(f"{name:>16}{bytes_per_triple:>14.1f}")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
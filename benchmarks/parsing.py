@@ -0,0 +1,74 @@
+"""Measure the throughput of the rules-file parser on generated rules files of increasing size.
+
+Run from the repository root:
+
+    python -m benchmarks.parsing --sizes 5000 50000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import config
+from compiler import Compiler
+
+
+CLASSES = ['PEOPLE', 'MEN', 'WOMEN', 'ROOMS']
+RELATIONS = ['LIKES', 'LOVES', 'HATES', 'KNOWS', 'IN', 'DEAD', 'MARRIED', 'SUSPECTS', 'DRUNK', 'GET']
+NOUNS = ['GEORGE', 'MARGARET', 'LASLO', 'MEDEA', 'GLROOM', 'GARDEN', 'DRINK', 'MURDER']
+
+
+def generate_rule(random_number_generator):
+    """Return the definition of a random rule exercising the constructs of the rule language."""
+    choice = random_number_generator.choice
+    header_class, other_class = choice(CLASSES), choice(CLASSES)
+    lines = [
+        f"$RULE        X.{header_class} {choice(RELATIONS)} Y.{other_class}:{random_number_generator.randint(1, 3)},",
+        f"             X ≠{choice(RELATIONS)} {choice(NOUNS)};",
+        f"-10, 0:      ({choice(NOUNS)} {choice(RELATIONS)});",
+        f"0, -10:      [T < {random_number_generator.randint(17, 23)}00] & [T > 1650 / T != 2000];",
+        f".{random_number_generator.randint(1, 9)}, 0:       (X {choice(RELATIONS)}/{choice(RELATIONS)} Y)",
+        f"           & (Y ←{choice(RELATIONS)} #SPOUSE.{choice(CLASSES)}) / (#SPOUSE {choice(RELATIONS)}>20 X);",
+        f"0, -.{random_number_generator.randint(1, 9)}:     "
+        f"(X ≠{choice(RELATIONS)} & {choice(RELATIONS)}=0 {choice(NOUNS)});",
+    ]
+    return '\n'.join(lines)
+
+
+def generate_rules_file(path, number_of_rules, seed):
+    """Write a rules file containing the given number of random rules to the given path."""
+    random_number_generator = random.Random(seed)
+    with open(path, 'w') as rules_file:
+        for i in range(number_of_rules):
+            rules_file.write(f"%      GENERATED RULE {i}\n")
+            rules_file.write(generate_rule(random_number_generator=random_number_generator))
+            rules_file.write("\n\n")
+
+
+def measure(number_of_rules, seed):
+    """Return the number of seconds taken to parse a generated rules file of the given size."""
+    settings = config.Settings(verbosity=0, rules_cache_directory=None)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rules.txt")
+        generate_rules_file(path=path, number_of_rules=number_of_rules, seed=seed)
+        start_time = time.perf_counter()
+        Compiler.parse_rules_file(path_to_rules_file=path, settings=settings)
+        return time.perf_counter() - start_time
+
+
+def main():
+    """Run the benchmark and print a table of parse times and throughputs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'rules':>10}{'seconds':>12}{'rules/sec':>12}")
+    for number_of_rules in args.sizes:
+        elapsed_time = measure(number_of_rules=number_of_rules, seed=args.seed)
+        print(f"{number_of_rules:>10}{elapsed_time:>12.2f}{number_of_rules / elapsed_time:>12.0f}")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
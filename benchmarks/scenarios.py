@@ -0,0 +1,148 @@
+"""Run standard simulation scenarios, reporting latency, throughput, and peak memory for each.
+
+The scenarios are the murder story and synthetic storyworlds of increasing scale (see benchmarks.storyworlds).
+Each scenario is run in a fresh interpreter, and its per-frame latency, total run time, throughput (triples added
+per second), and peak resident memory are reported. Results may be written as JSON and compared against those of
+an earlier run, and settings may be overridden, to compare evaluation strategies. Run from the repository root:
+
+    python -m benchmarks.scenarios --json before.json
+    python -m benchmarks.scenarios --set vectorized_evaluation=True --baseline before.json
+"""
+import os
+import ast
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import resource
+import statistics
+import multiprocessing
+import config
+from messy import MESSY
+from benchmarks.storyworlds import StoryworldSpecification, generate_storyworld
+
+
+# Maps the name of each standard scenario to the specification of its storyworld, or None for the murder story
+SCENARIOS = {
+    'murder': None,
+    'small': StoryworldSpecification(cast_size=20, number_of_classes=2, number_of_rules=50, subrule_depth=1),
+    'medium': StoryworldSpecification(cast_size=40, number_of_classes=4, number_of_rules=100, subrule_depth=2),
+    'large': StoryworldSpecification(cast_size=80, number_of_classes=8, number_of_rules=200, subrule_depth=2),
+    'deep': StoryworldSpecification(cast_size=16, number_of_classes=2, number_of_rules=30, variables_per_rule=3,
+                                    subrule_depth=3),
+}
+
+
+def run_scenario(paths, number_of_frames, seed, overrides):
+    """Simulate the storyworld at the given paths, returning the per-frame latencies and number of triples added."""
+    settings = config.Settings(
+        verbosity=0, output_to_file=False, random_seed=seed, rules_cache_directory=None, **paths, **overrides
+    )
+    messy = MESSY(settings=settings)
+    frames = messy.run(number_of_time_frames=number_of_frames, retain_history=False)
+    next(frames)  # The initial conditions
+    latencies = []
+    number_of_triples_added = 0
+    while True:
+        start_time = time.perf_counter()
+        try:
+            frame = next(frames)
+        except StopIteration:
+            break
+        latencies.append(time.perf_counter() - start_time)
+        number_of_triples_added += len(frame.additions)
+    return latencies, number_of_triples_added
+
+
+def measure(paths, number_of_frames, seed, overrides):
+    """Return a dictionary of the measurements of a scenario simulating the storyworld at the given paths."""
+    latencies, number_of_triples_added = run_scenario(
+        paths=paths, number_of_frames=number_of_frames, seed=seed, overrides=overrides
+    )
+    total_time = sum(latencies)
+    # The peak resident set size is reported in kibibytes on Linux, but in bytes on macOS
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_memory *= 1 if sys.platform == 'darwin' else 2 ** 10
+    return {
+        'frames': len(latencies),
+        'total_seconds': total_time,
+        'mean_frame_ms': 1000 * statistics.mean(latencies),
+        'median_frame_ms': 1000 * statistics.median(latencies),
+        'max_frame_ms': 1000 * max(latencies),
+        'triples_added': number_of_triples_added,
+        'triples_per_second': number_of_triples_added / total_time if total_time else 0.0,
+        'peak_memory_mib': peak_memory / 2 ** 20,
+    }
+
+
+def measure_in_fresh_interpreter(paths, number_of_frames, seed, overrides):
+    """Return the measurements of a scenario run in a fresh interpreter, so that its peak memory is its own."""
+    with multiprocessing.get_context('spawn').Pool(processes=1) as pool:
+        return pool.apply(measure, args=(paths, number_of_frames, seed, overrides))
+
+
+def parse_override(override):
+    """Parse a settings override of the form NAME=VALUE, where the value is a Python literal."""
+    try:
+        name, value = override.split('=', 1)
+        return name.strip().lower(), ast.literal_eval(value.strip())
+    except (ValueError, SyntaxError):
+        raise argparse.ArgumentTypeError(f"Malformed settings override (expected NAME=VALUE): {override}")
+
+
+def main():
+    """Run the scenarios, printing a table of their measurements, and optionally writing them as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--frames', type=int, default=config.NUMBER_OF_TIME_FRAMES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--set', type=parse_override, action='append', default=[], dest='overrides',
+                        metavar='NAME=VALUE', help="override a setting, e.g., vectorized_evaluation=True")
+    parser.add_argument('--json', help="write the results to this path")
+    parser.add_argument('--baseline', help="compare against the results written to this path by an earlier run")
+    args = parser.parse_args()
+    overrides = dict(args.overrides)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['scenarios']
+    print(f"{'scenario':>10}{'frames':>8}{'seconds':>10}{'mean ms':>10}{'p50 ms':>10}{'max ms':>10}"
+          f"{'triples/s':>12}{'peak MiB':>10}{'speedup':>9}")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.scenarios:
+            specification = SCENARIOS[name]
+            if specification is None:
+                paths = {}  # The default storyworld
+            else:
+                paths = generate_storyworld(directory=os.path.join(directory, name), specification=specification)
+            result = measure_in_fresh_interpreter(
+                paths=paths, number_of_frames=args.frames, seed=args.seed, overrides=overrides
+            )
+            results[name] = result
+            speedup = ''
+            if name in baseline and result['total_seconds']:
+                speedup = f"{baseline[name]['total_seconds'] / result['total_seconds']:.2f}x"
+            print(f"{name:>10}{result['frames']:>8}{result['total_seconds']:>10.2f}{result['mean_frame_ms']:>10.1f}"
+                  f"{result['median_frame_ms']:>10.1f}{result['max_frame_ms']:>10.1f}"
+                  f"{result['triples_per_second']:>12.0f}{result['peak_memory_mib']:>10.1f}{speedup:>9}")
+            sys.stdout.flush()
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'overrides': overrides,
+                'specifications': {
+                    name: vars(specification) if specification else None
+                    for name, specification in SCENARIOS.items() if name in results
+                },
+                'scenarios': results,
+            }, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Generate synthetic storyworlds (rules, initial conditions, and lexical expressions) at a controllable scale.
+
+Run from the repository root to write a storyworld to a directory:
+
+    python -m benchmarks.storyworlds --directory /tmp/world --cast-size 100 --rules 500
+"""
+import os
+import random
+import argparse
+
+
+class StoryworldSpecification:
+    """The parameters of a synthetic storyworld.
+
+    The cast is split evenly among the given number of classes, all of which make up the class PEOPLE. Each rule
+    binds the given number of variables in its header, and each of its subrules chains the given number of
+    sentences ("subrule depth") from one header variable to another through variables local to the subrule,
+    each of which multiplies the number of bindings under which the subrule must be evaluated.
+    """
+
+    def __init__(self, cast_size=50, number_of_classes=4, number_of_rules=200, variables_per_rule=2,
+                 subrule_depth=2, subrules_per_rule=3, number_of_relations=20, number_of_attributes=10,
+                 initial_relations_per_person=4, seed=0):
+        """Initialize a StoryworldSpecification object."""
+        if not 1 <= number_of_classes <= cast_size:
+            raise Exception(f"Cannot split a cast of {cast_size} into {number_of_classes} classes")
+        self.cast_size = cast_size
+        self.number_of_classes = number_of_classes
+        self.number_of_rules = number_of_rules
+        self.variables_per_rule = variables_per_rule
+        self.subrule_depth = subrule_depth
+        self.subrules_per_rule = subrules_per_rule
+        self.number_of_relations = number_of_relations
+        self.number_of_attributes = number_of_attributes
+        self.initial_relations_per_person = initial_relations_per_person
+        self.seed = seed
+
+    def __str__(self):
+        """Return string representation."""
+        return f"Storyworld Specification ({', '.join(f'{name}={value}' for name, value in vars(self).items())})"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    @property
+    def cast(self):
+        """Return the names of the members of the cast."""
+        return [f"P{i}" for i in range(self.cast_size)]
+
+    @property
+    def classes(self):
+        """Return the names of the classes that the cast is split into."""
+        return [f"C{i}" for i in range(self.number_of_classes)]
+
+    @property
+    def relations(self):
+        """Return the names of the relations between members of the cast."""
+        return [f"R{i}" for i in range(self.number_of_relations)]
+
+    @property
+    def attributes(self):
+        """Return the names of the relations that take no object (e.g., "TALL")."""
+        return [f"A{i}" for i in range(self.number_of_attributes)]
+
+
+def generate_storyworld(directory, specification):
+    """Write the files of a storyworld meeting the given specification to the given directory.
+
+    Returns a dictionary of settings overrides pointing a simulation instance to the files.
+    """
+    random_number_generator = random.Random(specification.seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        'path_to_rules_file': os.path.join(directory, "rules.txt"),
+        'path_to_initial_conditions_file': os.path.join(directory, "initial_conditions.txt"),
+        'path_to_lexical_expressions_file': os.path.join(directory, "lexical_expressions.txt"),
+    }
+    with open(paths['path_to_rules_file'], 'w') as rules_file:
+        for i in range(specification.number_of_rules):
+            rules_file.write(f"%      GENERATED RULE {i}\n")
+            rule = generate_rule(specification=specification, random_number_generator=random_number_generator)
+            rules_file.write(rule)
+            rules_file.write("\n\n")
+    with open(paths['path_to_initial_conditions_file'], 'w') as initial_conditions_file:
+        initial_conditions_file.write(
+            generate_initial_conditions(specification=specification, random_number_generator=random_number_generator)
+        )
+    with open(paths['path_to_lexical_expressions_file'], 'w') as lexical_expressions_file:
+        lexical_expressions_file.write(generate_lexical_expressions(specification=specification))
+    return paths
+
+
+def generate_rule(specification, random_number_generator):
+    """Return the definition of a random rule meeting the given specification."""
+    choice = random_number_generator.choice
+    classes = specification.classes + ['PEOPLE']
+    # The header binds X, then Y, and then any further variables, each of a random class upon its first use
+    variable_names = ['X', 'Y'] + [f"V{i}" for i in range(2, specification.variables_per_rule)]
+    variable_names = variable_names[:specification.variables_per_rule]
+    definitions = {name: f"{reference(name)}.{choice(classes)}" for name in variable_names}
+    # A Y-restriction caps the number of times a rule may fire in a time frame, as with those of the murder story
+    if 'Y' in definitions:
+        definitions['Y'] += f":{random_number_generator.randint(1, 3)}"
+    actions = []
+    if len(variable_names) == 1:
+        actions.append(f"{definitions['X']} {choice(specification.attributes)}")
+    for subject_name, object_name in zip(variable_names, variable_names[1:]):
+        actions.append(f"{definitions[subject_name]} {choice(specification.relations)} {definitions[object_name]}")
+        definitions[subject_name], definitions[object_name] = reference(subject_name), reference(object_name)
+    lines = [f"$RULE        {(',' + chr(10) + '             ').join(actions)};"]
+    # Each rule opens with a time window, so that rules come in and out of play as the story unfolds
+    start_time = random_number_generator.randrange(1700, 2000, 100)
+    lines.append(f"0, -10:      [T > {start_time - 10}] & [T < {start_time + 200}];")
+    for i in range(specification.subrules_per_rule):
+        true_value = random_number_generator.choice(['.1', '.2', '.3', '.5'])
+        false_value = random_number_generator.choice(['0', '-.1', '-.2'])
+        if i == 0 and random_number_generator.random() < 0.5:
+            true_value, false_value = '0', '-10'  # A short-circuit abandon
+        subject_name, object_name = choice(variable_names), choice(variable_names)
+        sentences = generate_sentence_chain(
+            subject_name=subject_name,
+            object_name=object_name,
+            specification=specification,
+            random_number_generator=random_number_generator
+        )
+        lines.append(f"{true_value}, {false_value}:{' ' * (9 - len(true_value) - len(false_value))}{sentences};")
+    return '\n'.join(lines)
+
+
+def generate_sentence_chain(subject_name, object_name, specification, random_number_generator):
+    """Return a sentence list chaining the given variables through variables local to the subrule."""
+    choice = random_number_generator.choice
+    depth = specification.subrule_depth
+    # E.g., with a depth of 3, (X R1 #L1.PEOPLE) & (#L1 R2 #L2.C0) & (#L2 R3 Y)
+    names = [subject_name] + [f"L{i}" for i in range(1, depth)] + [object_name]
+    sentences = []
+    for i in range(depth):
+        if i + 1 < depth:
+            sentence_object = f"#{names[i + 1]}.{choice(specification.classes + ['PEOPLE'])}"
+        else:
+            sentence_object = reference(names[i + 1])
+        negation = '≠' if random_number_generator.random() < 0.2 else ''
+        sentences.append(f"({reference(names[i])} {negation}{choice(specification.relations)} {sentence_object})")
+    return ' & '.join(sentences)
+
+
+def reference(variable_name):
+    """Return a reference to the given variable, which is marked by a leading '#' unless it is X or Y."""
+    return variable_name if variable_name in ('X', 'Y') else f"#{variable_name}"
+
+
+def generate_initial_conditions(specification, random_number_generator):
+    """Return the text of an initial-conditions file meeting the given specification."""
+    cast = specification.cast
+    lines = []
+    for person in cast:
+        attributes = random_number_generator.sample(specification.attributes, k=min(2, len(specification.attributes)))
+        relations = [
+            f"{random_number_generator.choice(specification.relations)} {random_number_generator.choice(cast)}"
+            for _ in range(specification.initial_relations_per_person)
+        ]
+        lines.append(f"{person}\t{', '.join(attributes + relations)}")
+    lines.append('')
+    for i, class_name in enumerate(specification.classes):
+        members = cast[i::specification.number_of_classes]
+        lines.append(f"class.{class_name}\t{', '.join(members)}")
+    lines.append(f"class.people\t{', '.join(f'class.{class_name}' for class_name in specification.classes)}")
+    return '\n'.join(lines) + '\n'
+
+
+def generate_lexical_expressions(specification):
+    """Return the text of a lexical-expressions file covering every noun and relation in the given specification."""
+    lines = [f"{person}: {person.lower()}, the person called {person.lower()}" for person in specification.cast]
+    lines += [f"{relation}: relates-{i} to, is related-{i} to" for i, relation in enumerate(specification.relations)]
+    lines += [f"{attribute}: is attribute-{i}" for i, attribute in enumerate(specification.attributes)]
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    """Write a storyworld meeting the given specification to the given directory."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--directory', required=True)
+    parser.add_argument('--cast-size', type=int, default=50)
+    parser.add_argument('--classes', type=int, default=4)
+    parser.add_argument('--rules', type=int, default=200)
+    parser.add_argument('--variables-per-rule', type=int, default=2)
+    parser.add_argument('--subrule-depth', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    specification = StoryworldSpecification(
+        cast_size=args.cast_size,
+        number_of_classes=args.classes,
+        number_of_rules=args.rules,
+        variables_per_rule=args.variables_per_rule,
+        subrule_depth=args.subrule_depth,
+        seed=args.seed
+    )
+    paths = generate_storyworld(directory=args.directory, specification=specification)
+    for path in paths.values():
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
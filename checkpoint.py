@@ -0,0 +1,296 @@
+import os
+import sys
+import mmap
+import array
+import struct
+import itertools
+import tempfile
+from symbols import SYMBOL_TABLE
+from universe import History, TripleStore, Triple
+from rules import Relation
+from utils import paused_garbage_collection
+
+
+class Checkpoint:
+    """A checkpoint of a simulated universe, held in a compact binary file that is read by memory-mapping it.
+
+    A checkpoint holds everything needed to resume a run exactly: the network, the queue of triples to be
+    committed next time frame, the history, the classes, the clock, the triple-id counter, and the state of the
+    random-number generator. The caches that a universe builds up as it is simulated (e.g., the subrule cache
+    and the cached rule tests) are not included, since they only save work, and they are rebuilt as the resumed
+    run goes on.
+
+    The file opens with a header and a table of contents, followed by the sections it lists, each of which is
+    a flat array of 64-bit integers (or floats, or bytes), aligned to eight bytes. Triples are stored once each,
+    as rows of a table ordered by id, and the network and history refer to them by row. Since symbols may differ
+    from process to process (see SymbolTable), the names of the symbols are stored too, and the symbols in a
+    checkpoint are translated into those of the process that restores it.
+    """
+
+    # Marks the start of a checkpoint file
+    MAGIC = b'MESSYCKP'
+    # The version of the file format, which must be incremented whenever a change is made to it
+    VERSION = 2
+    # The header: magic, format version, byte order (1 for little-endian), and number of sections
+    HEADER = struct.Struct('<8sIII')
+    # An entry in the table of contents: section name, typecode, offset, and number of items
+    ENTRY = struct.Struct('<24s1s7xQQ')
+    # The scalars stored in the 'scalars' section, in order
+    SCALARS = (
+        'time', 'time_since_start', 'next_triple_id', 'random_draws', 'snapshot_interval', 'random_version',
+        'has_gauss_next'
+    )
+    # The number of columns in the 'triples' section: id, subject, relation, object, time frame, time since start
+    TRIPLE_COLUMNS = 6
+    # The number of columns in the 'queue' section: subject, relation, object, and negate field
+    QUEUE_COLUMNS = 4
+    # Stands in for None (e.g., the object of an attribute) in the sections
+    NONE = -1
+
+    def __init__(self, path):
+        """Initialize a Checkpoint object by memory-mapping the checkpoint file at the given path."""
+        self.path = path
+        with open(path, 'rb') as checkpoint_file:
+            self._map = mmap.mmap(checkpoint_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, little_endian, number_of_sections = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            self.close()
+            raise Exception(f"Not a checkpoint file: {path}")
+        if version != self.VERSION:
+            self.close()
+            raise Exception(f"Checkpoint file {path} is of format version {version}, not {self.VERSION}")
+        if little_endian != (sys.byteorder == 'little'):
+            self.close()
+            raise Exception(f"Checkpoint file {path} was written on a machine of the opposite byte order")
+        self.sections = {}  # Maps the names of the sections to their typecodes, offsets, and numbers of items
+        for i in range(number_of_sections):
+            name, typecode, offset, length = self.ENTRY.unpack_from(self._map, self.HEADER.size + i * self.ENTRY.size)
+            self.sections[name.rstrip(b'\0').decode()] = (typecode.decode(), offset, length)
+        self.scalars = dict(zip(self.SCALARS, self.section('scalars')))
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Checkpoint ({self.path}: time {self.time}, {len(self)} triples)"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def __len__(self):
+        """Return the number of triples in the network stored in this checkpoint."""
+        return self.sections['network'][2]
+
+    def __enter__(self):
+        """Return this checkpoint, which will be closed upon exiting the context."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close this checkpoint."""
+        self.close()
+
+    @property
+    def time(self):
+        """Return the plot time at which this checkpoint was taken."""
+        return self.scalars['time']
+
+    def section(self, name):
+        """Return the given section as a memory view onto the file, whose items are of the section's type."""
+        typecode, offset, length = self.sections[name]
+        size = struct.calcsize(typecode)
+        return memoryview(self._map)[offset:offset + length * size].cast(typecode)
+
+    def close(self):
+        """Unmap the checkpoint file."""
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Views onto the file are still held (e.g., by a traceback), and it is unmapped once they are freed
+
+    @classmethod
+    def write(cls, path, universe):
+        """Write a checkpoint of the given universe, and the state of its random-number generator, to the given path.
+
+        A checkpoint may be taken between time frames, i.e., before or after any call to MESSY.simulate().
+        """
+        if universe.history.has_pending_changes:
+            raise Exception("Cannot checkpoint a universe whose changes have not been recorded in its history")
+        history = universe.history
+        # Gather every triple in the network or history, each of which is stored once, as a row ordered by id
+        triples = dict.fromkeys(universe.network)
+        for time_frame in history.time_frames:
+            triples.update(dict.fromkeys(history.additions[time_frame]))
+            triples.update(dict.fromkeys(history.deletions[time_frame]))
+        for snapshot in history.snapshots.values():
+            triples.update(dict.fromkeys(snapshot))
+        triples = sorted(triples, key=lambda triple: triple.id)
+        rows = {triple: row for row, triple in enumerate(triples)}
+        triple_table = array.array('q', bytes(8 * cls.TRIPLE_COLUMNS * len(triples)))
+        triple_table[0::cls.TRIPLE_COLUMNS] = array.array('q', (triple.id for triple in triples))
+        triple_table[1::cls.TRIPLE_COLUMNS] = array.array('q', (triple.subject for triple in triples))
+        triple_table[2::cls.TRIPLE_COLUMNS] = array.array('q', (triple.relation for triple in triples))
+        triple_table[3::cls.TRIPLE_COLUMNS] = array.array(
+            'q', (cls.NONE if triple.object is None else triple.object for triple in triples)
+        )
+        triple_table[4::cls.TRIPLE_COLUMNS] = array.array('q', (triple.time_frame for triple in triples))
+        triple_table[5::cls.TRIPLE_COLUMNS] = array.array('q', (triple.time_since_start for triple in triples))
+        queue = array.array('q')
+        for triple_subject, triple_relation, triple_object in universe.queue:
+            triple_object = cls.NONE if triple_object is None else triple_object
+            queue.extend((triple_subject, triple_relation.symbol, triple_object, triple_relation.negate_field))
+        # Reading the next triple id consumes it, so the counter is replaced by one starting from it
+        next_triple_id = next(universe.triple_ids)
+        universe.triple_ids = itertools.count(next_triple_id)
+        random_version, random_state, gauss_next = universe.random.getstate()
+        scalars = {
+            'time': universe.time,
+            'time_since_start': universe.time_since_start,
+            'next_triple_id': next_triple_id,
+            'random_draws': universe.random_draws,
+            'snapshot_interval': history.snapshot_interval,
+            'random_version': random_version,
+            'has_gauss_next': gauss_next is not None,
+        }
+        snapshot_time_frames = [time_frame for time_frame in history.time_frames if time_frame in history.snapshots]
+        sections = {
+            'scalars': array.array('q', (scalars[name] for name in cls.SCALARS)),
+            'gauss_next': array.array('d', [gauss_next or 0.0]),
+            'random_state': array.array('q', random_state),
+            'symbols': array.array('B', '\n'.join(SYMBOL_TABLE.decode(i) for i in range(len(SYMBOL_TABLE))).encode()),
+            'triples': triple_table,
+            'network': array.array('q', (rows[triple] for triple in universe.network)),
+            'queue': queue,
+            'class_names': array.array('q', universe.classes),
+            **cls._ragged(name='class_members', lists=universe.classes.values()),
+            'time_frames': array.array('q', history.time_frames),
+            'plot_times': array.array('q', (history.plot_times[t] for t in history.time_frames)),
+            **cls._ragged(
+                name='additions',
+                lists=([rows[triple] for triple in history.additions[t]] for t in history.time_frames)
+            ),
+            **cls._ragged(
+                name='deletions',
+                lists=([rows[triple] for triple in history.deletions[t]] for t in history.time_frames)
+            ),
+            'snapshot_time_frames': array.array('q', snapshot_time_frames),
+            **cls._ragged(
+                name='snapshots',
+                lists=([rows[triple] for triple in history.snapshots[t]] for t in snapshot_time_frames)
+            ),
+        }
+        cls._write_sections(path=path, sections=sections)
+
+    @staticmethod
+    def _ragged(name, lists):
+        """Return sections storing the given lists of integers end to end, along with the offsets at which they end."""
+        items = array.array('q')
+        ends = array.array('q')
+        for items_in_list in lists:
+            items.extend(items_in_list)
+            ends.append(len(items))
+        return {name: items, f"{name}_ends": ends}
+
+    @classmethod
+    def _write_sections(cls, path, sections):
+        """Write a checkpoint file holding the given sections (arrays) to the given path."""
+        offset = cls.HEADER.size + len(sections) * cls.ENTRY.size
+        table_of_contents = []
+        for name, section in sections.items():
+            offset += -offset % 8
+            table_of_contents.append(cls.ENTRY.pack(name.encode(), section.typecode.encode(), offset, len(section)))
+            offset += len(section) * section.itemsize
+        # Write the file under a temporary name first, so that a checkpoint is never left partially written
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as temporary_file:
+            temporary_file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, sys.byteorder == 'little', len(sections)))
+            temporary_file.write(b''.join(table_of_contents))
+            for section in sections.values():
+                temporary_file.write(bytes(-temporary_file.tell() % 8))
+                section.tofile(temporary_file)
+        os.replace(temporary_file.name, path)
+
+    def restore(self, universe):
+        """Restore the given universe, and the state of its random-number generator, to this checkpoint.
+
+        The universe must belong to a simulation instance running under the rules and settings of the one
+        from which the checkpoint was taken.
+        """
+        # The cyclic garbage collector is paused while the universe is rebuilt, since none of the objects allocated
+        # are garbage, and allocating a great many of them would otherwise trigger full collections over and over
+        with paused_garbage_collection():
+            self._restore(universe=universe)
+
+    def _restore(self, universe):
+        """Restore the given universe, and the state of its random-number generator, to this checkpoint."""
+        # Translate the symbols of the checkpoint into those of this process
+        symbols = [SYMBOL_TABLE.encode(name) for name in bytes(self.section('symbols')).decode().split('\n')]
+        symbols.append(None)  # Such that NONE, indexing the last item, is translated into None
+        # Rebuild the triples, in the order of their rows
+        triple_table = self.section('triples')
+        columns = [triple_table[i::self.TRIPLE_COLUMNS] for i in range(self.TRIPLE_COLUMNS)]
+        triples = [
+            Triple(
+                triple_id=triple_id,
+                triple_subject=symbols[triple_subject],
+                triple_relation=symbols[triple_relation],
+                triple_object=symbols[triple_object],
+                time_frame=time_frame,
+                time_since_start=time_since_start
+            )
+            for triple_id, triple_subject, triple_relation, triple_object, time_frame, time_since_start
+            in zip(*columns)
+        ]
+        universe.network = TripleStore(triples=[triples[row] for row in self.section('network')])
+        # Rebuild the queue; only the symbols and negate fields of the relations of queued triples are consulted
+        universe.queue = []
+        queue = self.section('queue')
+        for i in range(0, len(queue), self.QUEUE_COLUMNS):
+            triple_subject, triple_relation, triple_object, negate_field = queue[i:i + self.QUEUE_COLUMNS]
+            relation = Relation(
+                name=SYMBOL_TABLE.decode(symbols[triple_relation]),
+                negate_field=bool(negate_field),
+                duration_modifier_operator=None,
+                duration_modifier_time_value=None
+            )
+            relation.symbol = symbols[triple_relation]
+            universe.queue.append((symbols[triple_subject], relation, symbols[triple_object]))
+        # Rebuild the history
+        history = History(snapshot_interval=self.scalars['snapshot_interval'])
+        history.time_frames = list(self.section('time_frames'))
+        for time_since_start, time_frame in zip(history.time_frames, self.section('plot_times')):
+            history.plot_times[time_since_start] = time_frame
+            history.latest_time_frames[time_frame] = time_since_start
+        additions, deletions = self._unragged(name='additions'), self._unragged(name='deletions')
+        for time_frame, added_rows, deleted_rows in zip(history.time_frames, additions, deletions):
+            history.additions[time_frame] = [triples[row] for row in added_rows]
+            history.deletions[time_frame] = [triples[row] for row in deleted_rows]
+        for time_frame, rows in zip(self.section('snapshot_time_frames'), self._unragged(name='snapshots')):
+            history.snapshots[time_frame] = [triples[row] for row in rows]
+        universe.history = history
+        # Rebuild the classes
+        universe.classes = {}
+        for class_name, members in zip(self.section('class_names'), self._unragged(name='class_members')):
+            universe.classes[symbols[class_name]] = array.array('q', (symbols[member] for member in members))
+        # Restore the clock, the triple-id counter, and the random-number generator
+        universe.time = self.scalars['time']
+        universe.time_since_start = self.scalars['time_since_start']
+        universe.triple_ids = itertools.count(self.scalars['next_triple_id'])
+        universe.random_draws = self.scalars['random_draws']
+        gauss_next = self.section('gauss_next')[0] if self.scalars['has_gauss_next'] else None
+        universe.random.setstate((self.scalars['random_version'], tuple(self.section('random_state')), gauss_next))
+        # Discard anything the universe has cached about the state it was in before
+        universe.changed_relations = set()
+        universe.subrule_cache.clear()
+        universe.relation_keys.clear()
+        universe.relation_fillers.clear()
+        universe.cached_tests.clear()
+        universe.events.time_frame = universe.time
+
+    def _unragged(self, name):
+        """Return the lists of integers stored end to end in the given section (see Checkpoint._ragged())."""
+        items = self.section(name)
+        start = 0
+        lists = []
+        for end in self.section(f"{name}_ends"):
+            lists.append(items[start:end])
+            start = end
+        return lists
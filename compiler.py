@@ -1,140 +1,145 @@
+import os
 import re
+import sys
+import bisect
+import itertools
+import pickle
+import hashlib
+import operator
+import tempfile
 import config
-from rules import Rule, Action, Subrule, Sentence, Relation, TimeSentence, Variable
+from events import DEBUG, TRACE, EventLog, NullSink
+from utils import paused_garbage_collection
+from symbols import SYMBOL_TABLE
+from rules import Rule, Action, Subrule, Sentence, Relation, TimeSentence, Variable, decode_binding
+from universe import ANY
 
 
 class Compiler:
     """A compiler for Klein's (1971) rule language."""
 
+    # Maps the operators that may appear in a time sentence to the comparisons they denote
+    TIME_SENTENCE_OPERATORS = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '>': operator.gt}
+    # The greatest number of disjuncts into which a sentence list is expanded to derive constraints on the candidate
+    # bindings of its variables; a sentence list with more simply yields none (see Compiler._disjunctive_normal_form())
+    DISJUNCTIVE_NORMAL_FORM_LIMIT = 64
+    # The modules whose source determines what the parser, and the analysis of the parsed rules, produce; a hash
+    # of their source keys the on-disk cache of parsed files, so that changing any of them invalidates its entries
+    SOURCE_MODULES = ('compiler', 'rules', 'symbols', 'universe')
+    # The hash of the source of those modules, which is computed upon first use (see Compiler._source_digest())
+    _SOURCE_DIGEST = None
+
     @classmethod
-    def parse_rules_file(cls, path_to_rules_file):
-        """Parse the given rules file."""
-        rule_objects = []
-        # Read in the rules file
-        lines = open(path_to_rules_file).readlines()
-        # Convert to uppercase
-        lines = [line.upper() for line in lines if line.strip()]
-        # Remove blank lines
-        lines = [line for line in lines if line.strip()]
-        # Remove comments
-        lines = [line for line in lines if not line.lstrip().startswith('%')]
-        # Reduce all whitespace
-        blob = ''.join(lines)
-        blob = blob.replace('\n', ' ').replace('\t', ' ')
-        while '  ' in blob:
-            blob = blob.replace('  ', ' ')
-        # Remove the asterisks (since to our current knowledge it does nothing)
-        blob = blob.replace('*', '')
-        # Replace '≠' symbols with '!=', for ease of parsing, etc. Klein's original
-        # language appears to have used '≠'.
-        blob = blob.replace('≠', '!=')
-        # Replace '←' symbols with '<-', for ease of parsing, etc. Klein's original
-        # language appears to have used '←'.
-        blob = blob.replace('←', '<-')
-        # Break into individual rule definitions
-        rule_definitions = [line.strip() for line in blob.split('$RULE') if line]
-        # Parse each rule definition
-        for rule_definition in rule_definitions:
-            rule_object = cls._parse_rule_definition(rule_definition=rule_definition)
-            rule_objects.append(rule_object)
+    def parse_rules_file(cls, path_to_rules_file, settings=None, events=None):
+        """Parse the given rules file, compiling the rules under the given settings (by default, config's).
+
+        Any events concerning the parsing of the file are emitted to the given event log, if one is given
+        (e.g., that of the simulation instance the rules are parsed for). The parsed rules are cached on disk
+        along with the analysis of how each is to be evaluated (see Compiler._parse_with_cache() and
+        Compiler._analyze_rule()), but the callables evaluating them are built anew on each call, since
+        they cannot be serialized.
+        """
+        settings = settings or config.Settings()
+        threshold = settings.short_circuit_probability_increment_absolute_threshold
+        with paused_garbage_collection():
+            rule_objects = cls._parse_with_cache(
+                path_to_file=path_to_rules_file,
+                cache_directory=settings.rules_cache_directory,
+                parse=lambda: cls._parse_and_analyze_rules(
+                    path_to_rules_file=path_to_rules_file,
+                    threshold=threshold,
+                    events=events
+                ),
+                variant=threshold  # The analysis of the rules depends on the short-circuit threshold
+            )
+        return cls.compile_rules(rule_objects=rule_objects, settings=settings)
+
+    @classmethod
+    def compile_rules(cls, rule_objects, settings=None):
+        """Compile the given parsed rules under the given settings (by default, config's), returning them.
+
+        The rules must have been analyzed under the short-circuit threshold of the given settings, as those
+        returned by Compiler.parse_rules_file() are. Rules that are pickled keep their analysis but not what
+        is compiled from it (see Rule.__getstate__()), so this is how rules parsed in one process are made
+        ready for use in another (see batch.py).
+        """
+        settings = settings or config.Settings()
+        with paused_garbage_collection():
+            for rule_object in rule_objects:
+                cls._compile_rule(rule=rule_object, settings=settings)
         return rule_objects
 
     @classmethod
-    def _parse_rule_definition(cls, rule_definition):
-        """Return a Rule object, given a raw rule definition."""
-        action_list_definition, *subrule_definitions = [component.strip() for component in rule_definition.split(';')]
-        # Parse action list
-        action_definitions = [action_definition.strip() for action_definition in action_list_definition.split(',')]
-        action_list = cls._parse_action_definitions(action_definitions=action_definitions)
-        subrules = cls._parse_subrule_definitions(subrule_definitions=subrule_definitions)
-        rule_object = Rule(action_list=action_list, subrules=subrules, raw_definition=rule_definition)
-        return rule_object
+    def _parse_with_cache(cls, path_to_file, cache_directory, parse, variant=None):
+        """Return the result of calling the given function to parse the given file, consulting the on-disk cache.
+
+        Cache entries are keyed by a hash of the source of the parser (see Compiler._source_digest()), the given
+        variant of the parse (if any), and the content of the file, so an entry is never served for a file that
+        has since changed, or that was parsed differently. If no cache directory is given, the file is simply
+        parsed.
+        """
+        if cache_directory is None:
+            return parse()
+        with open(path_to_file, 'rb') as file:
+            content = file.read()
+        digest = hashlib.sha256(
+            f"{cls._source_digest()}:{variant}:{os.path.basename(path_to_file)}:".encode() + content
+        ).hexdigest()
+        path_to_cache_file = os.path.join(cache_directory, f"{digest}.pickle")
+        try:
+            with open(path_to_cache_file, 'rb') as cache_file, paused_garbage_collection():
+                return pickle.load(cache_file)
+        except Exception:
+            # The entry is missing, truncated, or was written by other code (unpickling a stale or foreign entry
+            # may raise nearly anything, from an AttributeError to a TypeError), so we will parse the file and
+            # overwrite the entry
+            pass
+        parsed = parse()
+        # Write the entry to a temporary file first, so that concurrent readers never see a partial entry
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_directory, suffix='.tmp', delete=False) as temporary_file:
+                pickle.dump(parsed, temporary_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_file.name, path_to_cache_file)
+        except OSError:
+            pass  # The cache is merely an optimization, so we carry on if it cannot be written
+        return parsed
 
     @classmethod
-    def _parse_action_definitions(cls, action_definitions):
-        """Parse the given action definitions."""
-        action_list = []
-        variables_in_this_scope = {}  # Updated by cls._parse_variable_or_noun()
-        for action_definition in action_definitions:
-            if not action_definition.strip():
-                continue
-            if config.VERBOSITY >= 2:
-                print(f"Parsing action definition: {action_definition}")
-            components = action_definition.split()
-            if len(components) == 3:
-                raw_subject, raw_relation, raw_object = components
-            else:
-                raw_subject, raw_relation = components
-                raw_object = None
-            action_subject, variables_in_this_scope = cls._parse_variable_or_noun(
-                reference=raw_subject,
-                variables_in_this_scope=variables_in_this_scope
-            )
-            try:
-                if action_subject.name == 'X':
-                    x = action_subject
-                elif action_subject.name == 'Y':
-                    y = action_subject
-            except AttributeError:
-                pass
-            relation, left_directed = cls._parse_relation(reference=raw_relation)
-            if raw_object:
-                action_object, variables_in_this_scope = cls._parse_variable_or_noun(
-                    reference=raw_object,
-                    variables_in_this_scope=variables_in_this_scope
-                )
-            else:
-                action_object = None
-            if left_directed:
-                action_subject, action_object = action_object, action_subject
-            action = Action(
-                action_subject=action_subject,
-                action_relation=relation,
-                action_object=action_object,
-                raw_definition=action_definition
-            )
-            action_list.append(action)
-        return action_list
+    def _source_digest(cls):
+        """Return a hash of the source of the modules that determine what parsing a rules file produces."""
+        if cls._SOURCE_DIGEST is None:
+            digest = hashlib.sha256()
+            for module_name in cls.SOURCE_MODULES:
+                with open(sys.modules[module_name].__file__, 'rb') as source_file:
+                    digest.update(source_file.read())
+            cls._SOURCE_DIGEST = digest.hexdigest()
+        return cls._SOURCE_DIGEST
 
     @classmethod
-    def _parse_subrule_definitions(cls, subrule_definitions):
-        """Parse the given subrule definitions."""
-        subrules = []
-        for subrule_definition in subrule_definitions:
-            if not subrule_definition.strip():
-                continue
-            if config.VERBOSITY >= 2:
-                print(f"Parsing subrule: {subrule_definition}")
-            raw_probability_increments, raw_sentence_list = subrule_definition.split(':')
-            # Parse the probability increments ("true value" and "false value")
-            raw_true_value, raw_false_value = raw_probability_increments.split(',')
-            true_value = float(raw_true_value)
-            false_value = float(raw_false_value)
-            # Parse the subrule conditions ("sentence list")
-            variables_in_this_scope = {}
-            sentence_list = []
-            sentence_list_components = re.findall('\[[^\]]*\]|\([^\)]*\)|\"[^\"]*\"|\S+', raw_sentence_list)
-            for component in sentence_list_components:
-                if component.strip() in ('/', '&'):
-                    sentence_list.append(component.strip())
-                    continue
-                new_sentence_sublist, variables_in_this_scope = cls._parse_sentence(
-                    sentence_definition=component,
-                    variables_in_this_scope=variables_in_this_scope
-                )
-                sentence_list.append(new_sentence_sublist)
-            subrule_object = Subrule(
-                true_value=true_value,
-                false_value=false_value,
-                sentence_list=sentence_list,
-                raw_definition=subrule_definition
-            )
-            subrules.append(subrule_object)
-        return subrules
+    def _parse_and_analyze_rules(cls, path_to_rules_file, threshold, events):
+        """Parse the given rules file, returning Rule objects analyzed under the given short-circuit threshold."""
+        rule_objects = cls._parse_rules(path_to_rules_file=path_to_rules_file, events=events)
+        # Memoizes analyses of the sentence lists analyzed so far, by the kind of analysis and the canonical form
+        # of the sentence list, since identical sentence lists recur across a rule set
+        memo = {}
+        for rule_object in rule_objects:
+            cls._analyze_rule(rule=rule_object, threshold=threshold, memo=memo)
+        return rule_objects
+
+    @classmethod
+    def _parse_rules(cls, path_to_rules_file, events):
+        """Parse the given rules file, returning uncompiled Rule objects, and emitting events to the given log."""
+        with open(path_to_rules_file) as rules_file:
+            lines = rules_file.readlines()
+        with paused_garbage_collection():
+            return RuleParser(lines=lines, source_name=path_to_rules_file, events=events).parse()
 
     @staticmethod
     def _parse_variable_or_noun(reference, variables_in_this_scope):
         """Parse the given reference to return either a Variable object or string (noun, i.e., a literal)."""
+        if reference[0] not in 'XY#':
+            return reference, variables_in_this_scope  # Most references are nouns, which need no further parsing
         # Parse for X or Y, which are reserved names
         if reference in ('X', 'Y'):
             variable_name = reference
@@ -211,87 +216,630 @@ class Compiler:
         return relation_object, left_directed_relation
 
     @classmethod
-    def _parse_sentence(cls, sentence_definition, variables_in_this_scope):
-        """Parse the given sentence definition."""
-        sentence_sublist = []
-        # If it's a time sentence, parse it accordingly
-        if sentence_definition.startswith('[') and sentence_definition.endswith(']'):
-            # "Boolean time sentence" in the form of a "time operand list"
-            for component in re.split("(/|&)", sentence_definition[1:-1]):
-                if component in ("&", "/"):
-                    sentence_sublist.append(component)
-                    continue
-                time_operand = component.strip()  # Ex: "T < 1700" or "T != 1400"
-                _time_literal, operator, time_value = time_operand.split()
-                time_sentence_object = TimeSentence(operator=operator, time_value=time_value)
-                sentence_sublist.append(time_sentence_object)
-            return sentence_sublist, variables_in_this_scope
-        # It's not a time sentence, so move on
-        components = sentence_definition[1:-1].split()  # Strip off parentheses
-        if len(components) == 2:
-            raw_subject, _raw_relations = components
-            sentence_subject, variables_in_this_scope = cls._parse_variable_or_noun(
-                reference=raw_subject,
-                variables_in_this_scope=variables_in_this_scope
+    def _analyze_rule(cls, rule, threshold, memo):
+        """Determine how the given rule is to be evaluated, given the short-circuit threshold, memoizing analyses
+        of its sentence lists in the given dict.
+
+        What is determined here depends only on the definition of the rule and the threshold, and is recorded as
+        plain data (names rather than symbols, and subrule indices rather than callables), so that it may be
+        cached on disk along with the parsed rule; Compiler._compile_rule() then builds the callables from it.
+        """
+        for subrule in rule.subrules:
+            cls._analyze_subrule(subrule=subrule, header_names=rule.header_references, memo=memo)
+            # For each increment, determine up front whether it short-circuits and, if so, to what outcome
+            subrule.short_circuits = (
+                subrule.true_value > 0 if abs(subrule.true_value) >= threshold else None,
+                subrule.false_value > 0 if abs(subrule.false_value) >= threshold else None
             )
-            raw_relations = []
-            for part in re.split("(/|&)", _raw_relations):
-                if part:
-                    raw_relations.append(part)
-            for raw_relation in raw_relations:
-                if not raw_relation.strip():
-                    continue
-                if raw_relation in ("&", "/"):
-                    sentence_sublist.append(raw_relation)
-                    continue
-                sentence_relation, left_directed = cls._parse_relation(reference=raw_relation)
-                sentence = Sentence(
-                    sentence_subject=sentence_subject,
-                    sentence_relation=sentence_relation,
-                    sentence_object=None
-                )
-                sentence_sublist.append(sentence)
-            return sentence_sublist, variables_in_this_scope
-        raw_subject, *_raw_relations, raw_object = components
-        sentence_subject, variables_in_this_scope = cls._parse_variable_or_noun(
-            reference=raw_subject,
-            variables_in_this_scope=variables_in_this_scope
+        preemptable = cls._preemptable_outcomes(rule=rule)
+        cls._compile_short_circuit_plan(rule=rule)
+        cls._compile_pruning_checks(rule=rule)
+        cls._compile_active_intervals(rule=rule, preemptable=preemptable, memo=memo)
+        cls._compile_rule_domain_constraints(rule=rule, preemptable=preemptable, memo=memo)
+
+    @staticmethod
+    def _preemptable_outcomes(rule):
+        """Return, for each subrule of the given (analyzed) rule, the outcomes that a short-circuit subrule
+        preceding it in the file could yield.
+        """
+        preemptable = []
+        possible_outcomes = set()
+        for subrule in rule.subrules:
+            preemptable.append(frozenset(possible_outcomes))
+            possible_outcomes |= set(subrule.short_circuits) - {None}
+        return tuple(preemptable)
+
+    @classmethod
+    def _compile_rule(cls, rule, settings):
+        """Emit a native callable that returns whether the given (analyzed) rule fires with a given variable binding.
+
+        The callable has the short-circuit thresholds for each subrule built in, and it consumes a random
+        number only if no short-circuit is reached, just as an interpretation of the rule would. Note that
+        it may evaluate the subrules out of order (see Compiler._compile_short_circuit_plan()). Everything
+        else the callable depends on, including the random-number generator, is taken from the universe.
+        """
+        # Resolve the nouns, relations, and classes referenced in the rule header to their symbols
+        rule.header_domains = tuple(cls._resolve_domain(reference) for reference in rule.header_references.values())
+        for action in rule.action_list:
+            action.relation.symbol = SYMBOL_TABLE.encode(action.relation.name)
+        for subrule in rule.subrules:
+            cls._compile_subrule(subrule=subrule)
+        evaluation_plan = tuple(
+            (subrule.holds, subrule.true_value, subrule.short_circuits[0],
+             subrule.false_value, subrule.short_circuits[1])
+            for subrule in rule.subrules
         )
-        sentence_object, variables_in_this_scope = cls._parse_variable_or_noun(
-            reference=raw_object,
-            variables_in_this_scope=variables_in_this_scope
+        # Build the short-circuit plan and the pruning checks from the subrule indices given in the analysis
+        entries = [
+            (i, holds, true_value_short_circuit, false_value_short_circuit)
+            for i, (holds, _, true_value_short_circuit, _, false_value_short_circuit) in enumerate(evaluation_plan)
+        ]
+        rule.short_circuit_plan = [entries[i] for i in rule.short_circuit_order]
+        rule.short_circuit_statistics = {i: [0, 0] for i in rule.short_circuit_order}
+        rule.pruning_checks = tuple(tuple(entries[i] for i in indices) for indices in rule.pruning_check_indices)
+        rule.domain_constraints = tuple(
+            cls._compile_constraints(specifications=specifications)
+            for specifications in rule.constraint_specifications
         )
-        # It's a sentence including multiple relations. We're going to construct multiple Sentence objects
-        # to make it easier to evaluate them later on.
-        raw_relations = []
-        for raw_relation in _raw_relations:
-            for part in re.split("(/|&)", raw_relation):
-                if part:
-                    raw_relations.append(part)
-        for raw_relation in raw_relations:
-            if not raw_relation.strip():
+        # Record what the rule reads, so that incremental evaluation can tell when a test may be skipped
+        rule.relations_read = set()
+        rule.time_conditions = []
+        rule.time_dependent = False
+        for subrule in rule.subrules:
+            for sentence in cls._flatten_sentence_list(sentence_list=subrule.sentence_list):
+                if isinstance(sentence, TimeSentence):
+                    rule.time_conditions.append(cls._compile_time_sentence(time_sentence=sentence))
+                else:
+                    rule.relations_read.add(sentence.relation.symbol)
+                    if sentence.relation.duration_modifier_operator:
+                        rule.time_dependent = True
+        rule.time_conditions = tuple(rule.time_conditions)
+        short_circuit_statistics = rule.short_circuit_statistics
+        preemptable = cls._preemptable_outcomes(rule=rule)
+        number_of_subrules = len(evaluation_plan)
+
+        def triggered(universe, bindings):
+            """Return whether the rule fires with the given variable binding.
+
+            The short-circuit subrules are evaluated first, in the order of the rule's short-circuit plan; since
+            the first short-circuit in file order decides the outcome, a short-circuit reached out of order is
+            returned only once no earlier subrule could preempt it with the opposite outcome. If no short-circuit
+            is reached, the increments are summed in file order, so that the probability is exactly the one an
+            in-order interpretation of the rule would produce.
+            """
+            events = universe.events
+            trace = events.level >= TRACE
+            adaptive = universe.settings.adaptive_subrule_ordering
+            if trace:
+                events.emit('binding', bindings=decode_binding(bindings))
+            evaluations = [None] * number_of_subrules
+            earliest_short_circuit_index = number_of_subrules
+            outcome = None
+            for i, holds, true_value_short_circuit, false_value_short_circuit in rule.short_circuit_plan:
+                if i > earliest_short_circuit_index:
+                    continue  # Any short-circuit here would be preempted by the one already reached
+                evaluations[i] = holds(universe, bindings)
+                short_circuit = true_value_short_circuit if evaluations[i] else false_value_short_circuit
+                if adaptive:
+                    short_circuit_statistics[i][0] += 1
+                if short_circuit is None:
+                    continue
+                if adaptive:
+                    short_circuit_statistics[i][1] += 1
+                earliest_short_circuit_index, outcome = i, short_circuit
+                if preemptable[i] <= {short_circuit}:
+                    break
+            if outcome is not None:
+                universe.profile.rules[rule].subrules[earliest_short_circuit_index].short_circuits += 1
+                if trace:
+                    events.emit('short_circuit', outcome=outcome)
+                return outcome
+            probability = 0.0
+            if trace:
+                events.emit('probability', probability=probability, initial=True)
+            for i, (holds, true_value, _, false_value, _) in enumerate(evaluation_plan):
+                evaluation = evaluations[i]
+                if evaluation is None:
+                    evaluation = holds(universe, bindings)
+                probability += true_value if evaluation else false_value
+                if trace:
+                    events.emit('probability', probability=probability, initial=False)
+            universe.random_draws += 1
+            if universe.random.random() < probability:
+                if trace:
+                    events.emit('draw', triggered=True)
+                return True
+            if trace:
+                events.emit('draw', triggered=False)
+            return False
+
+        rule.triggered = triggered
+        if settings.vectorized_evaluation:
+            from vectorized import VectorizedRule  # NumPy is required only under vectorized evaluation
+            rule.vectorized = VectorizedRule(rule=rule)
+
+    @staticmethod
+    def _compile_short_circuit_plan(rule):
+        """Order the subrules of the given rule that may short-circuit, cheapest first.
+
+        A subrule's static cost is estimated from the number of variables local to it, each of which
+        multiplies the number of bindings under which its sentence list must be evaluated, and then from
+        the number of sentences in it. Subrules of equal cost keep their file order.
+        """
+        short_circuit_order = []
+        for i, subrule in enumerate(rule.subrules):
+            if subrule.short_circuits == (None, None):
+                continue
+            short_circuit_order.append(i)
+            local_names = [name for name in subrule.references if name not in rule.header_references]
+            number_of_sentences = len(Compiler._flatten_sentence_list(sentence_list=subrule.sentence_list))
+            subrule.static_cost = (len(local_names), number_of_sentences)
+        short_circuit_order.sort(key=lambda i: rule.subrules[i].static_cost)
+        rule.short_circuit_order = tuple(short_circuit_order)
+
+    @classmethod
+    def _compile_active_intervals(cls, rule, preemptable, memo):
+        """Determine the intervals of plot time outside of which the time sentences alone abandon the given rule.
+
+        A subrule made up of time sentences only (e.g., "0, -10: [T < 1720]") holds or not regardless of the
+        binding, so at a plot time at which it short-circuits to an abandon, and no subrule preceding it in the
+        file could short-circuit to a trigger, the rule is abandoned under every binding, without a random draw.
+        Since each time sentence compares the plot time to a constant, the intervals at which such a subrule
+        holds are worked out from those constants directly, and memoized in the given dict by canonical form.
+        """
+        abandoned_intervals = ()
+        for i, subrule in enumerate(rule.subrules):
+            true_value_short_circuit, false_value_short_circuit = subrule.short_circuits
+            if False not in subrule.short_circuits or True in preemptable[i]:
+                continue
+            sentences = cls._flatten_sentence_list(sentence_list=subrule.sentence_list)
+            if not sentences or not all(isinstance(sentence, TimeSentence) for sentence in sentences):
+                continue
+            key = ('holding intervals', subrule.canonical_form)
+            try:
+                holding_intervals = memo[key]
+            except KeyError:
+                holding_intervals = memo[key] = cls._time_sentence_list_intervals(sentence_list=subrule.sentence_list)
+            if true_value_short_circuit is False:
+                abandoned_intervals = cls._unite_intervals(abandoned_intervals, holding_intervals)
+            if false_value_short_circuit is False:
+                abandoned_intervals = cls._unite_intervals(
+                    abandoned_intervals,
+                    cls._complement_intervals(holding_intervals)
+                )
+        rule.active_intervals = cls._complement_intervals(abandoned_intervals)
+
+    @classmethod
+    def _time_sentence_list_intervals(cls, sentence_list):
+        """Return the intervals of plot time at which the given sentence list, made up of time sentences only, holds.
+
+        Like every set of intervals handled by the compiler, these are given as sorted (start, stop) pairs, none of
+        which overlap or abut, where start is included and stop is not.
+        """
+        everywhere = ((float('-inf'), float('inf')),)
+        intervals = ()
+        conjunction = everywhere  # The intervals at which the conjunction at hand holds
+        for component in sentence_list:
+            if isinstance(component, str):
+                if component == '/':
+                    intervals = cls._unite_intervals(intervals, conjunction)
+                    conjunction = everywhere
                 continue
-            if raw_relation in ("&", "/"):
-                sentence_sublist.append(raw_relation)
+            if isinstance(component, list):
+                term = cls._time_sentence_list_intervals(sentence_list=component)
+            else:
+                term = cls._time_sentence_intervals(time_sentence=component)
+            conjunction = cls._intersect_intervals(conjunction, term)
+        return cls._unite_intervals(intervals, conjunction)
+
+    @staticmethod
+    def _time_sentence_intervals(time_sentence):
+        """Return the intervals of plot time at which the given time sentence holds, plot times being integers."""
+        time_value = time_sentence.time_value
+        if time_sentence.operator == '==':
+            return (time_value, time_value + 1),
+        if time_sentence.operator == '!=':
+            return (float('-inf'), time_value), (time_value + 1, float('inf'))
+        if time_sentence.operator == '<':
+            return (float('-inf'), time_value),
+        if time_sentence.operator == '>':
+            return (time_value + 1, float('inf')),
+        raise Exception(f"Unsupported operator in time sentence: {time_sentence}")
+
+    @staticmethod
+    def _unite_intervals(intervals, other_intervals):
+        """Return the union of the given sets of intervals."""
+        union = []
+        for start, stop in sorted(intervals + other_intervals):
+            if union and start <= union[-1][1]:
+                union[-1] = (union[-1][0], max(union[-1][1], stop))
+            else:
+                union.append((start, stop))
+        return tuple(union)
+
+    @staticmethod
+    def _intersect_intervals(intervals, other_intervals):
+        """Return the intersection of the given sets of intervals."""
+        intersection = []
+        for start, stop in intervals:
+            for other_start, other_stop in other_intervals:
+                if max(start, other_start) < min(stop, other_stop):
+                    intersection.append((max(start, other_start), min(stop, other_stop)))
+        return tuple(sorted(intersection))
+
+    @staticmethod
+    def _complement_intervals(intervals):
+        """Return the complement of the given set of intervals."""
+        complement = []
+        start = float('-inf')
+        for interval_start, interval_stop in intervals:
+            if start < interval_start:
+                complement.append((start, interval_start))
+            start = interval_stop
+        if start < float('inf'):
+            complement.append((start, float('inf')))
+        return tuple(complement)
+
+    @classmethod
+    def _compile_rule_domain_constraints(cls, rule, preemptable, memo):
+        """Determine the constraints on the candidate bindings of the header variables of the given rule.
+
+        A subrule that short-circuits to an abandon if its sentence list fails (e.g., "0, -10: (GEORGE INVITES X)"),
+        or else if it holds (e.g., "-10, 0: (X DEAD)"), and that no subrule preceding it in the file could preempt
+        with a trigger, abandons the rule without a random draw under every binding for which the list fails (or
+        holds). The candidates under which such a subrule is certain to do so may thus be dropped before the
+        bindings are enumerated, without altering the outcome of the test.
+        """
+        header_variable_names = {
+            name for name, reference in rule.header_references.items() if isinstance(reference, Variable)
+        }
+        constraints = {name: [] for name in rule.header_references}
+        for i, subrule in enumerate(rule.subrules):
+            if True in preemptable[i]:
                 continue
-            sentence_relation, left_directed = cls._parse_relation(reference=raw_relation)
-            if left_directed:  # Swap sentence and object due to left-directed relation
-                sentence = Sentence(
-                    sentence_subject=sentence_object,
-                    sentence_relation=sentence_relation,
-                    sentence_object=sentence_subject
+            true_value_short_circuit, false_value_short_circuit = subrule.short_circuits
+            local_variable_names = {
+                name for name, reference in subrule.references.items()
+                if isinstance(reference, Variable) and name not in rule.header_references
+            }
+            abandoning_evaluations = []
+            if false_value_short_circuit is False:
+                abandoning_evaluations.append(False)
+            # A sentence list fails outright under a binding if the domain of a variable local to it is empty, so
+            # one of its sentences holding only ensures that it holds if it has no local variables
+            if true_value_short_circuit is False and not local_variable_names:
+                abandoning_evaluations.append(True)
+            for abandoning_evaluation in abandoning_evaluations:
+                subrule_constraints = cls._compile_domain_constraints(
+                    subrule=subrule,
+                    holds=not abandoning_evaluation,
+                    target_names=header_variable_names,
+                    variable_names=header_variable_names | local_variable_names,
+                    bound_names=(),
+                    memo=memo
                 )
+                for name, name_constraints in subrule_constraints.items():
+                    constraints[name] += name_constraints
+        rule.constraint_specifications = tuple(tuple(constraints[name]) for name in rule.header_references)
+
+    @classmethod
+    def _compile_domain_constraints(cls, subrule, holds, target_names, variable_names, bound_names, memo):
+        """Return the constraints on the candidate bindings of the given target names that are implied by the
+        given subrule's sentence list holding (or failing, if holds is False), as a dict mapping those names to
+        lists of (required, relation, position, opposite, bound) specifications.
+
+        Each constraint stems from a sentence that must hold (or fail) for the list to, and is compiled into a
+        (required, fillers) pair by Compiler._compile_constraints(), where fillers is a callable that takes a
+        universe and a binding of the given bound names and returns the set of nouns that a candidate must be
+        among, if required, or must not be among, otherwise (see Universe.fillers()). A reference to any other
+        variable name stands for any symbol, and so may only widen a set of nouns a candidate must be among.
+        The disjunctive normal form of the sentence list is memoized in the given dict, by the subrule's canonical
+        form; if it has too many disjuncts, no constraints are derived.
+        """
+        key = ('disjunctive normal form', subrule.canonical_form)
+        try:
+            disjuncts = memo[key]
+        except KeyError:
+            disjuncts = memo[key] = cls._disjunctive_normal_form(sentence_list=subrule.sentence_list)
+        if disjuncts is None:
+            return {}
+        if holds:
+            # A sentence conjoined in every disjunct must hold, as must its negation if its relation is negated
+            sentences = [
+                sentence for sentence in disjuncts[0]
+                if isinstance(sentence, Sentence) and all(sentence in disjunct for disjunct in disjuncts[1:])
+            ]
+        else:
+            # A sentence making up a disjunct on its own must fail
+            sentences = [
+                disjunct[0] for disjunct in disjuncts if len(disjunct) == 1 and isinstance(disjunct[0], Sentence)
+            ]
+        constraints = {}
+        for sentence in sentences:
+            required = holds != sentence.relation.negate_field
+            for position, reference, opposite_reference in (
+                ('subject', sentence.subject, sentence.object),
+                ('object', sentence.object, sentence.subject)
+            ):
+                name = reference.name if isinstance(reference, Variable) else reference
+                if name is None or name not in target_names:
+                    continue
+                if isinstance(opposite_reference, Variable):
+                    opposite_name = opposite_reference.name
+                else:
+                    opposite_name = opposite_reference
+                if opposite_reference is None:
+                    opposite = None  # The sentence has no object
+                elif opposite_name in bound_names:
+                    opposite = opposite_name  # Looked up in the binding
+                elif opposite_name is None or opposite_name in variable_names:
+                    opposite = ANY
+                else:
+                    opposite = opposite_name  # A noun
+                if opposite is ANY and not (holds and required):
+                    continue
+                specification = (required, sentence.relation, position, opposite, opposite_name in bound_names)
+                constraints.setdefault(name, []).append(specification)
+        return constraints
+
+    @classmethod
+    def _compile_constraints(cls, specifications):
+        """Return the domain constraints given by the given specifications, as (required, fillers) pairs."""
+        return tuple(
+            (required, cls._compile_fillers(relation=relation, position=position, opposite=opposite, bound=bound))
+            for required, relation, position, opposite, bound in specifications
+        )
+
+    @staticmethod
+    def _compile_fillers(relation, position, opposite, bound):
+        """Return a callable returning the nouns in the given position of the triples satisfying the given relation.
+
+        The opposite position is given as a noun, None, or ANY, or else, if bound, as the name it is bound to.
+        """
+        if isinstance(opposite, str) and not bound:
+            opposite = SYMBOL_TABLE.encode(opposite)
+        if bound:
+            def fillers(universe, binding):
+                """Return the nouns filling the position, given the binding of the name in the opposite position."""
+                return universe.fillers(relation=relation, position=position, other=binding[opposite])
+        else:
+            def fillers(universe, binding):
+                """Return the nouns filling the position, given the fixed symbol in the opposite position."""
+                return universe.fillers(relation=relation, position=position, other=opposite)
+
+        return fillers
+
+    @classmethod
+    def _disjunctive_normal_form(cls, sentence_list):
+        """Return the given sentence list as a list of disjuncts, each a list of the (time) sentences it conjoins, or
+        None if it expands into more than Compiler.DISJUNCTIVE_NORMAL_FORM_LIMIT disjuncts.
+        """
+        disjuncts = []
+        conjunction = [[]]  # The disjunctive normal form of the conjunction at hand
+        for component in sentence_list:
+            if isinstance(component, str):
+                if component == '/':
+                    disjuncts += conjunction
+                    conjunction = [[]]
+                continue
+            if isinstance(component, list):
+                term = cls._disjunctive_normal_form(sentence_list=component)
+                if term is None:
+                    return None
+            else:
+                term = [[component]]
+            if len(disjuncts) + len(conjunction) * len(term) > cls.DISJUNCTIVE_NORMAL_FORM_LIMIT:
+                return None
+            conjunction = [left + right for left in conjunction for right in term]
+        return disjuncts + conjunction
+
+    @staticmethod
+    def _compile_pruning_checks(rule):
+        """Determine which short-circuit subrules may be used to prune partial bindings for the given rule.
+
+        A partial binding may be pruned when, scanning the subrules in order, an abandon is reached before
+        any subrule that might trigger. To that end, we compile for each number of bound header references
+        the short-circuit subrules that become evaluable at that point and lie before the first subrule that
+        might trigger but that cannot be evaluated yet (by index); subrules checked at an earlier depth are not
+        checked again.
+        """
+        variable_ordering = list(rule.header_references)
+        # Determine how many header references must be bound before each subrule can be evaluated
+        evaluable_depths = []
+        for subrule in rule.subrules:
+            evaluable_depth = 0
+            for i, name in enumerate(variable_ordering):
+                if name in subrule.references:
+                    evaluable_depth = i + 1
+            evaluable_depths.append(evaluable_depth)
+        pruning_check_indices = []
+        previous_scan_end = 0
+        for depth in range(len(variable_ordering)):
+            # Scanning stops at the first subrule that might trigger but cannot be evaluated at this depth
+            scan_end = len(rule.subrules)
+            for i, subrule in enumerate(rule.subrules):
+                if evaluable_depths[i] > depth and True in subrule.short_circuits:
+                    scan_end = i
+                    break
+            checks = []
+            for i in range(scan_end):
+                if rule.subrules[i].short_circuits == (None, None):
+                    continue
+                if evaluable_depths[i] > depth:
+                    continue
+                if depth > 0 and evaluable_depths[i] <= depth - 1 and i < previous_scan_end:
+                    continue  # Already checked at the previous depth
+                checks.append(i)
+            pruning_check_indices.append(tuple(checks))
+            previous_scan_end = scan_end
+        rule.pruning_check_indices = tuple(pruning_check_indices)
+
+    @classmethod
+    def _analyze_subrule(cls, subrule, header_names, memo):
+        """Collect the references in the given subrule's sentence list, and the constraints on the candidate bindings
+        of the variables local to it, given the header names of its rule, which are bound whenever it is evaluated
+        (see Compiler._compile_domain_constraints() on the given memo).
+        """
+        # The string representations of the parsed sentences spell out every class name, relation modifier,
+        # and operator, so identical sentence lists always share a canonical form, which is interned so that
+        # the subrules sharing it share a single string
+        subrule.canonical_form = sys.intern(repr(subrule.sentence_list))
+        # Collect the references in the order in which their candidate bindings will be enumerated: the
+        # subjects of all sentences, then their objects
+        sentences = [
+            sentence for sentence in cls._flatten_sentence_list(sentence_list=subrule.sentence_list)
+            if isinstance(sentence, Sentence)
+        ]
+        subrule.references = {}
+        for reference in [sentence.subject for sentence in sentences] + [sentence.object for sentence in sentences]:
+            if isinstance(reference, Variable):
+                subrule.references[reference.name] = reference
+            elif reference:
+                subrule.references[reference] = reference
+        local_variable_names = {
+            name for name, reference in subrule.references.items()
+            if isinstance(reference, Variable) and name not in header_names
+        }
+        subrule.constraint_specifications = {
+            name: tuple(specifications) for name, specifications in cls._compile_domain_constraints(
+                subrule=subrule,
+                holds=True,
+                target_names=local_variable_names,
+                variable_names=local_variable_names,
+                bound_names=header_names,
+                memo=memo
+            ).items()
+        }
+
+    @classmethod
+    def _compile_subrule(cls, subrule):
+        """Emit a native callable that returns whether the given (analyzed) subrule's sentence list holds under a
+        binding, and resolve the domains of, and constraints on, the candidate bindings of its references.
+        """
+        subrule.condition = cls._compile_sentence_list(sentence_list=subrule.sentence_list)
+        subrule.domains = {name: cls._resolve_domain(reference) for name, reference in subrule.references.items()}
+        subrule.domain_constraints = {
+            name: cls._compile_constraints(specifications=specifications)
+            for name, specifications in subrule.constraint_specifications.items()
+        }
+
+    @staticmethod
+    def _resolve_domain(reference):
+        """Return the domain of the candidate bindings of the given reference, as given in Rule.header_domains."""
+        if isinstance(reference, Variable):
+            class_symbol = SYMBOL_TABLE.encode(reference.class_name) if reference.class_name else None
+            return class_symbol, None
+        return None, SYMBOL_TABLE.encode(reference)
+
+    @staticmethod
+    def _flatten_sentence_list(sentence_list):
+        """Return the sentences and time sentences in the given sentence list, dropping its operators."""
+        sentences = []
+        for component in sentence_list:
+            if isinstance(component, list):
+                sentences += [sentence for sentence in component if not isinstance(sentence, str)]
+        return sentences
+
+    @classmethod
+    def _compile_sentence_list(cls, sentence_list):
+        """Return a callable evaluating the given sentence list, with '&' binding more tightly than '/'."""
+        disjuncts = [[]]
+        for component in sentence_list:
+            if isinstance(component, str):
+                if component == '/':
+                    disjuncts.append([])
+                continue
+            if isinstance(component, list):
+                disjuncts[-1].append(cls._compile_sentence_list(sentence_list=component))
+            elif isinstance(component, TimeSentence):
+                disjuncts[-1].append(cls._compile_time_sentence(time_sentence=component))
             else:
-                sentence = Sentence(
-                    sentence_subject=sentence_subject,
-                    sentence_relation=sentence_relation,
-                    sentence_object=sentence_object
+                disjuncts[-1].append(cls._compile_sentence(sentence=component))
+        conjunctions = tuple(cls._compile_conjunction(terms=tuple(terms)) for terms in disjuncts)
+        if len(conjunctions) == 1:
+            return conjunctions[0]
+
+        def disjunction(universe, binding):
+            """Return whether any of the conjunctions holds."""
+            for conjunction in conjunctions:
+                if conjunction(universe, binding):
+                    return True
+            return False
+
+        return disjunction
+
+    @staticmethod
+    def _compile_conjunction(terms):
+        """Return a callable evaluating the conjunction of the given compiled terms."""
+        if len(terms) == 1:
+            return terms[0]
+
+        def conjunction(universe, binding):
+            """Return whether all the terms hold."""
+            for term in terms:
+                if not term(universe, binding):
+                    return False
+            return True
+
+        return conjunction
+
+    @staticmethod
+    def _compile_sentence(sentence):
+        """Return a callable evaluating the given sentence, with its binding keys resolved up front."""
+        # Note that literals are looked up in the binding too, since a bare name in a subrule may refer
+        # to a variable introduced in the rule header (e.g., "MURDERER" for "#MURDERER.PEOPLE")
+        subject_key = sentence.subject.name if isinstance(sentence.subject, Variable) else sentence.subject
+        object_key = sentence.object.name if isinstance(sentence.object, Variable) else sentence.object
+        relation = sentence.relation
+        relation.symbol = SYMBOL_TABLE.encode(relation.name)
+        has_object = sentence.object is not None  # Note that an anonymous variable ("#.ROOMS") has the key None
+
+        def evaluate_sentence(universe, binding):
+            """Return whether the sentence holds, given the binding and the current state of the universe."""
+            ground_subject = binding[subject_key]
+            ground_object = binding[object_key] if has_object else None
+            evaluation = universe.match(ground_subject, relation, ground_object)
+            if universe.events.level >= TRACE:
+                universe.events.emit(
+                    'sentence',
+                    evaluation=evaluation,
+                    subject=SYMBOL_TABLE.decode(ground_subject),
+                    relation=str(relation),
+                    object=SYMBOL_TABLE.decode(ground_object)
                 )
-            sentence_sublist.append(sentence)
-        return sentence_sublist, variables_in_this_scope
+            return evaluation
+
+        return evaluate_sentence
 
     @classmethod
-    def parse_lexical_expressions_file(cls, path_to_lexical_expressions_file):
+    def _compile_time_sentence(cls, time_sentence):
+        """Return a callable evaluating the given time sentence against the current time frame."""
+        try:
+            comparison = cls.TIME_SENTENCE_OPERATORS[time_sentence.operator]
+        except KeyError:
+            raise Exception(f"Unsupported operator in time sentence: {time_sentence}")
+        time_value = time_sentence.time_value
+
+        def evaluate_time_sentence(universe, binding):
+            """Return whether the time sentence holds, given the current time frame of the universe."""
+            return comparison(universe.time, time_value)
+
+        return evaluate_time_sentence
+
+    @classmethod
+    def parse_lexical_expressions_file(cls, path_to_lexical_expressions_file, settings=None):
+        """Parse the given lexical-expressions file, consulting the on-disk cache specified in the given settings."""
+        settings = settings or config.Settings()
+        return cls._parse_with_cache(
+            path_to_file=path_to_lexical_expressions_file,
+            cache_directory=settings.rules_cache_directory,
+            parse=lambda: cls._parse_lexical_expressions(
+                path_to_lexical_expressions_file=path_to_lexical_expressions_file
+            )
+        )
+
+    @classmethod
+    def _parse_lexical_expressions(cls, path_to_lexical_expressions_file):
         """Parse the given lexical-expressions file."""
         lexical_expressions_mapping = {}
         # Read in the lexical-expressions file
@@ -313,3 +861,386 @@ class Compiler:
             lexical_expressions = lexical_expressions.replace(', ', ',').split(',')
             lexical_expressions_mapping[noun_or_relation] = lexical_expressions
         return lexical_expressions_mapping
+
+
+class RuleParser:
+    """A single-pass lexer and recursive-descent parser for rules files in Klein's (1971) rule language.
+
+    The grammar is as follows, where a reference, relation, or time value is a run of tokens with no
+    whitespace between them (e.g., "Y.MEN:1" or "≠WINS=0"), and where '/' and '&' may also separate the
+    relations of a sentence:
+
+        rules file      ::= ('$RULE' rule)*
+        rule            ::= action (',' action)* (';' subrule?)*
+        action          ::= reference relation reference?
+        subrule         ::= number ',' number ':' (sentence | time sentences | '/' | '&')*
+        sentence        ::= '(' reference relation+ reference? ')'
+        time sentences  ::= '[' 'T' operator time value (('/' | '&') 'T' operator time value)* ']'
+
+    Lines whose first non-whitespace character is '%' are comments. Everything is case-insensitive, the
+    symbols '≠' and '←' are read as '!=' and '<-', and asterisks are ignored (since to our current knowledge
+    they do nothing). The raw definitions recorded for rules, actions, and subrules are their source text,
+    uppercased and with all whitespace reduced to single spaces.
+
+    Rules files may hold tens of thousands of rules, so rather than building an object for each token, the
+    lexer produces parallel sequences of token texts and end offsets, both of them with C-level iterators; the
+    parser then dispatches on the text of each token, which for punctuation and the '$RULE' keyword is also its
+    kind, any other token being a word. Once the parser has found the extent of an action or sentence, it splits
+    the source text of that extent into its whitespace-separated components in one go.
+    """
+
+    # Matches the whitespace preceding a token, and then the token itself; note that ':' is a token of its own,
+    # though it may occur in a reference (e.g., "Y.MEN:1"), since it also separates the probability increments
+    # from the sentence list
+    TOKEN_PATTERN = re.compile(r'(\s*)([;,:()\[\]/&"]|[^\s;,:()\[\]/&"]+)')
+    # The text of the token marking the end of the file, which no other token can have
+    EOF = ''
+    # The texts of the tokens that are not words
+    NON_WORDS = frozenset(';,:()[]/&"') | {'$RULE', EOF}
+    # The tokens that end an action (i.e., anything but words and the colons that may appear in references)
+    ACTION_TERMINATORS = NON_WORDS - {':'}
+    # The tokens that end the body of a sentence (i.e., anything but words and relation separators)
+    SENTENCE_TERMINATORS = NON_WORDS - {'/', '&'}
+    # The tokens that end a subrule, and hence also its sentence list
+    SUBRULE_TERMINATORS = frozenset({';', '$RULE', EOF})
+    # Splits the relations of a sentence on the operators between them, which it keeps
+    RELATION_SEPARATOR_PATTERN = re.compile(r'([/&])')
+    # Maps the opening delimiters of sentences to their closing delimiters
+    SENTENCE_DELIMITERS = {'(': ')', '"': '"'}
+
+    def __init__(self, lines, source_name, events=None):
+        """Initialize a RuleParser object."""
+        self.source_name = source_name  # Used in error messages
+        # The log to which the actions and subrules parsed are emitted, as debug events; by default, none are
+        self.events = events or EventLog(settings=None, sink=NullSink())
+        # The source text, uppercased and with comment lines blanked out and asterisks removed, the offsets at which
+        # its lines start, and a mapping from the indices of lines from which asterisks were removed to the columns
+        # at which they stood (so that error messages give columns in the original lines)
+        self.source_text, self.line_offsets, self.asterisk_columns = self._preprocess(lines=lines)
+        # For each token, its text and the offset at which it ends in the source text
+        self.texts, self.end_offsets = self._tokenize(source_text=self.source_text)
+        self.position = 0  # The index of the next token to be consumed
+        self.relations = {}  # Maps relation references to the Relation objects and directions parsed from them
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Rule Parser ({self.source_name})"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    @staticmethod
+    def _preprocess(lines):
+        """Return the source text for the given lines, the offsets at which its lines start, and the columns of the
+        asterisks removed from each line.
+        """
+        line_offsets = []
+        asterisk_columns = {}
+        offset = 0
+        for i, line in enumerate(lines):
+            line_offsets.append(offset)
+            if line.lstrip().startswith('%'):
+                # Blank out the comment, keeping its line break so that line numbers are preserved
+                line = '\n' if line.endswith('\n') else ''
+                lines[i] = line
+            elif '*' in line:
+                # The asterisks are removed line by line, so that the offsets of the lines are those of the source text
+                asterisk_columns[i] = [column for column, character in enumerate(line) if character == '*']
+                line = line.replace('*', '')
+                lines[i] = line
+            offset += len(line)
+        return ''.join(lines).upper(), line_offsets, asterisk_columns
+
+    @classmethod
+    def _tokenize(cls, source_text):
+        """Return the texts and end offsets of the tokens in the given source text.
+
+        The last token is always an end-of-file token, whose text is empty.
+        """
+        matches = cls.TOKEN_PATTERN.findall(source_text)
+        texts = [match[1] for match in matches]
+        end_offsets = list(itertools.accumulate(map(len, map(''.join, matches))))
+        texts.append(cls.EOF)
+        end_offsets.append(len(source_text.rstrip()))
+        return texts, end_offsets
+
+    def parse(self):
+        """Parse the rules file, returning uncompiled Rule objects; the first syntax error raises an exception."""
+        rule_objects = []
+        while self.texts[self.position] != self.EOF:
+            self._expect('$RULE')
+            rule_objects.append(self._parse_rule())
+        return rule_objects
+
+    def _parse_rule(self):
+        """Parse a rule definition, following its '$RULE' keyword."""
+        start = self.position
+        action_list = self._parse_action_list()
+        subrules = []
+        while self.texts[self.position] == ';':
+            self.position += 1
+            if self.texts[self.position] not in self.SUBRULE_TERMINATORS:
+                subrules.append(self._parse_subrule())
+        if self.texts[self.position] not in ('$RULE', self.EOF):
+            self._error(position=self.position, message=f"Expected ';' but found {self._describe(self.position)}")
+        return Rule(action_list=action_list, subrules=subrules, raw_definition=self._text(start, self.position))
+
+    def _parse_action_list(self):
+        """Parse the comma-separated actions making up the header of a rule."""
+        action_list = []
+        variables_in_this_scope = {}  # Updated by Compiler._parse_variable_or_noun()
+        texts, action_terminators = self.texts, self.ACTION_TERMINATORS
+        while True:
+            start = position = self.position
+            while texts[position] not in action_terminators:
+                position += 1
+            self.position = position
+            if position > start:
+                action = self._parse_action(start=start, variables_in_this_scope=variables_in_this_scope)
+                action_list.append(action)
+            if texts[position] != ',':
+                return action_list
+            self.position += 1
+
+    def _parse_action(self, start, variables_in_this_scope):
+        """Return an Action object, given the index of the first of the tokens just consumed for it."""
+        components = self._source(start, self.position).split()
+        return self._build_action(
+            components=components,
+            variables_in_this_scope=variables_in_this_scope,
+            position=start
+        )
+
+    def _build_action(self, components, variables_in_this_scope, position):
+        """Return an Action object for the given components of its definition, which begins at the given token."""
+        raw_definition = ' '.join(components)
+        if self.events.level >= DEBUG:
+            self.events.emit('parse_action', definition=raw_definition)
+        if len(components) not in (2, 3):
+            message = f"Expected an action of the form 'SUBJECT RELATION [OBJECT]' but found '{raw_definition}'"
+            self._error(position=position, message=message)
+        raw_subject, raw_relation, *raw_object = components
+        action_subject, variables_in_this_scope = Compiler._parse_variable_or_noun(
+            reference=raw_subject,
+            variables_in_this_scope=variables_in_this_scope
+        )
+        relation, left_directed = self._parse_relation(reference=raw_relation, position=position)
+        if raw_object:
+            action_object, variables_in_this_scope = Compiler._parse_variable_or_noun(
+                reference=raw_object[0],
+                variables_in_this_scope=variables_in_this_scope
+            )
+        else:
+            action_object = None
+        if left_directed:
+            action_subject, action_object = action_object, action_subject
+        return Action(
+            action_subject=action_subject,
+            action_relation=relation,
+            action_object=action_object,
+            raw_definition=raw_definition
+        )
+
+    def _parse_subrule(self):
+        """Parse a subrule: its probability increments ("true value" and "false value") and sentence list."""
+        start = self.position
+        true_value = self._parse_probability_increment()
+        self._expect(',')
+        false_value = self._parse_probability_increment()
+        self._expect(':')
+        variables_in_this_scope = {}
+        sentence_list = []
+        texts = self.texts
+        while texts[self.position] not in self.SUBRULE_TERMINATORS:
+            text = texts[self.position]
+            if text in ('/', '&'):
+                self.position += 1
+                sentence_list.append(text)
+            elif text == '[':
+                sentence_list.append(self._parse_time_sentences())
+            elif text in self.SENTENCE_DELIMITERS:
+                sentence_list.append(self._parse_sentence(variables_in_this_scope=variables_in_this_scope))
+            else:
+                self._error(
+                    position=self.position,
+                    message=f"Expected a sentence but found {self._describe(self.position)}"
+                )
+        raw_definition = self._text(start, self.position)
+        if self.events.level >= DEBUG:
+            self.events.emit('parse_subrule', definition=raw_definition)
+        return Subrule(
+            true_value=true_value,
+            false_value=false_value,
+            sentence_list=sentence_list,
+            raw_definition=raw_definition
+        )
+
+    def _parse_probability_increment(self):
+        """Parse a probability increment, returning it as a float."""
+        text = self.texts[self.position]
+        if text in self.NON_WORDS:
+            self._error(position=self.position, message=f"Expected a word but found {self._describe(self.position)}")
+        try:
+            probability_increment = float(text)
+        except ValueError:
+            self._error(position=self.position, message=f"Expected a probability increment but found '{text}'")
+        self.position += 1
+        return probability_increment
+
+    def _parse_time_sentences(self):
+        """Parse a bracketed "Boolean time sentence" in the form of a "time operand list" (e.g., "[T < 1700]")."""
+        self._expect('[')
+        sentence_sublist = []
+        texts, non_words = self.texts, self.NON_WORDS
+        start = position = self.position
+        while True:
+            text = texts[position]
+            if text not in non_words:
+                position += 1
+                continue
+            if text not in ('/', '&', ']'):
+                self._error(position=position, message=f"Expected ']' but found {self._describe(position)}")
+            components = self._source(start, position).split()
+            sentence_sublist.append(self._build_time_sentence(components=components, position=start))
+            position += 1
+            if text == ']':
+                self.position = position
+                return sentence_sublist
+            sentence_sublist.append(text)
+            start = position
+
+    def _build_time_sentence(self, components, position):
+        """Return a TimeSentence object for the given components of its definition, which begins at the given token."""
+        # Ex: "T < 1700" or "T != 1400"
+        try:
+            _time_literal, operator, time_value = components
+            return TimeSentence(operator=operator, time_value=time_value)
+        except ValueError:
+            message = f"Expected a time sentence of the form 'T OPERATOR TIME' but found '{' '.join(components)}'"
+            self._error(position=position, message=message)
+
+    def _parse_sentence(self, variables_in_this_scope):
+        """Parse a parenthesized sentence, returning a list of Sentence objects and the operators between them.
+
+        A sentence with multiple relations (e.g., "(GEORGE KNOWS/LIKES Y)") is broken up into multiple Sentence
+        objects, to make it easier to evaluate them later on. If the sentence has an object, it is the object of
+        every one of its relations.
+        """
+        texts, sentence_terminators = self.texts, self.SENTENCE_TERMINATORS
+        opening_position = self.position
+        closing_delimiter = self.SENTENCE_DELIMITERS[texts[opening_position]]
+        start = position = opening_position + 1
+        while texts[position] not in sentence_terminators:
+            position += 1
+        self.position = position
+        components = self._source(start, position).split()
+        self._expect(closing_delimiter)
+        return self._build_sentence(
+            components=components,
+            variables_in_this_scope=variables_in_this_scope,
+            position=opening_position
+        )
+
+    def _build_sentence(self, components, variables_in_this_scope, position):
+        """Return the Sentence objects and operators for the given components of a sentence, which begins at the
+        given token.
+        """
+        if len(components) < 2:
+            message = "Expected a sentence of the form 'SUBJECT RELATION [OBJECT]'"
+            self._error(position=position, message=message)
+        sentence_sublist = []
+        sentence_subject, variables_in_this_scope = Compiler._parse_variable_or_noun(
+            reference=components[0],
+            variables_in_this_scope=variables_in_this_scope
+        )
+        if len(components) == 2:
+            sentence_object = None
+            relation_components = components[1:]
+        else:
+            sentence_object, variables_in_this_scope = Compiler._parse_variable_or_noun(
+                reference=components[-1],
+                variables_in_this_scope=variables_in_this_scope
+            )
+            relation_components = components[1:-1]
+        for relation_component in relation_components:
+            # Ex: "KNOWS/LIKES" is split into ['KNOWS', '/', 'LIKES']
+            if '/' in relation_component or '&' in relation_component:
+                pieces = self.RELATION_SEPARATOR_PATTERN.split(relation_component)
+            else:
+                pieces = (relation_component,)
+            for i, piece in enumerate(pieces):
+                if i % 2:
+                    sentence_sublist.append(piece)  # A '/' or '&' operator
+                    continue
+                if not piece:
+                    continue
+                sentence_relation, left_directed = self._parse_relation(reference=piece, position=position)
+                if left_directed and sentence_object is not None:
+                    # Swap subject and object due to left-directed relation
+                    sentence = Sentence(
+                        sentence_subject=sentence_object,
+                        sentence_relation=sentence_relation,
+                        sentence_object=sentence_subject
+                    )
+                else:
+                    sentence = Sentence(
+                        sentence_subject=sentence_subject,
+                        sentence_relation=sentence_relation,
+                        sentence_object=sentence_object
+                    )
+                sentence_sublist.append(sentence)
+        return sentence_sublist
+
+    def _parse_relation(self, reference, position):
+        """Parse the given relation reference, reporting an error at the given token if it is malformed.
+
+        Relation objects are never modified once compiled, so each distinct reference is parsed only once, and
+        its Relation object is shared by every action and sentence in which it appears.
+        """
+        try:
+            return self.relations[reference]
+        except KeyError:
+            pass
+        try:
+            parsed_relation = Compiler._parse_relation(reference=reference)
+        except (ValueError, AssertionError):
+            self._error(position=position, message=f"Malformed relation '{reference}'")
+        self.relations[reference] = parsed_relation
+        return parsed_relation
+
+    def _source(self, start, end):
+        """Return the source text of the tokens in the given index range, reading '≠' and '←' as '!=' and '<-'."""
+        if end <= start:
+            return ''
+        source = self.source_text[self.end_offsets[start] - len(self.texts[start]):self.end_offsets[end - 1]]
+        if '≠' in source or '←' in source:
+            source = source.replace('≠', '!=').replace('←', '<-')
+        return source
+
+    def _text(self, start, end):
+        """Return the source text of the tokens in the given index range, with whitespace reduced to single spaces."""
+        return ' '.join(self._source(start, end).split())
+
+    def _expect(self, text):
+        """Consume the next token, which must have the given text."""
+        if self.texts[self.position] != text:
+            self._error(position=self.position, message=f"Expected '{text}' but found {self._describe(self.position)}")
+        self.position += 1
+
+    def _describe(self, position):
+        """Return a description of the token at the given position, for use in error messages."""
+        text = self.texts[position]
+        return "end of file" if text == self.EOF else f"'{text}'"
+
+    def _error(self, position, message):
+        """Raise an exception reporting a syntax error at the token at the given position."""
+        offset = self.end_offsets[position] - len(self.texts[position])
+        line_number = max(1, bisect.bisect_right(self.line_offsets, offset))
+        column = offset - self.line_offsets[line_number - 1] if self.line_offsets else 0
+        for asterisk_column in self.asterisk_columns.get(line_number - 1, ()):
+            if asterisk_column > column:
+                break
+            column += 1  # Count the asterisk removed before the token
+        column += 1
+        raise Exception(f"Syntax error in {self.source_name}, line {line_number}, column {column}: {message}")
@@ -8,7 +8,6 @@ VERBOSITY = 1
 # By default, the random seed is the current UNIX time. To set the seed, change _RANDOM_SEED
 # to your desired seed. To change back to the current UNIX time, revert _RANDOM_SEED to None.
 _RANDOM_SEED = None
-RANDOM_SEED = _RANDOM_SEED or int(round(time.time()))
 # The diegetic time of day at which each simulation instance begins. Following Klein et al. (1971),
 # this is expressed as an integer representing a time in 24-hour-clock notation. For instance,
 # 1910 is 7:10 PM, whereas 2060 is not a valid time.
@@ -22,6 +21,38 @@ NUMBER_OF_TIME_FRAMES = 30
 # conditions with extreme probabilities increments that will immediately force an action to be taken
 # or to be abandoned. Klein used -10 and 10 as the respective thresholds for such short-circuiting.
 SHORT_CIRCUIT_PROBABILITY_INCREMENT_ABSOLUTE_THRESHOLD = 10.0
+# When subrule memoization is engaged, the evaluation of a subrule under a binding of the names it references
+# is cached for the rest of the time frame and shared by every identical subrule in the rule set
+MEMOIZE_SUBRULES = True
+# The subrule cache holds at most this many evaluations; once full, it is emptied and refilled, so that its
+# memory does not grow with the number of bindings tested within a time frame
+SUBRULE_CACHE_SIZE = 2 ** 16
+# Subrules that may short-circuit are evaluated before the others, cheapest first. When adaptive subrule
+# ordering is engaged, they are instead reordered at the start of each rule test by their observed rates of
+# short-circuiting. Neither ordering alters the generated stories.
+ADAPTIVE_SUBRULE_ORDERING = False
+# When incremental evaluation is engaged, a rule is not re-tested in a time frame if its last test took no
+# random draws and neither the relations its subrules read nor the values of its time sentences have changed
+# since; the firings of its last test are repeated instead. This does not alter the generated stories.
+INCREMENTAL_EVALUATION = False
+# When time-window scheduling is engaged, a rule is not tested in a time frame if a subrule made up of time
+# sentences only (e.g., "0, -10: [T < 1720]") is certain to abandon it then (see scheduler.py). This does not
+# alter the generated stories.
+TIME_WINDOW_SCHEDULING = True
+# When domain pruning is engaged, the candidate bindings of a variable are first narrowed to the nouns that can
+# satisfy the subrules that would otherwise abandon the rule (e.g., "0, -10: (GEORGE INVITES X)"), or else the
+# subrule under test, as looked up in the network (see Compiler._compile_domain_constraints()). This does not
+# alter the generated stories.
+DOMAIN_PRUNING = True
+# When vectorized evaluation is engaged, each rule is tested under all of its candidate bindings at once, using
+# NumPy array operations (see vectorized.py), which must then be installed. This does not alter the generated
+# stories, but it pays off only for large casts. Under vectorized evaluation, subrules are neither memoized nor
+# ordered, though incremental evaluation still applies.
+VECTORIZED_EVALUATION = False
+# The history of a simulated universe is stored as the triples added and deleted in each time frame, along
+# with a full snapshot of the network every HISTORY_SNAPSHOT_INTERVAL time frames, which bounds the number of
+# deltas that must be replayed to reconstruct the state at any given time frame
+HISTORY_SNAPSHOT_INTERVAL = 10
 # Paths for the three procedural-content files that drive simulation: a rules file containing definitions
 # for all of the simulation rules; a file containing initial conditions for the simulated storyworld; and
 # a file containing lexical expressions for the entities defined in the preceding files (this file is used
@@ -31,8 +62,64 @@ PATH_TO_RULES_DIRECTORY = "rules"
 PATH_TO_RULES_FILE = os.path.join(PATH_TO_RULES_DIRECTORY, "murder_story_rules.txt")
 PATH_TO_INITIAL_CONDITIONS_FILE = os.path.join(PATH_TO_RULES_DIRECTORY, "murder_story_initial_conditions.txt")
 PATH_TO_LEXICAL_EXPRESSIONS_FILE = os.path.join(PATH_TO_RULES_DIRECTORY, "murder_story_lexical_expression_lists.txt")
+# Parsed rules (along with the analysis of how each is to be evaluated) and lexical expressions are cached on
+# disk in this directory, keyed by a hash of the content of the files they were parsed from, so that later runs
+# may skip parsing and analyzing them. To disable the cache, set RULES_CACHE_DIRECTORY to None.
+RULES_CACHE_DIRECTORY = os.path.join(PATH_TO_RULES_DIRECTORY, "__pycache__")
 # There are two output modes in this implementation of MESSY-71: one that outputs to stdout, and another
 # that outputs to a file. To engage the latter mode, set OUTPUT_TO_FILE to True and update the LOG_FILE
 # path as needed.
 OUTPUT_TO_FILE = False
 LOG_FILE = 'console.log'
+# The printout selected by VERBOSITY is emitted as structured events (see events.py), which are written to an
+# event sink: 'console' prints them, in color, to stdout; 'file' appends them, uncolored, to LOG_FILE; 'jsonl'
+# appends them to LOG_FILE as JSON lines; and 'null' discards them, at no cost to the simulation. If EVENT_SINK
+# is None, the sink is 'file' if OUTPUT_TO_FILE is set, and 'console' otherwise.
+EVENT_SINK = None
+
+
+class Settings:
+    """The settings for a simulation instance.
+
+    Each setting defaults to the value of the corresponding module-level constant above at the time the
+    Settings object is initialized, and may be overridden by a keyword argument whose name is that of the
+    constant in lowercase, e.g., Settings(verbosity=0, random_seed=1971).
+    """
+
+    def __init__(self, **overrides):
+        """Initialize a Settings object."""
+        self.verbosity = VERBOSITY
+        self.random_seed = _RANDOM_SEED if _RANDOM_SEED is not None else int(round(time.time()))
+        self.start_time = START_TIME
+        self.timestep = TIMESTEP
+        self.number_of_time_frames = NUMBER_OF_TIME_FRAMES
+        self.short_circuit_probability_increment_absolute_threshold = (
+            SHORT_CIRCUIT_PROBABILITY_INCREMENT_ABSOLUTE_THRESHOLD
+        )
+        self.memoize_subrules = MEMOIZE_SUBRULES
+        self.subrule_cache_size = SUBRULE_CACHE_SIZE
+        self.adaptive_subrule_ordering = ADAPTIVE_SUBRULE_ORDERING
+        self.incremental_evaluation = INCREMENTAL_EVALUATION
+        self.time_window_scheduling = TIME_WINDOW_SCHEDULING
+        self.domain_pruning = DOMAIN_PRUNING
+        self.vectorized_evaluation = VECTORIZED_EVALUATION
+        self.history_snapshot_interval = HISTORY_SNAPSHOT_INTERVAL
+        self.path_to_rules_file = PATH_TO_RULES_FILE
+        self.path_to_initial_conditions_file = PATH_TO_INITIAL_CONDITIONS_FILE
+        self.path_to_lexical_expressions_file = PATH_TO_LEXICAL_EXPRESSIONS_FILE
+        self.rules_cache_directory = RULES_CACHE_DIRECTORY
+        self.output_to_file = OUTPUT_TO_FILE
+        self.log_file = LOG_FILE
+        self.event_sink = EVENT_SINK
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise TypeError(f"Unknown setting: {name}")
+            setattr(self, name, value)
+
+    def __str__(self):
+        """Return string representation."""
+        return f"Settings ({', '.join(f'{name}={value!r}' for name, value in vars(self).items())})"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
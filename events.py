@@ -0,0 +1,207 @@
+import sys
+import json
+from utils import red, green, blue, yellow
+from symbols import SYMBOL_TABLE
+
+# The levels of detail at which events are emitted, matching the levels of VERBOSITY in config: the changes
+# committed to the network in each time frame (the story); the rules tested and the actions they take; and the
+# evaluation of every binding, subrule, and sentence along the way
+STORY, DEBUG, TRACE = 1, 2, 3
+
+
+class EventLog:
+    """The stream of structured events describing a simulation, which are written to an event sink.
+
+    Each event has a kind (e.g., 'rule_test') and fields holding plain values, with any symbols decoded into
+    names. Since events are only worth building when they will be written, code that emits events first checks
+    the level of the log, which is 0 under a null sink, so that a run with its events disabled pays for nothing
+    but that check, e.g.:
+
+        if universe.events.level >= DEBUG:
+            universe.events.emit('rule_test', rule=str(rule.action_list[0]), cached=False)
+    """
+
+    def __init__(self, settings, sink=None):
+        """Initialize an EventLog object.
+
+        Unless a sink is given, one is opened as specified in the given settings: if the event sink is not
+        specified, events are written to the log file if output is to go to file, and to the console otherwise.
+        """
+        if sink is None:
+            sink_name = settings.event_sink or ('file' if settings.output_to_file else 'console')
+            if sink_name == 'console':
+                sink = TextSink(stream=sys.stdout, colorize=True)
+            elif sink_name == 'file':
+                sink = TextSink(stream=open(settings.log_file, 'a'), colorize=False, close_stream=True)
+            elif sink_name == 'jsonl':
+                sink = JSONLinesSink(stream=open(settings.log_file, 'a'), close_stream=True)
+            elif sink_name == 'null':
+                sink = NullSink()
+            else:
+                raise Exception(f"Unknown event sink: {sink_name}")
+        self.sink = sink
+        # Events above this level of detail are not emitted
+        self.level = 0 if isinstance(sink, NullSink) else settings.verbosity
+        self.time_frame = None  # The plot time of the time frame in which events are currently being emitted
+
+    def __str__(self):
+        """Return string representation."""
+        return f"An Event Log (level {self.level}, {self.sink})"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def emit(self, kind, **fields):
+        """Write an event of the given kind, with the given fields, to the sink."""
+        self.sink.write(kind=kind, time_frame=self.time_frame, fields=fields)
+
+    def flush(self):
+        """Write out any events buffered by the sink."""
+        self.sink.flush()
+
+    def close(self):
+        """Write out any events buffered by the sink, and close it."""
+        self.sink.close()
+
+
+class Sink:
+    """A destination for events that buffers them, as lines of text, and writes them to a stream in batches."""
+
+    # The number of lines that may be buffered before they are written out
+    BUFFER_SIZE = 4096
+
+    def __init__(self, stream, close_stream=False):
+        """Initialize a Sink object."""
+        self.stream = stream
+        self.close_stream = close_stream  # Whether the stream belongs to this sink, to be closed along with it
+        self.buffer = []  # Lines formatted but not yet written to the stream
+
+    def __str__(self):
+        """Return string representation."""
+        return f"{self.__class__.__name__} ({getattr(self.stream, 'name', self.stream)})"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def write(self, kind, time_frame, fields):
+        """Buffer the given event, writing out the buffer if it is full."""
+        self.buffer.append(self.format(kind=kind, time_frame=time_frame, fields=fields))
+        if len(self.buffer) >= self.BUFFER_SIZE:
+            self.flush()
+
+    def format(self, kind, time_frame, fields):
+        """Return the given event as a line of text, including its trailing newline."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Write out the buffered lines in a single write."""
+        if self.buffer:
+            self.stream.write(''.join(self.buffer))
+            self.buffer = []
+        self.stream.flush()
+
+    def close(self):
+        """Write out the buffered lines, and close the stream if it belongs to this sink."""
+        self.flush()
+        if self.close_stream:
+            self.stream.close()
+
+
+class TextSink(Sink):
+    """A sink writing events as the human-readable printout that MESSY has always produced, optionally in color."""
+
+    def __init__(self, stream, colorize, close_stream=False):
+        """Initialize a TextSink object."""
+        super().__init__(stream=stream, close_stream=close_stream)
+        self.colorize = colorize  # Whether to write in color
+
+    def format(self, kind, time_frame, fields):
+        """Return the given event as a line of printout."""
+        colorize = self.colorize
+        if kind == 'time_frame':
+            line = yellow(f"{'' if fields['initial'] else chr(10)}\t{fields['time']}", colorize=colorize)
+        elif kind == 'addition':
+            line = blue(describe(fields), colorize=colorize)
+        elif kind == 'deletion':
+            line = red(describe(fields)) if colorize else f"(DELETED) {describe(fields)}"
+        elif kind == 'commit':
+            line = ''
+        elif kind == 'rule_test':
+            if fields['cached']:
+                line = f"Repeating cached test of rule: {fields['rule']}..."
+            else:
+                line = f"Testing rule: {fields['rule']}..."
+        elif kind == 'action':
+            line = green(f"  {describe(fields)}", colorize=colorize)
+        elif kind == 'binding':
+            line = f"  Bindings: {fields['bindings']}"
+        elif kind == 'short_circuit':
+            line = "    Short-circuit trigger!" if fields['outcome'] else "    Short-circuit abandon!"
+        elif kind == 'probability':
+            line = f"    Probability is {'' if fields['initial'] else 'now '}{fields['probability']}"
+        elif kind == 'draw':
+            line = green("    Triggered!", colorize=colorize) if fields['triggered'] else "    Did not trigger"
+        elif kind == 'subrule_test':
+            line = f"  Testing subrule: {fields['subrule']}"
+        elif kind == 'cached_evaluation':
+            line = f"    Cached evaluation: {fields['evaluation']}"
+        elif kind == 'local_binding':
+            line = f"    Binding: {fields['bindings']}"
+        elif kind == 'parse_action':
+            line = f"Parsing action definition: {fields['definition']}"
+        elif kind == 'parse_subrule':
+            line = f"Parsing subrule: {fields['definition']}"
+        elif kind == 'sentence':
+            line = (
+                f"      Evaluated sentence to {fields['evaluation']}: "
+                f"({fields['subject']} {fields['relation']} {fields['object']})"
+            )
+        else:
+            line = f"{kind}: {fields}"
+        return line + '\n'
+
+
+class JSONLinesSink(Sink):
+    """A sink writing each event as a JSON object on a line of its own, for consumption by other programs."""
+
+    def format(self, kind, time_frame, fields):
+        """Return the given event as a line of JSON."""
+        return json.dumps({'event': kind, 'time_frame': time_frame, **fields}) + '\n'
+
+
+class NullSink(Sink):
+    """A sink discarding all events; an event log writing to it emits none in the first place."""
+
+    def __init__(self):
+        """Initialize a NullSink object."""
+        super().__init__(stream=None)
+
+    def write(self, kind, time_frame, fields):
+        """Discard the given event."""
+        pass
+
+    def flush(self):
+        """Do nothing, since no events are buffered."""
+        pass
+
+    def close(self):
+        """Do nothing, since there is no stream."""
+        pass
+
+
+def triple_fields(triple_subject, triple_relation, triple_object):
+    """Return the fields describing a triple with the given components (symbols), for inclusion in an event."""
+    return {
+        'subject': SYMBOL_TABLE.decode(triple_subject),
+        'relation': SYMBOL_TABLE.decode(triple_relation),
+        'object': SYMBOL_TABLE.decode(triple_object),
+    }
+
+
+def describe(fields):
+    """Return a string representation of the triple described by the given event fields."""
+    if fields['object'] is not None:
+        return f"{fields['subject']} {fields['relation']} {fields['object']}"
+    return f"{fields['subject']} {fields['relation']}"
@@ -1,22 +1,54 @@
+import copy
+import random
 import config
 from compiler import Compiler
 from universe import Universe
 from monitor import Monitor
+from events import EventLog, NullSink
+from checkpoint import Checkpoint
+from scheduler import Scheduler
 
 
 class MESSY:
     """A class modeled after Sheldon Klein's 1971 version of MESSY."""
 
-    def __init__(self):
-        """Initialize a MESSY object."""
-        self.rules = Compiler.parse_rules_file(path_to_rules_file=config.PATH_TO_RULES_FILE)
-        self.universe = Universe()
-        self.monitor = Monitor(
-            lexical_expressions=Compiler.parse_lexical_expressions_file(
-                path_to_lexical_expressions_file=config.PATH_TO_LEXICAL_EXPRESSIONS_FILE
+    def __init__(self, settings=None, rules=None, lexical_expressions=None, event_sink=None):
+        """Initialize a MESSY object.
+
+        Each instance runs under its own settings (by default, those specified in config) and draws from its
+        own random-number generator, seeded with the random seed in its settings, so that any number of
+        instances may be run in the same process. Rules and lexical expressions that have already been parsed
+        may be passed in, so that they can be shared across instances; otherwise, they are parsed from the
+        files specified in the settings. Events are written to the given event sink, if any, and otherwise to
+        the one specified in the settings (see events.EventLog).
+        """
+        self.settings = settings or config.Settings()
+        self.random = random.Random(self.settings.random_seed)
+        self.events = EventLog(settings=self.settings, sink=event_sink)
+        if rules is None:
+            # Any parse-time output goes to this instance's own event log, and so follows its settings
+            rules = Compiler.parse_rules_file(
+                path_to_rules_file=self.settings.path_to_rules_file,
+                settings=self.settings,
+                events=self.events
             )
-        )
+        if lexical_expressions is None:
+            lexical_expressions = Compiler.parse_lexical_expressions_file(
+                path_to_lexical_expressions_file=self.settings.path_to_lexical_expressions_file,
+                settings=self.settings
+            )
+        self.rules = rules
+        self.scheduler = Scheduler(rules=rules)  # Leaves dormant rules off the agenda of each time frame
+        self.universe = Universe(settings=self.settings, random_number_generator=self.random, events=self.events)
+        self.monitor = Monitor(lexical_expressions=lexical_expressions, random_number_generator=self.random)
         self.validate()
+        self.events.flush()
+        # Record the initial conditions as the state at the start time
+        self.universe.history.record(
+            time_frame=self.universe.time,
+            time_since_start=self.universe.time_since_start,
+            network=self.universe.network
+        )
 
     def __str__(self):
         """Return string representation."""
@@ -26,6 +58,16 @@ class MESSY:
         """Return string representation."""
         return "MESSY"
 
+    @property
+    def profile(self):
+        """Return the counters and timings of the tests of each rule against the simulated universe.
+
+        The profile (see profiling.Profile) may be dumped as JSON, using its to_json() method, or as a table
+        of the rules sorted by any of its counters, using its table() method, to find the rules that dominate
+        the cost of a run.
+        """
+        return self.universe.profile
+
     def validate(self):
         """Validate the procedural content loaded for this run."""
         # Confirm that every noun and relation has a lexical expression
@@ -45,22 +87,74 @@ class MESSY:
 
     def simulate(self):
         """Simulate the next time frame in the given universe."""
-        self.universe.history[self.universe.time] = list(self.universe.network)
+        self._commit_time_frame()
+        self._test_rules()
+
+    def _commit_time_frame(self):
+        """Advance to the next time frame, committing the changes queued in the last one and recording them."""
         self._advance_time()
         self.universe.update()
-        for rule in self.rules:
+        self.universe.history.record(
+            time_frame=self.universe.time,
+            time_since_start=self.universe.time_since_start,
+            network=self.universe.network
+        )
+
+    def _test_rules(self):
+        """Test the rules due at the current time frame, queueing the changes to be committed in the next one."""
+        if self.settings.time_window_scheduling:
+            agenda = self.scheduler.agenda(plot_time=self.universe.time)
+        else:
+            agenda = self.rules
+        for rule in agenda:
             rule.test(universe=self.universe)
+        # Events are written out in a batch per time frame
+        self.events.flush()
+
+    def run(self, number_of_time_frames=None, retain_history=True):
+        """Simulate the universe, yielding a Frame object for each time frame as soon as its changes are committed.
+
+        The first frame holds the initial conditions, and one follows for each of the given number of time frames
+        (by default, the number specified in the settings), after which simulation is wrapped up. The sentences
+        of each frame are narrated using a random-number generator of their own (seeded with the random seed),
+        so that narrating a story while it is being simulated does not alter its course; as such, they need not
+        match the sentences of a report written afterward. Each frame is yielded before the rules are tested at
+        its time frame, which happens once the next frame is asked for.
+
+        Unless retain_history is set, the records of each time frame are discarded once the next is yielded, so
+        that memory does not grow with the length of a run; the states at past time frames can then no longer be
+        reconstructed, nor a report written. Simulation is wrapped up (see MESSY.terminate()) even if iteration
+        stops early, once the generator is closed.
+        """
+        if number_of_time_frames is None:
+            number_of_time_frames = self.settings.number_of_time_frames
+        narration_random = random.Random(self.settings.random_seed)
+        history = self.universe.history
+        try:
+            for i in range(number_of_time_frames + 1):
+                if i:
+                    self._commit_time_frame()
+                time_frame, time_since_start = self.universe.time, self.universe.time_since_start
+                if not retain_history:
+                    history.discard_before(time_since_start=time_since_start, keep_states=False)
+                additions, deletions = history.additions[time_since_start], history.deletions[time_since_start]
+                sentences = self.monitor.narrate(actions=additions, random_number_generator=narration_random)
+                yield Frame(time_frame=time_frame, additions=additions, deletions=deletions, sentences=sentences)
+                if i:
+                    self._test_rules()
+        finally:
+            self.terminate()
 
     def terminate(self):
         """Wrap up simulation."""
-        self.universe.history[self.universe.time] = list(self.universe.network)
         self._advance_time()
         self.universe.update()
+        self.events.close()
 
     def _advance_time(self):
         """Advance the time frame of the simulated universe."""
-        self.universe.time_since_start += config.TIMESTEP
-        self.universe.time += config.TIMESTEP
+        self.universe.time_since_start += self.settings.timestep
+        self.universe.time += self.settings.timestep
         # Update the integer 24-hour clock
         time_str = str(self.universe.time)
         if len(time_str) == 3:
@@ -71,6 +165,58 @@ class MESSY:
                 time_str = '2400'
         self.universe.time = int(time_str)
 
+    def fork(self, random_seed, event_sink=None):
+        """Return a branch of this simulation instance, which continues from the current state of its universe.
+
+        The branch draws from a random-number generator of its own, seeded with the given random seed, so that
+        any number of continuations may be explored from a common prefix (see search.py). Its universe shares
+        the triples in its network and history with that of this instance (see Universe.fork()), so making a
+        branch copies only their indices, which takes time linear in the number of index entries and recorded
+        time frames (see benchmarks.forking). Its events are written to the given event sink, and discarded by
+        default.
+        """
+        forked = copy.copy(self)
+        forked.random = random.Random(random_seed)
+        forked.events = EventLog(settings=self.settings, sink=event_sink or NullSink())
+        forked.universe = self.universe.fork(random_number_generator=forked.random, events=forked.events)
+        forked.monitor = Monitor(
+            lexical_expressions=self.monitor.lexical_expressions,
+            random_number_generator=forked.random
+        )
+        return forked
+
+    def save_checkpoint(self, path):
+        """Write a checkpoint of the simulated universe to the given path, from which this run may be resumed.
+
+        A checkpoint may be taken between time frames, and it is restored by calling restore_checkpoint() on
+        an instance running under the same rules and settings (see checkpoint.Checkpoint).
+        """
+        Checkpoint.write(path=path, universe=self.universe)
+
+    def restore_checkpoint(self, path):
+        """Restore the simulated universe to the checkpoint at the given path, to resume the run it was taken from."""
+        with Checkpoint(path=path) as checkpoint:
+            checkpoint.restore(universe=self.universe)
+
     def report(self):
         """Write to file a report on the history of the simulated universe."""
         self.monitor.report(universe=self.universe)
+
+
+class Frame:
+    """The changes committed to a simulated universe in a single time frame, and their narration."""
+
+    def __init__(self, time_frame, additions, deletions, sentences):
+        """Initialize a Frame object."""
+        self.time_frame = time_frame  # The plot time at which the changes were committed
+        self.additions = additions  # The triples added to the network
+        self.deletions = deletions  # The triples deleted from the network
+        self.sentences = sentences  # A sentence expressing each of the added triples
+
+    def __str__(self):
+        """Return the narration of this frame, formatted as in a report."""
+        return Monitor.format_time_frame(time_frame=self.time_frame, sentences=self.sentences)
+
+    def __repr__(self):
+        """Return string representation."""
+        return f"Frame ({self.time_frame}: +{len(self.additions)}, -{len(self.deletions)})"
@@ -1,18 +1,16 @@
 import time
-import random
-import config
-# Set the random seed, if applicable
-if config.RANDOM_SEED is not None:
-    random.seed(config.RANDOM_SEED)
+from symbols import SYMBOL_TABLE
 
 
 class Monitor:
     """A narrative style control monitor."""
 
-    def __init__(self, lexical_expressions):
+    def __init__(self, lexical_expressions, random_number_generator):
         """Initialize a Monitor object."""
         # This is a dictionary mapping nouns and relations to their lexical expressions
         self.lexical_expressions = lexical_expressions
+        # The random-number generator of the simulation instance, used to select among lexical expressions
+        self.random = random_number_generator
 
     def __str__(self):
         """Return string representation."""
@@ -24,32 +22,62 @@ class Monitor:
 
     def report(self, universe):
         """Generate a report on the history of the given universe."""
-        filename = f"reports/report-{int(time.time())}-{config.RANDOM_SEED}.txt"
-        report = open(filename, "w")
-        all_time_frames_in_order = sorted(universe.history.keys())
-        for i, time_frame in enumerate(all_time_frames_in_order):
-            report.write(f"\n\n\t{time_frame}\n\n")
-            if i == 0:
-                actions_this_time_frame = universe.history[time_frame]
+        filename = f"reports/report-{int(time.time())}-{universe.settings.random_seed}.txt"
+        with open(filename, "w") as report:
+            report.write(self.render(universe=universe))
+
+    def render(self, universe):
+        """Return the text of a report on the history of the given universe."""
+        report = []
+        history = universe.history
+        all_time_frames_in_order = sorted(history.keys())
+        # Each plot time is narrated once, as the change from the preceding one, even if the clock has stopped
+        # at midnight and recorded it over and over; the triples of the first plot time are the initial conditions
+        preceding_time_since_start = None
+        for time_frame in all_time_frames_in_order:
+            time_since_start = history.latest_time_frames[time_frame]
+            actions_this_time_frame = history.added_between(
+                earlier_time_since_start=preceding_time_since_start,
+                time_since_start=time_since_start
+            )
+            sentences = self.narrate(actions=actions_this_time_frame)
+            report.append(self.format_time_frame(time_frame=time_frame, sentences=sentences))
+            preceding_time_since_start = time_since_start
+        return ''.join(report)
+
+    @staticmethod
+    def format_time_frame(time_frame, sentences):
+        """Return the part of a report consisting of the given sentences narrating the given time frame."""
+        return f"\n\n\t{time_frame}\n\n" + ''.join(sentences)
+
+    def narrate(self, actions, random_number_generator=None):
+        """Return a sentence expressing each of the given actions (triples), in the order in which they were taken.
+
+        Lexical expressions are selected using the given random-number generator, if any, and otherwise that of
+        the simulation instance.
+        """
+        random_number_generator = random_number_generator or self.random
+        sentences = []
+        for action in sorted(actions, key=lambda triple: triple.id):
+            # The components of the triple are symbols, which are decoded back into names here
+            subject_name = SYMBOL_TABLE.decode(action.subject)
+            relation_name = SYMBOL_TABLE.decode(action.relation)
+            object_name = SYMBOL_TABLE.decode(action.object)
+            action_subject = random_number_generator.choice(self.lexical_expressions[subject_name])
+            try:
+                action_relation = random_number_generator.choice(self.lexical_expressions[relation_name])
+            except KeyError:
+                error_message = f"Missing lexical expression for relation {relation_name} "
+                error_message += f"in action {action}."
+                raise Exception(error_message)
+            try:
+                action_object = random_number_generator.choice(self.lexical_expressions[object_name])
+            except KeyError:
+                action_object = None
+            if action_object:
+                # Use two spaces after a period, as in Klein (1971)
+                sentence = f"{action_subject} {action_relation} {action_object}.  "
             else:
-                actions_this_time_frame = set(universe.history[time_frame]) - set(universe.history[all_time_frames_in_order[i-1]])
-            for action in sorted(actions_this_time_frame, key=lambda triple: triple.id):
-                action_subject = random.choice(self.lexical_expressions[action.subject])
-                try:
-                    action_relation = random.choice(self.lexical_expressions[action.relation])
-                except KeyError:
-                    error_message = f"Missing lexical expression for relation {action.relation} "
-                    error_message += f"in action {action}."
-                    raise Exception(error_message)
-                try:
-                    action_object = random.choice(self.lexical_expressions[action.object])
-                except KeyError:
-                    action_object = None
-                if action_object:
-                    # Use two spaces after a period, as in Klein (1971)
-                    sentence = f"{action_subject} {action_relation} {action_object}.  "
-                else:
-                    sentence = f"{action_subject} {action_relation}.  "
-                report.write(sentence)
-        report.close()
- 
\ No newline at end of file
+                sentence = f"{action_subject} {action_relation}.  "
+            sentences.append(sentence)
+        return sentences
@@ -0,0 +1,155 @@
+import json
+
+
+class Profile:
+    """Counters and timings of the tests of each rule, and of the evaluations of each subrule, against a universe.
+
+    A profile belongs to a universe, rather than to the rules, since rules may be shared by any number of
+    universes. The counters are always kept, and they are cheap: a few integer increments per binding tested,
+    and a pair of clock readings per rule test. Wall time is not kept per subrule, since reading the clock
+    around each subrule evaluation would cost more than many evaluations do; the matches made in evaluating
+    a subrule stand in for its cost instead. Under vectorized evaluation, a subrule evaluation is counted for
+    each binding of the header references that it is evaluated under, and a match for each key tested (see
+    vectorized.VectorizedRule).
+    """
+
+    def __init__(self):
+        """Initialize a Profile object."""
+        self.rules = {}  # Maps rules to their profiles, in the order in which they were first tested
+        self.subrules = {}  # Maps subrules to their profiles
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Profile ({len(self.rules)} rules)"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def rule_profile(self, rule):
+        """Return the profile of the given rule, creating it (and those of its subrules) if it has none yet."""
+        try:
+            return self.rules[rule]
+        except KeyError:
+            pass
+        rule_profile = RuleProfile(rule=rule, index=len(self.rules))
+        self.rules[rule] = rule_profile
+        for subrule_profile in rule_profile.subrules:
+            self.subrules[subrule_profile.subrule] = subrule_profile
+        return rule_profile
+
+    def to_dict(self):
+        """Return a JSON-serializable representation of this profile, listing the rules in file order."""
+        return {'rules': [rule_profile.to_dict() for rule_profile in self.rules.values()]}
+
+    def to_json(self, **kwargs):
+        """Return this profile as a JSON string; any keyword arguments are passed on to json.dumps()."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def table(self, sort_by='seconds', limit=None, subrules=False):
+        """Return a table of the rule profiles, sorted by the given counter in descending order.
+
+        If subrules is set, the profile of each subrule is listed beneath that of its rule.
+        """
+        if sort_by not in RuleProfile.COUNTERS:
+            raise Exception(f"Cannot sort rule profiles by unknown counter: {sort_by}")
+        rule_profiles = sorted(self.rules.values(), key=lambda rule_profile: -getattr(rule_profile, sort_by))
+        if limit is not None:
+            rule_profiles = rule_profiles[:limit]
+        lines = [
+            f"{'#':>4}{'seconds':>10}{'tests':>8}{'cached':>8}{'bindings':>11}{'matches':>11}{'firings':>9}  rule"
+        ]
+        for rule_profile in rule_profiles:
+            lines.append(
+                f"{rule_profile.index:>4}{rule_profile.seconds:>10.4f}{rule_profile.tests:>8}"
+                f"{rule_profile.cached_tests:>8}{rule_profile.bindings:>11}{rule_profile.match_calls:>11}"
+                f"{rule_profile.firings:>9}  {rule_profile.rule!r}"
+            )
+            if not subrules:
+                continue
+            for i, subrule_profile in enumerate(rule_profile.subrules):
+                lines.append(
+                    f"{'':>12}subrule {i}: {subrule_profile.evaluations} evaluations "
+                    f"({subrule_profile.cache_hits} cached), {subrule_profile.match_calls} matches, "
+                    f"{subrule_profile.short_circuits} short-circuits, {subrule_profile.pruned} pruned  "
+                    f"{subrule_profile.subrule}"
+                )
+        return '\n'.join(lines)
+
+
+class RuleProfile:
+    """The counters and timing of the tests of a rule against a universe."""
+
+    __slots__ = ('rule', 'index', 'subrules', 'tests', 'cached_tests', 'bindings', 'match_calls', 'firings', 'seconds')
+    # The attributes that rule profiles may be sorted by (see Profile.table())
+    COUNTERS = ('tests', 'cached_tests', 'bindings', 'match_calls', 'firings', 'seconds')
+
+    def __init__(self, rule, index):
+        """Initialize a RuleProfile object."""
+        self.rule = rule
+        self.index = index  # The position of the rule in the rule set, as given by the order of first tests
+        self.subrules = [SubruleProfile(subrule=subrule) for subrule in rule.subrules]  # In file order
+        self.tests = 0  # The number of times the rule was tested
+        self.cached_tests = 0  # The number of those tests that repeated a cached test (see Rule.test())
+        self.bindings = 0  # The number of candidate bindings enumerated, after pruning
+        self.match_calls = 0  # The number of triples matched against the network
+        self.firings = 0  # The number of times the rule fired
+        self.seconds = 0.0  # The wall time taken by the tests, including firing
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Rule Profile ({self.rule!r}: {self.tests} tests, {self.seconds:.4f} seconds)"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def to_dict(self):
+        """Return a JSON-serializable representation of this profile."""
+        return {
+            'index': self.index,
+            'rule': repr(self.rule),
+            'tests': self.tests,
+            'cached_tests': self.cached_tests,
+            'bindings': self.bindings,
+            'match_calls': self.match_calls,
+            'firings': self.firings,
+            'seconds': self.seconds,
+            'subrules': [subrule_profile.to_dict() for subrule_profile in self.subrules],
+        }
+
+
+class SubruleProfile:
+    """The counters and timing of the evaluations of a subrule against a universe."""
+
+    __slots__ = ('subrule', 'evaluations', 'cache_hits', 'short_circuits', 'pruned', 'match_calls')
+
+    def __init__(self, subrule):
+        """Initialize a SubruleProfile object."""
+        self.subrule = subrule
+        self.evaluations = 0  # The number of bindings the subrule was evaluated under, including cache hits
+        self.cache_hits = 0  # The number of those evaluations served from the subrule cache
+        self.short_circuits = 0  # The number of times the subrule decided the outcome of a binding by short-circuit
+        # The number of partial bindings that the subrule pruned, by short-circuiting to an abandon before they were
+        # extended (see Rule._join()); the complete bindings extending them are never tested, and so never counted
+        self.pruned = 0
+        self.match_calls = 0  # The number of triples matched against the network in evaluating the subrule
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Subrule Profile ({self.subrule}: {self.evaluations} evaluations)"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def to_dict(self):
+        """Return a JSON-serializable representation of this profile."""
+        return {
+            'subrule': str(self.subrule),
+            'evaluations': self.evaluations,
+            'cache_hits': self.cache_hits,
+            'short_circuits': self.short_circuits,
+            'pruned': self.pruned,
+            'match_calls': self.match_calls,
+        }
@@ -1,23 +1,84 @@
-import config
-import random
+import time
 import itertools
-from utils import red, green, blue, yellow
-if config.OUTPUT_TO_FILE:
-    import sys
-    sys.stdout = open(config.LOG_FILE, 'a')
-# Set the random seed, if applicable
-if config.RANDOM_SEED is not None:
-    random.seed(config.RANDOM_SEED)
+from symbols import SYMBOL_TABLE
+from events import DEBUG, TRACE
+
+# Stands in for the binding of a name that is local to a subrule in the keys of the universe's subrule cache
+UNBOUND = object()
 
 
 class Rule:
     """A simulation rule defined using Klein's (1971) rule language."""
 
+    # The attributes set by Compiler._compile_rule(), which are left out whenever a rule is pickled
+    COMPILED_ATTRIBUTES = (
+        'header_domains', 'domain_constraints', 'triggered', 'pruning_checks', 'short_circuit_plan',
+        'short_circuit_statistics', 'relations_read', 'time_conditions', 'time_dependent', 'vectorized'
+    )
+
     def __init__(self, action_list, subrules, raw_definition):
         """Initialize a Rule object."""
         self.action_list = action_list
         self.subrules = subrules
         self.raw_definition = raw_definition
+        # Maps the names of the variables and nouns referenced in the action list to the Variable objects
+        # or nouns themselves, in the order in which they will be bound; also determine the maximum number
+        # of firings specified by any Y-restriction part
+        self.header_references = {}
+        self.y_restriction = float("inf")
+        for action in self.action_list:
+            for reference in (action.subject, action.object):
+                if not reference:
+                    continue
+                if isinstance(reference, Variable):
+                    self.header_references[reference.name] = reference
+                    if reference.y_restriction_part:
+                        self.y_restriction = min(self.y_restriction, reference.y_restriction_part)
+                else:
+                    self.header_references[reference] = reference  # Ex: header_references['GEORGE'] = 'GEORGE'
+        # The analysis of how this rule is to be evaluated, which is made by Compiler._analyze_rule() and cached
+        # on disk along with the parsed rule, since it is plain data. First, the subrules that may short-circuit
+        # (by index), in the order in which they are evaluated; these are determined by
+        # Compiler._compile_short_circuit_plan()
+        self.short_circuit_order = None
+        # For each number of header references bound so far, the short-circuit subrules (by index) that may be
+        # evaluated to prune a partial binding; this is determined by Compiler._compile_pruning_checks()
+        self.pruning_check_indices = None
+        # For each header reference, in order, the constraints on its candidate bindings implied by the subrules
+        # that abandon this rule unless they hold (or fail), as (required, relation, position, opposite, bound)
+        # specifications; these are determined by Compiler._compile_rule_domain_constraints()
+        self.constraint_specifications = None
+        # The intervals of plot time, as (start, stop) pairs, outside of which this rule is certain to be
+        # abandoned under every binding by its time sentences alone; these are determined by
+        # Compiler._compile_active_intervals() and consulted by the scheduler (see scheduler.Scheduler)
+        self.active_intervals = None
+        # What Compiler._compile_rule() builds from the analysis, which holds callables and symbols, and so is built
+        # anew in each process (see Rule.COMPILED_ATTRIBUTES). First, for each header reference, in order, the
+        # symbol of the class its candidate bindings are drawn from, along with None, or else None along with the
+        # symbol of the noun it names, as its sole candidate
+        self.header_domains = None
+        # For each header reference, in order, the constraints on its candidate bindings, compiled from their
+        # specifications into (required, fillers) pairs, which are applied by prune_candidates()
+        self.domain_constraints = None
+        # A native callable that returns whether this rule fires with a given variable binding
+        self.triggered = None
+        # For each number of header references bound so far, the short-circuit subrules that may be evaluated
+        # to prune a partial binding, as (index, holds, true-value outcome, false-value outcome) entries
+        self.pruning_checks = None
+        # The subrules that may short-circuit, as (index, holds, true-value outcome, false-value outcome) entries
+        # in the order in which they are evaluated, and, under adaptive subrule ordering, counts of how many times
+        # each (by index) has been evaluated and has short-circuited
+        self.short_circuit_plan = None
+        self.short_circuit_statistics = None
+        # The symbols of the relations read by the subrules, the compiled time sentences among them, and whether
+        # any relation read carries a duration modifier, which are used to decide whether a test may be skipped
+        # under incremental evaluation
+        self.relations_read = None
+        self.time_conditions = None
+        self.time_dependent = None
+        # Under vectorized evaluation, a VectorizedRule object that tests this rule under all of its candidate
+        # bindings at once
+        self.vectorized = None
 
     def __str__(self):
         """Return string representation."""
@@ -27,85 +88,211 @@ class Rule:
         """Return string representation."""
         return ", ".join(str(action) for action in self.action_list)
 
+    def __getstate__(self):
+        """Return the state of this rule to be pickled (e.g., into the on-disk cache of parsed files).
+
+        The compiled attributes are left out, as is the raw definition if it merely joins those of the actions
+        and subrules, in which case only what follows the joined definitions (if anything) is kept.
+        """
+        state = {name: value for name, value in vars(self).items() if name not in self.COMPILED_ATTRIBUTES}
+        joined_definition = self._joined_raw_definition()
+        remainder = self.raw_definition[len(joined_definition):]
+        if self.raw_definition.startswith(joined_definition) and remainder in ('', ';'):
+            state['raw_definition'] = (remainder,)  # The definition is rebuilt by Rule.__setstate__()
+        return state
+
+    def __setstate__(self, state):
+        """Restore the given pickled state of this rule, which is left to be compiled."""
+        self.__dict__.update(state)
+        for name in self.COMPILED_ATTRIBUTES:
+            setattr(self, name, None)
+        if isinstance(self.raw_definition, tuple):
+            self.raw_definition = self._joined_raw_definition() + self.raw_definition[0]
+
+    def _joined_raw_definition(self):
+        """Return the raw definitions of the actions and subrules of this rule, joined as in a rules file."""
+        return ', '.join(action.raw_definition for action in self.action_list) + ''.join(
+            f"; {subrule.raw_definition}" for subrule in self.subrules
+        )
+
+    def active_at(self, plot_time):
+        """Return whether this rule could fire at the given plot time, as far as its time sentences go."""
+        return any(start <= plot_time < stop for start, stop in self.active_intervals)
+
     def test(self, universe):
-        """Test this rule, given the current state of the given universe."""
-        if config.VERBOSITY >= 2:
-            print(f"Testing rule: {self.action_list[0]}...")
+        """Test this rule, given the current state of the given universe.
+
+        Under incremental evaluation, if the last test of this rule was deterministic (no binding reached a
+        random draw), and neither the relations it reads nor the values of its time sentences have changed
+        since, the firings of that test are simply repeated, since a new test would necessarily reproduce them.
+        """
+        start_time = time.perf_counter()
+        match_calls_before_test = universe.match_calls
+        rule_profile = universe.profile.rule_profile(rule=self)
+        rule_profile.tests += 1
+        settings = universe.settings
+        incremental = settings.incremental_evaluation
+        if incremental:
+            time_condition_values = tuple(condition(universe, None) for condition in self.time_conditions)
+            if self._unchanged_since_cached_test(universe=universe, time_condition_values=time_condition_values):
+                if universe.events.level >= DEBUG:
+                    universe.events.emit('rule_test', rule=str(self.action_list[0]), cached=True)
+                for bindings in universe.cached_tests[self][1]:
+                    self.fire(universe=universe, bindings=bindings)
+                rule_profile.cached_tests += 1
+                rule_profile.firings += len(universe.cached_tests[self][1])
+                rule_profile.seconds += time.perf_counter() - start_time
+                return
+            random_draws_before_test = universe.random_draws
+            firings = []
+        if universe.events.level >= DEBUG:
+            universe.events.emit('rule_test', rule=str(self.action_list[0]), cached=False)
+        if settings.adaptive_subrule_ordering:
+            self._reorder_short_circuit_plan()
         # Collect candidate bindings for action subjects and objects
-        binding_candidates = {}
-        y_restriction = float("inf")
-        for action in self.action_list:
-            # Collect candidate subjects
-            if isinstance(action.subject, Variable):
-                class_name = action.subject.class_name
-                binding_candidates[action.subject.name] = universe.classes[class_name]
-                if action.subject.y_restriction_part:
-                    y_restriction = min(y_restriction, action.subject.y_restriction_part)
+        binding_candidates = []
+        for (class_symbol, noun_symbol), constraints in zip(self.header_domains, self.domain_constraints):
+            if noun_symbol is None:
+                candidates = universe.classes[class_symbol]
+                if constraints and settings.domain_pruning:
+                    candidates = prune_candidates(
+                        universe=universe,
+                        candidates=candidates,
+                        constraints=constraints,
+                        bindings={}
+                    )
+                binding_candidates.append(candidates)
             else:
-                binding_candidates[action.subject] = [action.subject]  # Ex: candidate_bindings['GEORGE'] = ['GEORGE']
-            if action.object:
-                # Collect candidate objects
-                if isinstance(action.object, Variable):
-                    class_name = action.object.class_name
-                    binding_candidates[action.object.name] = universe.classes[class_name]
-                    if action.object.y_restriction_part:
-                        y_restriction = min(y_restriction, action.object.y_restriction_part)
-                else:
-                    binding_candidates[action.object] = [action.object]
+                binding_candidates.append([noun_symbol])
         # Test all bindings, unless we reach a maximum specified by a Y-restriction part
+        if settings.vectorized_evaluation:
+            if self.vectorized is None:
+                raise Exception(f"Rule was not compiled for vectorized evaluation: {self.action_list[0]}")
+            firing_bindings = self.vectorized.firings(
+                universe=universe,
+                binding_candidates=binding_candidates,
+                rule_profile=rule_profile
+            )
+        else:
+            firing_bindings = self._firings(
+                universe=universe,
+                binding_candidates=binding_candidates,
+                rule_profile=rule_profile
+            )
         rule_executions = 0
-        variable_ordering = list(binding_candidates.keys())
-        candidate_bindings = list(itertools.product(*binding_candidates.values()))
-        for ordered_candidates_list in candidate_bindings:
-            if len(set(ordered_candidates_list)) != len(ordered_candidates_list):
-                continue
-            candidate_binding = {}
-            for i, variable_name in enumerate(variable_ordering):
-                candidate_binding[variable_name] = ordered_candidates_list[i]
-            if self._triggered(universe=universe, partial_bindings=candidate_binding):
-                self.fire(universe=universe, bindings=candidate_binding)
-                rule_executions += 1
-                if rule_executions == y_restriction:
+        for candidate_binding in firing_bindings:
+            self.fire(universe=universe, bindings=candidate_binding)
+            if incremental:
+                firings.append(candidate_binding)
+            rule_executions += 1
+            if rule_executions == self.y_restriction:
+                break
+        if incremental:
+            if universe.random_draws == random_draws_before_test:
+                universe.cached_tests[self] = (time_condition_values, firings, universe.time_since_start)
+            else:
+                universe.cached_tests.pop(self, None)
+        rule_profile.firings += rule_executions
+        rule_profile.match_calls += universe.match_calls - match_calls_before_test
+        rule_profile.seconds += time.perf_counter() - start_time
+
+    def _firings(self, universe, binding_candidates, rule_profile):
+        """Generate the candidate bindings under which this rule fires, counting those enumerated in its profile."""
+        for candidate_binding in self._join(universe=universe, binding_candidates=binding_candidates):
+            rule_profile.bindings += 1
+            if self.triggered(universe, candidate_binding):
+                yield candidate_binding
+
+    def _unchanged_since_cached_test(self, universe, time_condition_values):
+        """Return whether the outcome of the cached test of this rule still holds in the given universe."""
+        cached_test = universe.cached_tests.get(self)
+        if cached_test is None or self.time_dependent:
+            return False
+        # The changed relations are those of the last update only, so the cached test must be from the last time
+        # frame, which it may not be if this rule has since been left off the agenda (see scheduler.Scheduler)
+        if cached_test[2] != universe.time_since_start - universe.settings.timestep:
+            return False
+        if cached_test[0] != time_condition_values:
+            return False
+        return self.relations_read.isdisjoint(universe.changed_relations)
+
+    def _join(self, universe, binding_candidates):
+        """Generate all candidate bindings in which no two references are bound to the same noun.
+
+        Variables are bound one at a time, in the order of the candidate lists. As soon as a short-circuit
+        subrule can be evaluated under the partial binding at hand, it is, and if it is certain to cause the
+        rule to be abandoned, no binding extending the partial binding is generated.
+        """
+        variable_ordering = list(self.header_references)
+        pruning_checks = self.pruning_checks
+        subrule_profiles = universe.profile.rules[self].subrules
+        number_of_variables = len(variable_ordering)
+        binding = {}
+
+        def extend(depth, decided):
+            """Generate the complete bindings that extend the current partial binding."""
+            if not decided and depth < number_of_variables:
+                outcome = self._short_circuit(
+                    universe=universe,
+                    bindings=binding,
+                    checks=pruning_checks[depth],
+                    subrule_profiles=subrule_profiles
+                )
+                if outcome is False:
                     return
+                # A short-circuit trigger preempts any later abandon, so we must stop pruning below this point
+                decided = outcome is True
+            if depth == number_of_variables:
+                yield dict(binding)
+                return
+            variable_name = variable_ordering[depth]
+            bound_nouns = list(binding.values())
+            for candidate in binding_candidates[depth]:
+                if candidate in bound_nouns:
+                    continue
+                binding[variable_name] = candidate
+                yield from extend(depth=depth+1, decided=decided)
+            binding.pop(variable_name, None)
+
+        return extend(depth=0, decided=False)
+
+    def _reorder_short_circuit_plan(self):
+        """Order the short-circuit subrules by their observed short-circuit rates, highest first.
+
+        Ties, including among subrules that have not been evaluated yet, are broken by static cost. Since
+        the compiled rule is insensitive to the order of its short-circuit plan, this only affects speed. Note
+        that the plan is replaced rather than sorted in place, since other universes may be testing this rule.
+        """
+        def sort_key(entry):
+            evaluations, short_circuits = self.short_circuit_statistics[entry[0]]
+            short_circuit_rate = short_circuits / evaluations if evaluations else 0.0
+            return -short_circuit_rate, self.subrules[entry[0]].static_cost
+
+        self.short_circuit_plan = sorted(self.short_circuit_plan, key=sort_key)
 
-    def _triggered(self, universe, partial_bindings):
-        """Return whether this rule fires with the given variable binding."""
-        if config.VERBOSITY >= 3:
-            print(f"  Bindings: {partial_bindings}")
-        probability = 0.0
-        if config.VERBOSITY >= 3:
-            print(f"    Probability is {probability}")
-        for subrule in self.subrules:
-            if subrule.holds(universe=universe, partial_bindings=partial_bindings):
-                increment = subrule.true_value
+    @staticmethod
+    def _short_circuit(universe, bindings, checks, subrule_profiles):
+        """Return the outcome of the first short-circuit reached by the given checks, else None.
+
+        An abandon prunes the partial binding, and so is counted in the profile of its subrule. A trigger is not,
+        since the compiled rule counts it again for each complete binding extending the partial binding.
+        """
+        for i, holds, true_value_short_circuit, false_value_short_circuit in checks:
+            if holds(universe, bindings):
+                short_circuit = true_value_short_circuit
             else:
-                increment = subrule.false_value
-            # Potentially short-circuit
-            if abs(increment) >= config.SHORT_CIRCUIT_PROBABILITY_INCREMENT_ABSOLUTE_THRESHOLD:
-                if increment > 0:
-                    if config.VERBOSITY >= 3:
-                        print("    Short-circuit trigger!")
-                    return True
-                if config.VERBOSITY >= 3:
-                    print("    Short-circuit abandon!")
-                return False
-            # Otherwise, increment the running probability
-            probability += increment
-            if config.VERBOSITY >= 3:
-                print(f"    Probability is now {probability}")
-        if random.random() < probability:
-            if config.VERBOSITY >= 3:
-                print(green(f"    Triggered!"))
-            return True
-        if config.VERBOSITY >= 3:
-            print(f"    Did not trigger")
-        return False
+                short_circuit = false_value_short_circuit
+            if short_circuit is not None:
+                if short_circuit is False:
+                    subrule_profiles[i].pruned += 1
+                return short_circuit
+        return None
 
     def fire(self, universe, bindings):
         """Execute all the actions in the action list for this rule."""
         triples_to_add_next_time_frame = []
         for action in self.action_list:
-            triple = action.execute(bindings=bindings)
+            triple = action.execute(universe=universe, bindings=bindings)
             triples_to_add_next_time_frame.append(triple)
         universe.queue_triples(triples=triples_to_add_next_time_frame)
 
@@ -128,7 +315,7 @@ class Action:
         """Return string representation."""
         return self.__str__()
 
-    def execute(self, bindings):
+    def execute(self, universe, bindings):
         """Return a triple to be added to the network next time frame."""
         if isinstance(self.subject, Variable):
             ground_subject = bindings[self.subject.name]
@@ -141,23 +328,53 @@ class Action:
         else:
             ground_object = bindings[self.object]
         triple_to_add = (ground_subject, self.relation, ground_object)
-        if config.VERBOSITY >= 2:
-            if ground_object:
-                print(green(f"  {ground_subject} {self.relation} {ground_object}"))
-            else:
-                print(green(f"  {ground_subject} {self.relation}"))
+        if universe.events.level >= DEBUG:
+            universe.events.emit(
+                'action',
+                subject=SYMBOL_TABLE.decode(ground_subject),
+                relation=str(self.relation),
+                object=SYMBOL_TABLE.decode(ground_object)
+            )
         return triple_to_add
 
 
 class Subrule:
     """A subrule in a rule defined using Klein's (1971) rule language."""
 
+    # The attributes set by Compiler._compile_subrule(), which are left out whenever a subrule is pickled
+    COMPILED_ATTRIBUTES = ('condition', 'domains', 'domain_constraints')
+
     def __init__(self, true_value, false_value, sentence_list, raw_definition):
         """Initialize a Subrule object."""
         self.true_value = true_value
         self.false_value = false_value
         self.sentence_list = sentence_list
         self.raw_definition = raw_definition
+        # The outcomes to which this subrule short-circuits if its sentence list holds and if it fails, or None
+        # for either if it does not; these are determined by Compiler._analyze_rule()
+        self.short_circuits = None
+        # A canonical form of the sentence list, shared by all identical subrules across the rule set; this is
+        # set by Compiler._analyze_subrule() and used to key the universe's subrule cache
+        self.canonical_form = None
+        # Maps the names of all the variables and nouns referenced in the sentence list to the Variable
+        # objects or nouns themselves; this is collected by Compiler._analyze_subrule()
+        self.references = None
+        # Maps the names of the variables local to this subrule to the constraints on their candidate bindings
+        # implied by its sentence list holding, given as in Rule.constraint_specifications; these are also
+        # determined by Compiler._analyze_subrule()
+        self.constraint_specifications = None
+        # If this subrule may short-circuit, an estimate of the cost of evaluating it, used to order the rule's
+        # short-circuit subrules; this is set by Compiler._compile_short_circuit_plan()
+        self.static_cost = None
+        # A native callable, emitted by Compiler._compile_subrule(), that returns whether the sentence
+        # list holds under a given complete variable binding
+        self.condition = None
+        # Maps the names of the references to the domains of their candidate bindings, given as in
+        # Rule.header_domains; this is also collected by Compiler._compile_subrule()
+        self.domains = None
+        # Maps the names of the variables local to this subrule to the constraints on their candidate bindings,
+        # given as in Rule.domain_constraints; these are also compiled by Compiler._compile_subrule()
+        self.domain_constraints = None
 
     def __str__(self):
         """Return string representation."""
@@ -167,100 +384,82 @@ class Subrule:
         """Return string representation."""
         return self.__str__()
 
+    def __getstate__(self):
+        """Return the state of this subrule to be pickled, leaving out the compiled attributes."""
+        return {name: value for name, value in vars(self).items() if name not in self.COMPILED_ATTRIBUTES}
+
+    def __setstate__(self, state):
+        """Restore the given pickled state of this subrule, which is left to be compiled."""
+        self.__dict__.update(state)
+        for name in self.COMPILED_ATTRIBUTES:
+            setattr(self, name, None)
+
     def holds(self, universe, partial_bindings):
         """Return whether the condition expressed in this subrule holds, given the variable binding.
 
         Note that variables (besides any X or Y introduced in the rule header) cannot be passed
         across subrule boundaries, meaning the bindings are local to the subrule at hand (1971:13).
         """
-        if config.VERBOSITY >= 3:
-            print(f"  Testing subrule: {self.__str__()}")
-        partial_bindings = {variable: [ground] for variable, ground in partial_bindings.items()}
-        # Collect candidate bindings for all variables referenced in the sentence list
-        flattened_sentence_list = []
-        for item in self.sentence_list:
-            if type(item) is list:
-                flattened_sentence_list += item
-            else:
-                flattened_sentence_list.append(item)
-        new_binding_candidates = {}
-        for sentence in flattened_sentence_list:
-            if not isinstance(sentence, Sentence):
-                continue
-            if isinstance(sentence.subject, Variable):
-                if sentence.subject.name in partial_bindings:
-                    continue
-                class_name = sentence.subject.class_name
-                new_binding_candidates[sentence.subject.name] = universe.classes[class_name]
+        settings = universe.settings
+        trace = universe.events.level >= TRACE
+        if trace:
+            universe.events.emit('subrule_test', subrule=self.__str__())
+        subrule_profile = universe.profile.subrules[self]
+        subrule_profile.evaluations += 1
+        # Consult the universe's subrule cache, which is keyed by the bindings of only the names referenced here
+        if settings.memoize_subrules:
+            key = (self.canonical_form, tuple(partial_bindings.get(name, UNBOUND) for name in self.references))
+            try:
+                evaluation = universe.subrule_cache[key]
+            except KeyError:
+                universe.subrule_cache_misses += 1
             else:
-                if sentence.subject in partial_bindings:
-                    continue
-                # Ex: candidate_bindings['GEORGE'] = ['GEORGE']
-                new_binding_candidates[sentence.subject] = [sentence.subject]
-        for sentence in flattened_sentence_list:
-            if not isinstance(sentence, Sentence):
-                continue
-            if not sentence.object:
+                universe.subrule_cache_hits += 1
+                subrule_profile.cache_hits += 1
+                if trace:
+                    universe.events.emit('cached_evaluation', evaluation=evaluation)
+                return evaluation
+        match_calls_before_evaluation = universe.match_calls
+        evaluation = self._evaluate(universe=universe, partial_bindings=partial_bindings)
+        subrule_profile.match_calls += universe.match_calls - match_calls_before_evaluation
+        if settings.memoize_subrules:
+            if len(universe.subrule_cache) >= settings.subrule_cache_size:
+                universe.subrule_cache.clear()
+            universe.subrule_cache[key] = evaluation
+        return evaluation
+
+    def _evaluate(self, universe, partial_bindings):
+        """Return whether some binding of the variables local to this subrule satisfies its sentence list."""
+        # Collect candidate bindings for the variables local to this subrule
+        local_binding_candidates = {}
+        domain_pruning = universe.settings.domain_pruning
+        for name, (class_symbol, noun_symbol) in self.domains.items():
+            if name in partial_bindings:
                 continue
-            if isinstance(sentence.object, Variable):
-                if sentence.object.name in partial_bindings:
-                    continue
-                class_name = sentence.object.class_name
-                new_binding_candidates[sentence.object.name] = universe.classes[class_name]
+            if noun_symbol is None:
+                candidates = universe.classes[class_symbol]
+                if domain_pruning and name in self.domain_constraints:
+                    candidates = prune_candidates(
+                        universe=universe,
+                        candidates=candidates,
+                        constraints=self.domain_constraints[name],
+                        bindings=partial_bindings
+                    )
+                local_binding_candidates[name] = candidates
             else:
-                if sentence.object in partial_bindings:
-                    continue
-                # Ex: candidate_bindings['GEORGE'] = ['GEORGE']
-                new_binding_candidates[sentence.object] = [sentence.object]
-        # Test all bindings
-        binding_candidates = {**partial_bindings, **new_binding_candidates}  # Merge the two dictionaries
-        variable_ordering = list(binding_candidates.keys())
-        candidate_bindings = list(itertools.product(*binding_candidates.values()))
-        for ordered_candidates_list in candidate_bindings:
-            candidate_binding = {}
-            for i, variable_name in enumerate(variable_ordering):
-                candidate_binding[variable_name] = ordered_candidates_list[i]
-            if config.VERBOSITY >= 3:
-                print(f"    Binding: {candidate_binding}")
-            this_rule_holds = self._evaluate_sentences(
-                universe=universe,
-                binding=candidate_binding,
-                sentence_list=self.sentence_list
-            )
-            if this_rule_holds:
+                local_binding_candidates[name] = [noun_symbol]  # Ex: candidate_bindings['GEORGE'] = [<GEORGE>]
+        # Test the bindings one at a time, stopping as soon as one satisfies the sentence list
+        candidate_binding = dict(partial_bindings)
+        local_variable_ordering = list(local_binding_candidates)
+        trace = universe.events.level >= TRACE
+        for local_candidates in itertools.product(*local_binding_candidates.values()):
+            candidate_binding.update(zip(local_variable_ordering, local_candidates))
+            if trace:
+                universe.events.emit('local_binding', bindings=decode_binding(candidate_binding))
+            if self.condition(universe, candidate_binding):
                 return True
         return False
 
-    def _evaluate_sentences(self, universe, binding, sentence_list):
-        """Evaluate the given sentence(s) or list of sentence(s)."""
-        sentence_list = list(sentence_list)  # Make a copy, to be safe
-        while any(component for component in sentence_list if not isinstance(component, str)):
-            for i, component in enumerate(sentence_list):
-                if isinstance(component, list):
-                    sentence_list[i] = self._evaluate_sentences(
-                        universe=universe,
-                        binding=binding,
-                        sentence_list=component
-                    )
-                    continue
-                if component == '&':
-                    sentence_list[i] = 'and'
-                    continue
-                if component == '/':
-                    sentence_list[i] = 'or'
-                    continue
-                if isinstance(component, str):
-                    continue
-                if isinstance(component, bool):
-                    sentence_list[i] = str(component)
-                    continue
-                # If we get to here, it's a Sentence or a TimeSentence object
-                if isinstance(component, Sentence):
-                    sentence_list[i] = str(component.evaluate(bindings=binding, universe=universe))
-                else:
-                    sentence_list[i] = str(component.evaluate(universe=universe))
-        return eval(' '.join(str(component) for component in sentence_list))
-
 
 class Sentence:
     """A precondition ("sentence") on a subrule."""
@@ -279,27 +478,6 @@ class Sentence:
         """Return string representation."""
         return self.__str__()
 
-    def evaluate(self, bindings, universe):
-        """Return whether this sentence holds, given the binding and the current state of the modelled universe."""
-        if isinstance(self.subject, Variable):
-            ground_subject = bindings[self.subject.name]
-        else:
-            ground_subject = bindings[self.subject]
-        if self.object is None:
-            ground_object = None
-        elif isinstance(self.object, Variable):
-            ground_object = bindings[self.object.name]
-        else:
-            ground_object = bindings[self.object]
-        evaluation = universe.match(
-            triple_subject=ground_subject,
-            triple_relation=self.relation,
-            triple_object=ground_object
-        )
-        if config.VERBOSITY >= 3:
-            print(f"      Evaluated sentence to {evaluation}: ({ground_subject} {self.relation} {ground_object})")
-        return evaluation
-
 
 class TimeSentence:
     """A precondition ("sentence") on a subrule pertaining to the current plot time."""
@@ -317,17 +495,6 @@ class TimeSentence:
         """Return string representation."""
         return self.__str__()
 
-    def evaluate(self, universe):
-        """Return whether this sentence holds, given the current time frame of the modelled universe."""
-        if self.operator == '==':
-            return universe.time == self.time_value
-        if self.operator == '!=':
-            return universe.time != self.time_value
-        if self.operator == '<':
-            return universe.time < self.time_value
-        if self.operator == '>':
-            return universe.time > self.time_value
-
 
 class Relation:
     """A relation between nodes in a semantic network."""
@@ -335,6 +502,7 @@ class Relation:
     def __init__(self, name, negate_field, duration_modifier_operator, duration_modifier_time_value):
         """Initialize a Relation object."""
         self.name = name  # Name of the relation
+        self.symbol = None  # The symbol for the name, which is resolved by Compiler._compile_rule()
         self.negate_field = negate_field  # True if this relation has a delete field or negate field
         if duration_modifier_operator:
             assert duration_modifier_time_value, (
@@ -376,3 +544,28 @@ class Variable:
     def __repr__(self):
         """Return string representation."""
         return self.__str__()
+
+
+def prune_candidates(universe, candidates, constraints, bindings):
+    """Return the given candidate bindings, in order, less those ruled out by the given domain constraints.
+
+    Each constraint is a (required, fillers) pair, where fillers takes the universe and the given binding and
+    returns the set of nouns that a candidate must be among, if required, or must not be among, otherwise.
+    """
+    required_nouns = None
+    excluded_nouns = set()
+    for required, fillers in constraints:
+        nouns = fillers(universe, bindings)
+        if required:
+            required_nouns = nouns if required_nouns is None else required_nouns & nouns
+        else:
+            excluded_nouns |= nouns
+    return [
+        noun for noun in candidates
+        if (required_nouns is None or noun in required_nouns) and noun not in excluded_nouns
+    ]
+
+
+def decode_binding(binding):
+    """Return a copy of the given binding with its symbols decoded into names, for use in printout."""
+    return {name: SYMBOL_TABLE.decode(symbol) for name, symbol in binding.items()}
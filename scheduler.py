@@ -0,0 +1,41 @@
+import bisect
+
+
+class Scheduler:
+    """The agenda of the rules to be tested in each time frame, from which dormant rules are left out.
+
+    A rule is dormant at the plot times outside of its active intervals, at which its time sentences alone
+    are certain to abandon it under every binding (see Compiler._compile_active_intervals()), so leaving it
+    off the agenda does not alter the generated stories. Since the agenda only changes as the clock crosses
+    the bounds of active intervals, it is built once for each stretch of plot time between those bounds, and
+    looking up the agenda for a time frame costs a binary search.
+    """
+
+    def __init__(self, rules):
+        """Initialize a Scheduler object."""
+        self.rules = rules
+        # The finite bounds of the active intervals of the rules, in ascending order
+        self.bounds = sorted({
+            bound for rule in rules for interval in rule.active_intervals for bound in interval
+            if bound not in (float('-inf'), float('inf'))
+        })
+        self._agendas = {}  # Maps the indices of stretches of plot time between bounds to their agendas
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Scheduler ({len(self.rules)} rules, {len(self.bounds)} bounds)"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def agenda(self, plot_time):
+        """Return the rules that are active at the given plot time, in file order."""
+        stretch = bisect.bisect_right(self.bounds, plot_time)
+        try:
+            return self._agendas[stretch]
+        except KeyError:
+            pass
+        agenda = tuple(rule for rule in self.rules if rule.active_at(plot_time=plot_time))
+        self._agendas[stretch] = agenda
+        return agenda
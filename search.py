@@ -0,0 +1,126 @@
+"""Search for stories with specific outcomes by branching a running simulation instance (see MESSY.fork()).
+
+Rather than simulating whole universes from the start time with new seeds and discarding most of them, a search
+branches a running instance, so that every continuation it explores shares the prefix simulated so far. Each branch
+draws from a random-number generator of its own, seeded with a seed of its own, and is scored by a function of the
+branch. A best-of-N search simulates N branches to the end and keeps the best one; a rollout search proceeds in
+stages, simulating N branches a few time frames ahead at each stage and carrying on from the best one. Run from the
+repository root, e.g., to find a story in which a murder occurs by 9pm:
+
+    python search.py --goal "MURDER OCCURRED" --deadline 2100 --branches 16
+"""
+import argparse
+import config
+from messy import MESSY
+from symbols import SYMBOL_TABLE
+
+
+def best_of_n(messy, score, number_of_branches, number_of_time_frames, first_seed=0, good_enough=None):
+    """Return the best-scoring of the given number of branches of the given instance, along with its score.
+
+    Each branch is simulated for the given number of time frames, and the branches are seeded with consecutive
+    seeds starting from the given one, with ties going to the earliest branch. If a branch scores at least as
+    high as the given score that is good enough, it is returned straightaway.
+    """
+    best_branch, best_score = None, None
+    for seed in range(first_seed, first_seed + number_of_branches):
+        branch = messy.fork(random_seed=seed)
+        for _ in range(number_of_time_frames):
+            branch.simulate()
+        branch_score = score(branch)
+        if best_branch is None or branch_score > best_score:
+            best_branch, best_score = branch, branch_score
+        if good_enough is not None and best_score >= good_enough:
+            break
+    return best_branch, best_score
+
+
+def rollout_search(messy, score, number_of_branches, horizon, number_of_time_frames, first_seed=0):
+    """Return a continuation of the given instance found by rollout search, along with its score.
+
+    The search simulates the given number of time frames in stages of the given horizon: at each stage, it
+    runs a best-of-N search (see best_of_n()) from the branch kept at the preceding stage, and keeps the best
+    branch. Each stage seeds its branches with seeds following on from those of the preceding stage.
+    """
+    branch, branch_score = messy, score(messy)
+    seed = first_seed
+    while number_of_time_frames > 0:
+        stage_length = min(horizon, number_of_time_frames)
+        branch, branch_score = best_of_n(
+            messy=branch,
+            score=score,
+            number_of_branches=number_of_branches,
+            number_of_time_frames=stage_length,
+            first_seed=seed
+        )
+        seed += number_of_branches
+        number_of_time_frames -= stage_length
+    return branch, branch_score
+
+
+def goal(triple_subject, triple_relation, triple_object=None, deadline=None):
+    """Return a function scoring an instance 1 if its universe has come to hold the given triple, and 0 otherwise.
+
+    If a deadline (plot time) is given, the triple must have been added to the network by then.
+    """
+    key = (
+        SYMBOL_TABLE.encode(triple_subject),
+        SYMBOL_TABLE.encode(triple_relation),
+        None if triple_object is None else SYMBOL_TABLE.encode(triple_object)
+    )
+
+    def score(messy):
+        """Return 1 if the universe of the given instance has come to hold the triple in time, and 0 otherwise."""
+        history = messy.universe.history
+        for time_since_start in history.time_frames:
+            if deadline is not None and history.plot_times[time_since_start] > deadline:
+                break
+            for triple in history.additions[time_since_start]:
+                if (triple.subject, triple.relation, triple.object) == key:
+                    return 1
+        return 0
+
+    return score
+
+
+def main():
+    """Search for a story in which the given goal triple comes to hold, and print its report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--goal', required=True, help="the triple to be achieved, e.g., \"MURDER OCCURRED\"")
+    parser.add_argument('--deadline', type=int, help="the plot time by which the goal must be achieved")
+    parser.add_argument('--seed', type=int, default=0, help="the random seed of the common prefix")
+    parser.add_argument('--prefix', type=int, default=0, help="the number of time frames simulated before branching")
+    parser.add_argument('--branches', type=int, default=16)
+    parser.add_argument('--horizon', type=int, help="run a rollout search with stages of this many time frames")
+    args = parser.parse_args()
+    settings = config.Settings(verbosity=0, output_to_file=False, random_seed=args.seed)
+    messy = MESSY(settings=settings)
+    for _ in range(args.prefix):
+        messy.simulate()
+    score = goal(*args.goal.upper().split(), deadline=args.deadline)
+    number_of_time_frames = settings.number_of_time_frames - args.prefix
+    if args.horizon:
+        branch, branch_score = rollout_search(
+            messy=messy,
+            score=score,
+            number_of_branches=args.branches,
+            horizon=args.horizon,
+            number_of_time_frames=number_of_time_frames
+        )
+    else:
+        branch, branch_score = best_of_n(
+            messy=messy,
+            score=score,
+            number_of_branches=args.branches,
+            number_of_time_frames=number_of_time_frames,
+            good_enough=1
+        )
+    if not branch_score:
+        print(f"No branch achieved the goal '{args.goal}'")
+        return
+    branch.terminate()
+    print(branch.monitor.render(universe=branch.universe))
+
+
+if __name__ == "__main__":
+    main()
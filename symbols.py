@@ -0,0 +1,56 @@
+import threading
+
+
+class SymbolTable:
+    """A table mapping the nouns, relations, and class names of a storyworld to dense integer ids ("symbols").
+
+    Rules are compiled, and universes are loaded, against the same table, so that the compiled rules and
+    the semantic networks refer to everything by symbol, and comparisons and hashing in the simulation loop
+    are integer operations. Symbols are only decoded back into names for printout and narration. Since a
+    symbol merely stands in for its name, and nothing is ordered by symbol, the symbols assigned to a given
+    name may differ from process to process without altering the generated stories.
+    """
+
+    def __init__(self):
+        """Initialize a SymbolTable object."""
+        self._symbols = {}  # Maps names to their symbols
+        self._names = []  # Maps symbols (as indices) to their names
+        self._lock = threading.Lock()  # Guards the assignment of new symbols
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Symbol Table ({len(self)} symbols)"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def __len__(self):
+        """Return the number of symbols assigned so far."""
+        return len(self._names)
+
+    def __contains__(self, name):
+        """Return whether a symbol has been assigned to the given name."""
+        return name in self._symbols
+
+    def encode(self, name):
+        """Return the symbol for the given name, assigning it the next one if it has none yet."""
+        try:
+            return self._symbols[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._symbols:
+                self._symbols[name] = len(self._names)
+                self._names.append(name)
+            return self._symbols[name]
+
+    def decode(self, symbol):
+        """Return the name for the given symbol, or None if None is given (e.g., for a triple with no object)."""
+        if symbol is None:
+            return None
+        return self._names[symbol]
+
+
+# The symbol table shared by the compiler and every universe in this process
+SYMBOL_TABLE = SymbolTable()
@@ -0,0 +1,71 @@
+"""Check that the story generated for each seed by a batch does not depend on how the batch is run.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+import multiprocessing
+from unittest import mock
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+import config
+import batch
+from messy import MESSY
+
+
+SEEDS = range(3)
+
+
+def generate_story(seed):
+    """Return the report of the story simulated in this process for the given seed under the default settings."""
+    settings = config.Settings(verbosity=0, output_to_file=False, random_seed=seed)
+    messy = MESSY(settings=settings)
+    for _ in range(settings.number_of_time_frames):
+        messy.simulate()
+    messy.terminate()
+    return messy.monitor.render(universe=messy.universe)
+
+
+class TestBatch(unittest.TestCase):
+    """Tests of batch.generate_stories()."""
+
+    @classmethod
+    def setUpClass(cls):
+        # The default settings locate the rules and other files relative to the repository root
+        cls.working_directory = os.getcwd()
+        os.chdir(REPOSITORY_DIRECTORY)
+        cls.reports = [generate_story(seed=seed) for seed in SEEDS]
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.working_directory)
+
+    def assert_same_stories(self, number_of_workers, start_method=None):
+        """Assert that a batch run as given generates the same story for each seed as a run in this process."""
+        get_context = multiprocessing.get_context
+        if start_method is None:
+            stories = list(batch.generate_stories(seeds=SEEDS, number_of_workers=number_of_workers))
+        else:
+            with mock.patch.object(batch.multiprocessing, 'get_context', lambda _: get_context(start_method)):
+                stories = list(batch.generate_stories(seeds=SEEDS, number_of_workers=number_of_workers))
+        self.assertEqual([seed for seed, _ in stories], list(SEEDS))
+        self.assertEqual([report for _, report in stories], self.reports)
+
+    def test_number_of_workers(self):
+        for number_of_workers in (1, 3):
+            with self.subTest(number_of_workers=number_of_workers):
+                self.assert_same_stories(number_of_workers=number_of_workers)
+
+    def test_pickled_rules(self):
+        # Under the spawn start method, the workers receive the rules pickled, and compile them anew
+        self.assert_same_stories(number_of_workers=2, start_method='spawn')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Check that a run resumed from a checkpoint continues exactly as the run the checkpoint was taken from.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+import config
+from messy import MESSY
+from checkpoint import Checkpoint
+
+
+def new_messy(**overrides):
+    """Return a simulation instance of the murder story under the given settings."""
+    settings = config.Settings(
+        verbosity=0,
+        rules_cache_directory=None,
+        path_to_rules_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_RULES_FILE),
+        path_to_initial_conditions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_INITIAL_CONDITIONS_FILE),
+        path_to_lexical_expressions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_LEXICAL_EXPRESSIONS_FILE),
+        **overrides
+    )
+    return MESSY(settings=settings)
+
+
+def story_state(messy):
+    """Return the triples at each plot time in the history, and in the network, of the given instance's universe."""
+    universe = messy.universe
+    history = [
+        (time, [(triple.id, str(triple), triple.time_since_start) for triple in universe.history[time]])
+        for time in sorted(universe.history)
+    ]
+    network = [(triple.id, str(triple)) for triple in universe.network]
+    return history, network, universe.time, universe.time_since_start, universe.random_draws
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Tests of MESSY.save_checkpoint() and MESSY.restore_checkpoint()."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'run.checkpoint')
+
+    def test_round_trip(self):
+        # The run goes past midnight, so that plot times recur in the history
+        straight = new_messy(random_seed=7)
+        for _ in range(60):
+            straight.simulate()
+        saver = new_messy(random_seed=7)
+        for _ in range(45):
+            saver.simulate()
+        saver.save_checkpoint(path=self.path)
+        # The resumed instance starts from a different seed and state, all of which the checkpoint replaces
+        resumed = new_messy(random_seed=99)
+        for _ in range(5):
+            resumed.simulate()
+        resumed.restore_checkpoint(path=self.path)
+        self.assertEqual(story_state(resumed), story_state(saver))
+        for _ in range(15):
+            resumed.simulate()
+            saver.simulate()
+        self.assertEqual(story_state(resumed), story_state(straight))
+        self.assertEqual(story_state(saver), story_state(straight))
+
+    def test_not_a_checkpoint(self):
+        with open(self.path, 'wb') as checkpoint_file:
+            checkpoint_file.write(bytes(Checkpoint.HEADER.size))
+        with self.assertRaises(Exception) as context:
+            Checkpoint(path=self.path)
+        self.assertEqual(str(context.exception), f"Not a checkpoint file: {self.path}")
+
+    def test_other_format_version(self):
+        with open(self.path, 'wb') as checkpoint_file:
+            checkpoint_file.write(Checkpoint.HEADER.pack(Checkpoint.MAGIC, Checkpoint.VERSION + 1, 1, 0))
+        with self.assertRaises(Exception) as context:
+            Checkpoint(path=self.path)
+        self.assertIn(f"format version {Checkpoint.VERSION + 1}", str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
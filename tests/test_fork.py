@@ -0,0 +1,108 @@
+"""Check that forked simulation instances continue from a common prefix without affecting one another.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+import config
+from messy import MESSY
+from universe import TripleStore
+
+
+def new_messy(**overrides):
+    """Return a simulation instance of the murder story under the given settings."""
+    settings = config.Settings(
+        verbosity=0,
+        rules_cache_directory=None,
+        path_to_rules_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_RULES_FILE),
+        path_to_initial_conditions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_INITIAL_CONDITIONS_FILE),
+        path_to_lexical_expressions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_LEXICAL_EXPRESSIONS_FILE),
+        **overrides
+    )
+    return MESSY(settings=settings)
+
+
+def story_state(messy):
+    """Return the triples in the history and network of the given instance's universe, along with its clock."""
+    universe = messy.universe
+    history = [
+        (time_since_start, [(triple.id, str(triple)) for triple in universe.history.state_at(time_since_start)])
+        for time_since_start in universe.history.time_frames
+    ]
+    network = [(triple.id, str(triple)) for triple in universe.network]
+    return history, network, universe.time, universe.random_draws
+
+
+def index_entries(store):
+    """Return the entries of each index of the given triple store, as lists."""
+    return [
+        {key: list(container) for key, container in index.items()}
+        for index in (store._by_subject_relation_object, store._by_subject_relation, store._by_relation,
+                      store._by_relation_and_time, store._times_by_relation)
+    ] + [list(store._triples)]
+
+
+class TestFork(unittest.TestCase):
+    """Tests of MESSY.fork()."""
+
+    def setUp(self):
+        self.messy = new_messy(random_seed=7)
+        for _ in range(20):
+            self.messy.simulate()
+
+    def test_parent_is_unaffected(self):
+        straight = new_messy(random_seed=7)
+        for _ in range(30):
+            straight.simulate()
+        forks = [self.messy.fork(random_seed=seed) for seed in range(4)]
+        for fork in forks:
+            for _ in range(10):
+                fork.simulate()
+        for _ in range(10):
+            self.messy.simulate()
+        self.assertEqual(story_state(self.messy), story_state(straight))
+        # The branches drew from generators of their own, and so (almost surely) went their separate ways
+        self.assertGreater(len({repr(story_state(fork)) for fork in forks}), 1)
+
+    def test_fork_with_same_generator_state_replicates_parent(self):
+        fork = self.messy.fork(random_seed=0)
+        fork.random.setstate(self.messy.random.getstate())
+        for _ in range(10):
+            fork.simulate()
+            self.messy.simulate()
+        self.assertEqual(story_state(fork), story_state(self.messy))
+
+    def test_indices_stay_consistent(self):
+        parent_entries = index_entries(self.messy.universe.network)
+        forks = [self.messy.fork(random_seed=seed) for seed in range(3)]
+        for fork in forks:
+            for _ in range(10):
+                fork.simulate()
+            network = fork.universe.network
+            self.assertEqual(index_entries(network), index_entries(TripleStore(list(network))))
+        # Modifications made by the branches to the containers they shared with the parent were made to copies
+        self.assertEqual(index_entries(self.messy.universe.network), parent_entries)
+
+    def test_history_is_unaffected(self):
+        time_frames = list(self.messy.universe.history.time_frames)
+        states = [self.messy.universe.history.state_at(time_since_start=t) for t in time_frames]
+        fork = self.messy.fork(random_seed=1)
+        for _ in range(10):
+            fork.simulate()
+        history = self.messy.universe.history
+        self.assertEqual(history.time_frames, time_frames)
+        self.assertEqual([history.state_at(time_since_start=t) for t in time_frames], states)
+        self.assertEqual(fork.universe.history.time_frames[:len(time_frames)], time_frames)
+        self.assertEqual(len(fork.universe.history.time_frames), len(time_frames) + 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Check that the stories simulated for a few seeds match those of the original implementation.
+
+Each evaluation strategy that may be toggled in the settings is meant to change only how fast a story is
+simulated, never which story is simulated. For each seed, the story is reduced to a digest of the state of
+the universe at each time frame, and compared against the digest recorded from the original implementation,
+under the default settings and under each optional mode. Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import hashlib
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+import config
+from messy import MESSY
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Maps each seed to the digest of the murder story simulated for it by the original implementation
+GOLDEN_DIGESTS = {
+    0: 'c7c426547010409a0d00e03a69840334',
+    1: '85bcef54c93e105187d2d4d8192466f3',
+    2: '52c13994b391c822d5d49839c1df5dbf',
+    3: 'ca85a9a31fe9bb4c7addd93427ef1a20',
+    4: '56d56028898619dd551d34d871933ca6',
+}
+
+
+def story_digest(**overrides):
+    """Return the digest of the murder story simulated under the given settings."""
+    settings = config.Settings(
+        verbosity=0,
+        rules_cache_directory=None,
+        path_to_rules_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_RULES_FILE),
+        path_to_initial_conditions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_INITIAL_CONDITIONS_FILE),
+        path_to_lexical_expressions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_LEXICAL_EXPRESSIONS_FILE),
+        **overrides
+    )
+    messy = MESSY(settings=settings)
+    for _ in range(settings.number_of_time_frames):
+        messy.simulate()
+    messy.terminate()
+    frames = [(time, sorted(str(triple) for triple in messy.universe.history[time]))
+              for time in sorted(messy.universe.history)]
+    return hashlib.md5(repr(frames).encode()).hexdigest()
+
+
+class TestGoldenStories(unittest.TestCase):
+    """Tests that each evaluation strategy simulates the same stories as the original implementation."""
+
+    def assert_golden(self, **overrides):
+        """Assert that the story simulated for each seed under the given settings matches its golden digest."""
+        for seed, digest in GOLDEN_DIGESTS.items():
+            with self.subTest(seed=seed, **overrides):
+                self.assertEqual(story_digest(random_seed=seed, **overrides), digest)
+
+    def test_default_settings(self):
+        self.assert_golden()
+
+    def test_without_subrule_memoization(self):
+        self.assert_golden(memoize_subrules=False)
+
+    def test_incremental_evaluation(self):
+        self.assert_golden(incremental_evaluation=True)
+
+    def test_adaptive_subrule_ordering(self):
+        self.assert_golden(adaptive_subrule_ordering=True)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_vectorized_evaluation(self):
+        self.assert_golden(vectorized_evaluation=True)
+
+    def test_without_time_window_scheduling(self):
+        self.assert_golden(time_window_scheduling=False)
+
+    def test_without_domain_pruning(self):
+        self.assert_golden(domain_pruning=False)
+
+    def test_all_optional_modes(self):
+        self.assert_golden(incremental_evaluation=True, adaptive_subrule_ordering=True, time_window_scheduling=True,
+                           domain_pruning=True, vectorized_evaluation=numpy is not None)
+
+
+if __name__ == '__main__':
+    unittest.main()
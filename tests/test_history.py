@@ -0,0 +1,89 @@
+"""Check that the history of a simulated universe reconstructs the states of its network, and its report.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import hashlib
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+import config
+from messy import MESSY
+
+
+# Maps (seed, number of time frames) to the digests of the states at each plot time and of the report of the
+# murder story, as simulated by the original implementation; the clock stops at midnight after 42 time frames
+GOLDEN_DIGESTS_PAST_MIDNIGHT = {
+    (10, 70): ('d948518d19400899a6a76291ae1405a8', 'a17cec2aee9c653e2c3266073fac5e23'),
+    (13, 90): ('49cc43d25c93d981c5717429f44f533a', '33f7c1e329d81886178379871464653f'),
+}
+
+
+def new_messy(**overrides):
+    """Return a simulation instance of the murder story under the given settings."""
+    settings = config.Settings(
+        verbosity=0,
+        rules_cache_directory=None,
+        path_to_rules_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_RULES_FILE),
+        path_to_initial_conditions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_INITIAL_CONDITIONS_FILE),
+        path_to_lexical_expressions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_LEXICAL_EXPRESSIONS_FILE),
+        **overrides
+    )
+    return MESSY(settings=settings)
+
+
+class TestHistory(unittest.TestCase):
+    """Tests of the reconstruction of the states of a network from its history."""
+
+    def test_state_at_each_time_frame(self):
+        """The state reconstructed at each time frame is the network as it was at that time frame."""
+        messy = new_messy(random_seed=10, history_snapshot_interval=4)
+        states = {0: list(messy.universe.network)}
+        for _ in range(60):
+            messy.simulate()
+            states[messy.universe.time_since_start] = list(messy.universe.network)
+        history = messy.universe.history
+        self.assertEqual(history.time_frames, list(states))
+        for time_since_start, state in states.items():
+            with self.subTest(time_since_start=time_since_start):
+                self.assertEqual(history.state_at(time_since_start=time_since_start), state)
+
+    def test_past_midnight(self):
+        """Past midnight, each plot time holds the state at the latest time frame at it, as originally."""
+        for (seed, number_of_time_frames), (states_digest, report_digest) in GOLDEN_DIGESTS_PAST_MIDNIGHT.items():
+            with self.subTest(seed=seed, number_of_time_frames=number_of_time_frames):
+                messy = new_messy(random_seed=seed)
+                for _ in range(number_of_time_frames):
+                    messy.simulate()
+                messy.terminate()
+                history = messy.universe.history
+                self.assertEqual(len(history.time_frames), number_of_time_frames + 1)
+                self.assertLess(len(history), len(history.time_frames))
+                states = [(time, sorted(str(triple) for triple in history[time])) for time in sorted(history)]
+                self.assertEqual(hashlib.md5(repr(states).encode()).hexdigest(), states_digest)
+                report = messy.monitor.render(universe=messy.universe)
+                self.assertEqual(hashlib.md5(report.encode()).hexdigest(), report_digest)
+
+    def test_discard_before(self):
+        """Discarding the records before a time frame keeps the states at it and at every later one."""
+        messy = new_messy(random_seed=11, history_snapshot_interval=8)
+        for _ in range(50):
+            messy.simulate()
+        history = messy.universe.history
+        expected = {t: history.state_at(time_since_start=t) for t in history.time_frames[45:]}
+        history.discard_before(time_since_start=history.time_frames[45])
+        self.assertEqual(history.time_frames, list(expected))
+        for time_since_start, state in expected.items():
+            self.assertEqual(history.state_at(time_since_start=time_since_start), state)
+        with self.assertRaises(KeyError):
+            history.state_at(time_since_start=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
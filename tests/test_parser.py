@@ -0,0 +1,157 @@
+"""Check the rules-file parser, and in particular the positions at which it reports syntax errors.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+from compiler import Compiler, RuleParser
+from rules import Sentence, TimeSentence
+
+
+def parse(text):
+    """Parse the given source text of a rules file, returning uncompiled Rule objects."""
+    return RuleParser(lines=text.splitlines(keepends=True), source_name='test').parse()
+
+
+class TestRuleParser(unittest.TestCase):
+    """Tests of the parsing of rules files."""
+
+    def assert_syntax_error(self, text, line_number, column, message):
+        """Assert that parsing the given text reports the given syntax error at the given line and column."""
+        with self.assertRaises(Exception) as context:
+            parse(text)
+        self.assertEqual(
+            str(context.exception),
+            f"Syntax error in test, line {line_number}, column {column}: {message}"
+        )
+
+    def test_rule(self):
+        rules = parse(
+            "% A comment\n"
+            "$RULE X.MEN LIKES Y.WOMEN:1, X ≠DRUNK;\n"
+            "  -10, 0: (X DEAD);\n"
+            "  .5, 0:  [T < 2000 / T > 1650] & (X KNOWS/LOVES Y);\n"
+        )
+        self.assertEqual(len(rules), 1)
+        rule = rules[0]
+        self.assertEqual([action.raw_definition for action in rule.action_list], ['X.MEN LIKES Y.WOMEN:1', 'X !=DRUNK'])
+        self.assertEqual([(subrule.true_value, subrule.false_value) for subrule in rule.subrules], [(-10, 0), (.5, 0)])
+        time_sentences, operator, sentences = rule.subrules[1].sentence_list
+        self.assertEqual(operator, '&')
+        self.assertIsInstance(time_sentences[0], TimeSentence)
+        self.assertEqual(time_sentences[1], '/')
+        self.assertEqual([type(component) for component in sentences], [Sentence, str, Sentence])
+
+    def test_asterisks_are_ignored(self):
+        with_asterisks = parse("$RULE *X* LIKES Y;\n  1, 0: (*X KNOWS* Y);\n")
+        without_asterisks = parse("$RULE X LIKES Y;\n  1, 0: (X KNOWS Y);\n")
+        self.assertEqual(with_asterisks[0].raw_definition, without_asterisks[0].raw_definition)
+
+    def test_error_position(self):
+        self.assert_syntax_error(
+            text="$RULE X LIKES Y;\n  1, 0: (X KNOWS Y) FOO;\n",
+            line_number=2,
+            column=21,
+            message="Expected a sentence but found 'FOO'"
+        )
+
+    def test_error_position_after_comment(self):
+        self.assert_syntax_error(
+            text="% A comment\n$RULE X LIKES Y;\n  1, 0: (X KNOWS Y) FOO;\n",
+            line_number=3,
+            column=21,
+            message="Expected a sentence but found 'FOO'"
+        )
+
+    def test_error_position_after_asterisks(self):
+        # Asterisks on preceding lines and earlier on the same line count toward lines and columns as usual
+        self.assert_syntax_error(
+            text="$RULE X LIKES Y;  ***1, 0: (X *KNOWS* Y) / (*****X LOVES Y);\n  1, 0: *(X KNOWS Y) FOO;\n",
+            line_number=2,
+            column=22,
+            message="Expected a sentence but found 'FOO'"
+        )
+        self.assert_syntax_error(
+            text="$RULE X LIKES Y;\n  1, 0: (X KNOWS Y) ** FOO;\n",
+            line_number=2,
+            column=24,
+            message="Expected a sentence but found 'FOO'"
+        )
+
+    def test_malformed_definitions(self):
+        self.assert_syntax_error(
+            text="$RULE X LIKES Y;\n  1 0: (X KNOWS Y);\n",
+            line_number=2,
+            column=5,
+            message="Expected ',' but found '0'"
+        )
+        self.assert_syntax_error(
+            text="$RULE X LIKES Y;\n  A, 0: (X KNOWS Y);\n",
+            line_number=2,
+            column=3,
+            message="Expected a probability increment but found 'A'"
+        )
+        self.assert_syntax_error(
+            text="$RULE X;\n",
+            line_number=1,
+            column=7,
+            message="Expected an action of the form 'SUBJECT RELATION [OBJECT]' but found 'X'"
+        )
+        self.assert_syntax_error(
+            text="$RULE X LIKES Y;\n  1, 0: [T < 2000;\n",
+            line_number=2,
+            column=18,
+            message="Expected ']' but found ';'"
+        )
+        self.assert_syntax_error(
+            text="X LIKES Y;\n",
+            line_number=1,
+            column=1,
+            message="Expected '$RULE' but found 'X'"
+        )
+
+
+class TestRulesCache(unittest.TestCase):
+    """Tests of the on-disk cache of parsed rules files."""
+
+    def test_unreadable_entries_are_overwritten(self):
+        # Entries that are truncated, or that name modules or classes that do not exist (as stale or foreign
+        # entries may), are parsed anew and overwritten
+        for entry in (b'', b'\x80\x05\x95', b'cno_such_module\nRule\n.', b'crules\nNoSuchRule\n.', b'N\x85R.'):
+            with self.subTest(entry=entry), tempfile.TemporaryDirectory() as cache_directory:
+                path_to_file = os.path.join(cache_directory, 'rules.txt')
+                with open(path_to_file, 'w') as file:
+                    file.write("$RULE X LIKES Y;\n  1, 0: (X KNOWS Y);\n")
+                parses = []
+
+                def parse_with_cache():
+                    """Return the result of parsing the file, consulting the cache."""
+                    return Compiler._parse_with_cache(
+                        path_to_file=path_to_file,
+                        cache_directory=cache_directory,
+                        parse=lambda: parses.append(len(parses)) or ['parsed', len(parses)]
+                    )
+
+                self.assertEqual(parse_with_cache(), ['parsed', 1])
+                path_to_cache_file, = (
+                    os.path.join(cache_directory, name) for name in os.listdir(cache_directory)
+                    if name.endswith('.pickle')
+                )
+                with open(path_to_cache_file, 'wb') as cache_file:
+                    cache_file.write(entry)
+                self.assertEqual(parse_with_cache(), ['parsed', 2])
+                self.assertEqual(parse_with_cache(), ['parsed', 2])
+                self.assertEqual(len(parses), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
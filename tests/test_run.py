@@ -0,0 +1,89 @@
+"""Check that streaming a simulation frame by frame simulates the same story as simulating it step by step.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import io
+import os
+import sys
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+import config
+from messy import MESSY
+from events import JSONLinesSink
+
+
+def new_messy(event_sink=None, verbosity=0, **overrides):
+    """Return a simulation instance of the murder story under the given settings, emitting to the given sink."""
+    settings = config.Settings(
+        verbosity=verbosity,
+        rules_cache_directory=None,
+        path_to_rules_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_RULES_FILE),
+        path_to_initial_conditions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_INITIAL_CONDITIONS_FILE),
+        path_to_lexical_expressions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_LEXICAL_EXPRESSIONS_FILE),
+        **overrides
+    )
+    return MESSY(settings=settings, event_sink=event_sink)
+
+
+class TestRun(unittest.TestCase):
+    """Tests of MESSY.run()."""
+
+    def test_same_story_as_simulate(self):
+        stepped = new_messy(random_seed=3)
+        for _ in range(stepped.settings.number_of_time_frames):
+            stepped.simulate()
+        stepped.terminate()
+        streamed = new_messy(random_seed=3)
+        frames = list(streamed.run())
+        self.assertEqual(len(frames), streamed.settings.number_of_time_frames + 1)
+        self.assertEqual(
+            [str(triple) for triple in streamed.universe.network],
+            [str(triple) for triple in stepped.universe.network]
+        )
+        history = streamed.universe.history
+        for frame, time_since_start in zip(frames, history.time_frames):
+            self.assertEqual(frame.time_frame, history.plot_times[time_since_start])
+            self.assertEqual(frame.additions, history.additions[time_since_start])
+
+    def test_frame_is_yielded_before_its_rules_are_tested(self):
+        messy = new_messy(random_seed=3)
+        frames = messy.run()
+        next(frames)
+        frame = next(frames)
+        # The rules of the time frame have yet to be tested, so nothing has been queued for the next one
+        self.assertEqual(frame.time_frame, messy.universe.time)
+        self.assertEqual(messy.universe.queue, [])
+        frames.close()
+
+    def test_stopping_early_wraps_up(self):
+        stream = io.StringIO()
+        sink = JSONLinesSink(stream=stream)
+        messy = new_messy(event_sink=sink, random_seed=3, verbosity=1)
+        frames = messy.run()
+        for i, frame in enumerate(frames):
+            if i == 5:
+                break
+        time_since_start = messy.universe.time_since_start
+        frames.close()
+        self.assertEqual(messy.universe.time_since_start, time_since_start + messy.settings.timestep)
+        self.assertEqual(sink.buffer, [])
+        self.assertIn('"commit"', stream.getvalue())
+
+    def test_without_retaining_history(self):
+        messy = new_messy(random_seed=3, history_snapshot_interval=2)
+        history = messy.universe.history
+        for frame in messy.run(retain_history=False):
+            self.assertEqual(history.time_frames, [messy.universe.time_since_start])
+            self.assertIs(history.additions[messy.universe.time_since_start], frame.additions)
+            if messy.universe.time_since_start:
+                self.assertEqual(history.snapshots, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Check the active intervals worked out for rules from their time sentences, and the agendas built from them.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+import config
+from compiler import Compiler
+from scheduler import Scheduler
+
+
+RULES = (
+    # Abandoned unless the plot time is before 1720
+    "$RULE X LIKES Y;\n  0, -10: [T < 1720];\n  1, 0: (X KNOWS Y);\n"
+    # Abandoned after 2000 and before 0800
+    "$RULE X LOVES Y;\n  -10, 0: [T > 2000 / T < 0800];\n  1, 0: (X KNOWS Y);\n"
+    # Has no time sentences
+    "$RULE X HATES Y;\n  1, 0: (X KNOWS Y);\n"
+    # Could be triggered before its time sentence is reached, so it is never dormant
+    "$RULE X FEARS Y;\n  10, 0: (X KNOWS Y);\n  -10, 0: [T > 2000];\n"
+    # Abandoned at 1200 and between 0900 and 1000, exclusive
+    "$RULE X ENVIES Y;\n  -10, 0: [T == 1200];\n  -10, 0: [T > 0900] & [T < 1000];\n"
+)
+
+
+def parse_rules():
+    """Return the compiled rules of RULES."""
+    with tempfile.TemporaryDirectory() as directory:
+        path_to_rules_file = os.path.join(directory, 'rules.txt')
+        with open(path_to_rules_file, 'w') as rules_file:
+            rules_file.write(RULES)
+        return Compiler.parse_rules_file(
+            path_to_rules_file=path_to_rules_file,
+            settings=config.Settings(verbosity=0, rules_cache_directory=None)
+        )
+
+
+class TestScheduler(unittest.TestCase):
+    """Tests of the scheduling of rules by the intervals of plot time at which they are active."""
+
+    def setUp(self):
+        self.rules = parse_rules()
+        self.scheduler = Scheduler(rules=self.rules)
+
+    def agenda_relations(self, plot_time):
+        """Return the names of the relations of the rules on the agenda for the given plot time."""
+        return [rule.action_list[0].relation.name for rule in self.scheduler.agenda(plot_time=plot_time)]
+
+    def test_active_intervals(self):
+        inf = float('inf')
+        self.assertEqual(
+            [rule.active_intervals for rule in self.rules],
+            [
+                ((-inf, 1720),),
+                ((800, 2001),),
+                ((-inf, inf),),
+                ((-inf, inf),),
+                ((-inf, 901), (1000, 1200), (1201, inf)),
+            ]
+        )
+        self.assertEqual(self.scheduler.bounds, [800, 901, 1000, 1200, 1201, 1720, 2001])
+
+    def test_agenda(self):
+        self.assertEqual(self.agenda_relations(plot_time=700), ['LIKES', 'HATES', 'FEARS', 'ENVIES'])
+        self.assertEqual(self.agenda_relations(plot_time=800), ['LIKES', 'LOVES', 'HATES', 'FEARS', 'ENVIES'])
+        self.assertEqual(self.agenda_relations(plot_time=910), ['LIKES', 'LOVES', 'HATES', 'FEARS'])
+        self.assertEqual(self.agenda_relations(plot_time=1200), ['LIKES', 'LOVES', 'HATES', 'FEARS'])
+        self.assertEqual(self.agenda_relations(plot_time=1720), ['LOVES', 'HATES', 'FEARS', 'ENVIES'])
+        self.assertEqual(self.agenda_relations(plot_time=2001), ['HATES', 'FEARS', 'ENVIES'])
+
+    def test_agenda_at_each_plot_time(self):
+        for plot_time in range(0, 2460):
+            expected = tuple(rule for rule in self.rules if rule.active_at(plot_time=plot_time))
+            self.assertEqual(self.scheduler.agenda(plot_time=plot_time), expected, msg=f"plot time {plot_time}")
+
+    def test_agenda_is_built_once_per_stretch(self):
+        agenda = self.scheduler.agenda(plot_time=1000)
+        for plot_time in range(1000, 1200, 10):
+            self.assertIs(self.scheduler.agenda(plot_time=plot_time), agenda)
+        self.assertIsNot(self.scheduler.agenda(plot_time=1200), agenda)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Check that the subrule cache stays within its bound and that its counters account for every evaluation.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+import config
+from messy import MESSY
+
+
+def new_messy(**overrides):
+    """Return a simulation instance of the murder story under the given settings."""
+    settings = config.Settings(
+        verbosity=0,
+        random_seed=7,
+        rules_cache_directory=None,
+        path_to_rules_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_RULES_FILE),
+        path_to_initial_conditions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_INITIAL_CONDITIONS_FILE),
+        path_to_lexical_expressions_file=os.path.join(REPOSITORY_DIRECTORY, config.PATH_TO_LEXICAL_EXPRESSIONS_FILE),
+        **overrides
+    )
+    return MESSY(settings=settings)
+
+
+def simulate(messy, number_of_time_frames):
+    """Simulate the given number of time frames, checking the size of the subrule cache after each one."""
+    largest_subrule_cache = 0
+    for _ in range(number_of_time_frames):
+        messy.simulate()
+        largest_subrule_cache = max(largest_subrule_cache, len(messy.universe.subrule_cache))
+    return [str(triple) for triple in messy.universe.network], largest_subrule_cache
+
+
+class TestSubruleCache(unittest.TestCase):
+    """Tests of the memoization of subrule evaluations."""
+
+    def test_counters(self):
+        messy = new_messy()
+        simulate(messy=messy, number_of_time_frames=20)
+        universe = messy.universe
+        evaluations = sum(profile.evaluations for profile in universe.profile.subrules.values())
+        cache_hits = sum(profile.cache_hits for profile in universe.profile.subrules.values())
+        self.assertGreater(universe.subrule_cache_hits, 0)
+        self.assertEqual(universe.subrule_cache_hits, cache_hits)
+        self.assertEqual(universe.subrule_cache_hits + universe.subrule_cache_misses, evaluations)
+
+    def test_bound(self):
+        unbounded = new_messy()
+        story, largest_subrule_cache = simulate(messy=unbounded, number_of_time_frames=20)
+        subrule_cache_size = largest_subrule_cache // 4
+        bounded = new_messy(subrule_cache_size=subrule_cache_size)
+        bounded_story, largest_bounded_subrule_cache = simulate(messy=bounded, number_of_time_frames=20)
+        self.assertLessEqual(largest_bounded_subrule_cache, subrule_cache_size)
+        # Evaluations evicted from the cache are evaluated anew, without altering the story
+        self.assertGreater(bounded.universe.subrule_cache_misses, unbounded.universe.subrule_cache_misses)
+        self.assertEqual(
+            bounded.universe.subrule_cache_hits + bounded.universe.subrule_cache_misses,
+            unbounded.universe.subrule_cache_hits + unbounded.universe.subrule_cache_misses
+        )
+        self.assertEqual(bounded_story, story)
+
+    def test_without_memoization(self):
+        messy = new_messy(memoize_subrules=False)
+        story, largest_subrule_cache = simulate(messy=messy, number_of_time_frames=20)
+        self.assertEqual(largest_subrule_cache, 0)
+        self.assertEqual((messy.universe.subrule_cache_hits, messy.universe.subrule_cache_misses), (0, 0))
+        self.assertEqual(story, simulate(messy=new_messy(), number_of_time_frames=20)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
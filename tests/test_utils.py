@@ -0,0 +1,61 @@
+"""Check the pausing of the cyclic garbage collector, including by contexts overlapping across threads.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import gc
+import os
+import sys
+import threading
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+from utils import paused_garbage_collection
+
+
+class TestPausedGarbageCollection(unittest.TestCase):
+    """Tests of utils.paused_garbage_collection()."""
+
+    def setUp(self):
+        self.addCleanup(gc.enable if gc.isenabled() else gc.disable)
+        gc.enable()
+
+    def test_nested(self):
+        with paused_garbage_collection():
+            with paused_garbage_collection():
+                self.assertFalse(gc.isenabled())
+            self.assertFalse(gc.isenabled())
+        self.assertTrue(gc.isenabled())
+
+    def test_overlapping_threads(self):
+        # The context entered first in one thread is exited first, while another thread's is still open
+        entered, exited = threading.Event(), threading.Event()
+
+        def pause():
+            """Pause the collector until signalled to resume."""
+            with paused_garbage_collection():
+                entered.set()
+                exited.wait()
+
+        with paused_garbage_collection():
+            thread = threading.Thread(target=pause)
+            thread.start()
+            entered.wait()
+        self.assertFalse(gc.isenabled())
+        exited.set()
+        thread.join()
+        self.assertTrue(gc.isenabled())
+
+    def test_disabled_beforehand(self):
+        gc.disable()
+        with paused_garbage_collection():
+            self.assertFalse(gc.isenabled())
+        self.assertFalse(gc.isenabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
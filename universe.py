@@ -1,27 +1,79 @@
-import config
-from utils import red, green, blue, yellow
-if config.OUTPUT_TO_FILE:
-    import sys
-    sys.stdout = open(config.LOG_FILE, 'a')
+import copy
+import array
+import bisect
+import itertools
+from symbols import SYMBOL_TABLE
+from events import STORY, triple_fields
+from profiling import Profile
+
+class Wildcard:
+    """A stand-in for any symbol in the position opposite the one whose fillers are sought (see Universe.fillers())."""
+
+    def __str__(self):
+        """Return string representation."""
+        return "ANY"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def __reduce__(self):
+        """Return the name of the sole instance, so that it is pickled (e.g., in a domain constraint) by reference."""
+        return 'ANY'
+
+
+# The sole Wildcard object, which is compared by identity
+ANY = Wildcard()
 
 
 class Universe:
     """A stochastically modifiable semantic model of an arbitrary universe (see Klein 1971)."""
 
-    def __init__(self):
-        """Initialize a Universe object."""
-        self.network = []  # A semantic network containing triples
-        self.history = {}  # Maps previous plot times to the states of the modelled universe at those times
+    def __init__(self, settings, random_number_generator, events):
+        """Initialize a Universe object.
+
+        The settings, random-number generator, and event log are those of the simulation instance that this
+        universe belongs to; they are consulted by the rules that are tested against this universe.
+        """
+        self.settings = settings
+        self.random = random_number_generator
+        self.events = events  # The log to which all events concerning this universe are emitted
+        self.network = TripleStore()  # A semantic network containing triples
+        # Records the states of the modelled universe at previous time frames
+        self.history = History(snapshot_interval=settings.history_snapshot_interval)
         self.queue = []  # A list of Triple objects to be added to the network next time frame
-        self.time = config.START_TIME  # An integer representing 24-hour time, e.g., 1700 for 5pm
+        self.changed_relations = set()  # The symbols of the relations of triples added or deleted by the last update
+        self.time = settings.start_time  # An integer representing 24-hour time, e.g., 1700 for 5pm
         self.time_since_start = 0  # An integer representing how many minutes have passed since the universe start time
-        self.classes = {}  # Maps class names to nouns in that class
+        self.classes = {}  # Maps the symbols of class names to arrays of the symbols of the nouns in those classes
+        self.triple_ids = itertools.count()  # Allocates the ids of the triples created in this universe
+        # Maps canonical subrules and the bindings of the names they reference to their evaluations in the
+        # current time frame; this is populated by Subrule.holds() and cleared upon each update, or whenever it
+        # holds settings.subrule_cache_size evaluations
+        self.subrule_cache = {}
+        self.subrule_cache_hits = 0
+        self.subrule_cache_misses = 0
+        # Under vectorized evaluation, maps relations (with their duration modifiers) to the sorted keys of the
+        # triples satisfying them; this is populated by vectorized.relation_keys() and cleared upon each update
+        self.relation_keys = {}
+        # Maps relations (with their duration modifiers), positions, and the symbols in the opposite positions to
+        # the sets of nouns filling those positions; this is populated by Universe.fillers() and cleared upon each
+        # update
+        self.relation_fillers = {}
+        self.random_draws = 0  # The number of random draws taken in testing rules against this universe
+        self.match_calls = 0  # The number of triples matched against the network (see Universe.match())
+        self.profile = Profile()  # Counters and timings of the tests of each rule against this universe
+        # Under incremental evaluation, maps rules to the values of their time conditions, the bindings they fired
+        # with, and the times since start of their last tests, if those tests were deterministic; this is
+        # maintained by Rule.test()
+        self.cached_tests = {}
         self._load_initial_conditions()  # Populates self.network with initial triples
-        # Print out initial triples
-        if config.VERBOSITY >= 1:
-            print(yellow(f"\t{self.time}"))
+        # Emit the initial triples
+        events.time_frame = self.time
+        if events.level >= STORY:
+            events.emit('time_frame', time=self.time, initial=True)
             for triple in self.network:
-                print(blue(triple))
+                events.emit('addition', **triple_fields(triple.subject, triple.relation, triple.object))
 
     def __str__(self):
         """Return string representation."""
@@ -31,9 +83,37 @@ class Universe:
         """Return string representation."""
         return self.__str__()
 
+    def fork(self, random_number_generator, events):
+        """Return a copy of this universe, drawing from the given random-number generator and emitting to the given
+        event log, that may be simulated independently of this one.
+
+        The triples in the network and history of the fork are shared with those of this universe, as are the
+        containers indexing them, until either universe modifies them (see TripleStore.fork() and History.fork()).
+        Only the top-level indices are copied, which takes time linear in their number of entries. The caches of
+        the fork start out empty, and it keeps a profile of its own.
+        """
+        forked = copy.copy(self)
+        forked.random = random_number_generator
+        forked.events = events
+        forked.network = self.network.fork()
+        forked.history = self.history.fork()
+        forked.queue = list(self.queue)
+        forked.changed_relations = set(self.changed_relations)
+        # Reading the next triple id consumes it, so the counters of both universes are replaced by ones
+        # starting from it; the classes are never modified, and so they are simply shared
+        next_triple_id = next(self.triple_ids)
+        self.triple_ids = itertools.count(next_triple_id)
+        forked.triple_ids = itertools.count(next_triple_id)
+        forked.subrule_cache = {}
+        forked.relation_keys = {}
+        forked.relation_fillers = {}
+        forked.cached_tests = dict(self.cached_tests)
+        forked.profile = Profile()
+        return forked
+
     def _load_initial_conditions(self):
         """Load the initial conditions of this universe."""
-        lines = open(config.PATH_TO_INITIAL_CONDITIONS_FILE).readlines()
+        lines = open(self.settings.path_to_initial_conditions_file).readlines()
         for line in lines:
             if not line.strip():
                 continue
@@ -45,24 +125,25 @@ class Universe:
                 line = line.replace('\t\t', '\t')
             if line.startswith("CLASS."):
                 class_name, members = line.split('\t')
-                class_name = class_name.split("CLASS.")[1].strip()
+                class_name = SYMBOL_TABLE.encode(class_name.split("CLASS.")[1].strip())
                 if class_name not in self.classes:
-                    self.classes[class_name.strip()] = []
+                    self.classes[class_name] = array.array('q')
                 for member in members.split(','):
                     if member.strip().startswith('CLASS.'):
-                        referenced_class_name = member.strip().split("CLASS.")[1]
+                        referenced_class_name = SYMBOL_TABLE.encode(member.strip().split("CLASS.")[1])
                         self.classes[class_name] += self.classes[referenced_class_name]
                     else:
-                        self.classes[class_name].append(member.strip())
+                        self.classes[class_name].append(SYMBOL_TABLE.encode(member.strip()))
                 continue
             subject, content = line.split('\t')
+            subject = SYMBOL_TABLE.encode(subject.strip())
             relations = content.split(',')
             for relation in relations:
                 relation, *optional_object = relation.split()
-                subject = subject.strip()
-                relation = relation.strip()
-                optional_object = optional_object[0].strip() if optional_object else None
+                relation = SYMBOL_TABLE.encode(relation.strip())
+                optional_object = SYMBOL_TABLE.encode(optional_object[0].strip()) if optional_object else None
                 triple = Triple(
+                    triple_id=next(self.triple_ids),
                     triple_subject=subject,
                     triple_relation=relation,
                     triple_object=optional_object,
@@ -73,26 +154,18 @@ class Universe:
 
     def match(self, triple_subject, triple_relation, triple_object):
         """Return whether the given triple matches against the current universe network."""
-        for triple in self.network:
-            if triple.subject != triple_subject:
-                continue
-            if triple.object != triple_object:
-                continue
-            if triple.relation != triple_relation.name:
-                continue
+        self.match_calls += 1
+        for triple in self.network.find(
+            triple_subject=triple_subject,
+            triple_relation=triple_relation.symbol,
+            triple_object=triple_object
+        ):
             if triple_relation.duration_modifier_operator:
-                if triple_relation.duration_modifier_operator == '=':
-                    if triple_relation.duration_modifier_time_value != self.time_in_network(triple=triple):
-                        continue
-                elif triple_relation.duration_modifier_operator == '>':
-                    if triple_relation.duration_modifier_time_value <= self.time_in_network(triple=triple):
-                        continue
-                elif triple_relation.duration_modifier_operator == '<':
-                    if triple_relation.duration_modifier_time_value >= self.time_in_network(triple=triple):
-                        continue
-                elif triple_relation.duration_modifier_operator == '!=':
-                    if triple_relation.duration_modifier_time_value == self.time_in_network(triple=triple):
-                        continue
+                if not any(
+                    earliest <= triple.time_since_start <= latest
+                    for earliest, latest in self.duration_ranges(relation=triple_relation)
+                ):
+                    continue
             return True if not triple_relation.negate_field else False
         return False if not triple_relation.negate_field else True
 
@@ -101,67 +174,497 @@ class Universe:
         self.queue += triples
 
     def update(self):
-        """Add all the queued triples to the current network."""
-        if config.VERBOSITY >= 1:
-            print(yellow(f"\n\t{self.time}"))
+        """Commit all the queued triples to the current network.
+
+        The queue is first resolved into a single operation per (subject, relation, object) key,
+        since only the last operation queued for a given key determines its fate, and the resolved
+        batch is then applied to the network in one pass.
+        """
+        events = self.events
+        events.time_frame = self.time
+        if events.level >= STORY:
+            events.emit('time_frame', time=self.time, initial=False)
+            self._emit_queued_changes()
+        # Resolve the queue, with later operations superseding earlier ones on the same key; we pop
+        # before reinserting so that keys are ordered by their last occurrence in the queue, which is
+        # the order in which their triples would have been appended had the queue been applied serially.
+        resolved_queue = {}
         for triple_subject, triple_relation, triple_object in self.queue:
-            for existing_triple in list(self.network):
-                if existing_triple.subject != triple_subject:
-                    continue
-                if existing_triple.relation != triple_relation.name:
-                    continue
-                if existing_triple.object != triple_object:
-                    continue
-                if config.VERBOSITY >= 1:
-                    if triple_relation.negate_field:
-                        if not config.OUTPUT_TO_FILE:
-                            print(red(f"{existing_triple}"))
-                        else:
-                            print(red(f"(DELETED) {existing_triple}"))
-                self.network.remove(existing_triple)
-            if not triple_relation.negate_field:
+            key = (triple_subject, triple_relation.symbol, triple_object)
+            resolved_queue.pop(key, None)
+            resolved_queue[key] = triple_relation.negate_field
+        # Commit the resolved batch, noting which relations actually gain or lose a triple; re-adding a triple
+        # that is already present only refreshes its time frame
+        self.changed_relations = set()
+        for (triple_subject, triple_relation, triple_object), delete in resolved_queue.items():
+            removed_triples = self.network.remove(
+                triple_subject=triple_subject,
+                triple_relation=triple_relation,
+                triple_object=triple_object
+            )
+            self.history.note_removals(triples=removed_triples)
+            if delete == bool(removed_triples):
+                self.changed_relations.add(triple_relation)
+            if not delete:
                 # Note that this may just be replacing the one we just removed (to update the time frame added)
                 new_triple = Triple(
+                    triple_id=next(self.triple_ids),
                     triple_subject=triple_subject,
-                    triple_relation=triple_relation.name,
+                    triple_relation=triple_relation,
                     triple_object=triple_object,
                     time_frame=self.time,
                     time_since_start=self.time_since_start
                 )
-                if config.VERBOSITY >= 1:
-                    print(blue(new_triple))
                 self.network.append(new_triple)
-        if config.VERBOSITY >= 1:
-            print()
+                self.history.note_addition(triple=new_triple)
+        if events.level >= STORY:
+            events.emit('commit')
         self.queue = []
+        self.subrule_cache.clear()
+        self.relation_keys.clear()
+        self.relation_fillers.clear()
+
+    def _emit_queued_changes(self):
+        """Emit an event for each change made by the queued triples, in the order in which they were queued."""
+        present = {}  # Maps keys touched by the queue to the number of their triples present at each point
+        for triple_subject, triple_relation, triple_object in self.queue:
+            key = (triple_subject, triple_relation.symbol, triple_object)
+            if key not in present:
+                present[key] = len(self.network.find(*key))
+            if triple_relation.negate_field:
+                for _ in range(present[key]):
+                    self.events.emit('deletion', **triple_fields(*key))
+                present[key] = 0
+            else:
+                self.events.emit('addition', **triple_fields(*key))
+                present[key] = 1
 
     def time_in_network(self, triple):
         """Return the number of minutes since the given triple was last added to the network."""
         return self.time_since_start - triple.time_since_start
 
+    def duration_ranges(self, relation):
+        """Return the ranges of times since start at which a triple must have been added to satisfy the duration
+        modifier of the given relation, as (earliest, latest) pairs of inclusive bounds.
+
+        A triple satisfies 'R=N' if it has been in the network for exactly N minutes, 'R>N' if for fewer than
+        N minutes (i.e., N exceeds its time in the network), 'R<N' if for more than N minutes, and 'R!=N' if
+        for any other number of minutes.
+        """
+        time_added = self.time_since_start - relation.duration_modifier_time_value
+        if relation.duration_modifier_operator == '=':
+            return ((time_added, time_added),)
+        if relation.duration_modifier_operator == '>':
+            return ((time_added + 1, float('inf')),)
+        if relation.duration_modifier_operator == '<':
+            return ((float('-inf'), time_added - 1),)
+        return (float('-inf'), time_added - 1), (time_added + 1, float('inf'))
+
+    def fillers(self, relation, position, other):
+        """Return the set of the symbols in the given position ('subject' or 'object') of the triples in the network
+        that have the name of the given relation and satisfy its duration modifier, and that have the given symbol
+        (or None, for no object) in the opposite position, unless it is given as ANY.
+
+        The relation's negate field is not considered here. The sets are cached in the universe until its next
+        update, and must not be modified.
+        """
+        cache_key = (
+            relation.symbol, relation.duration_modifier_operator, relation.duration_modifier_time_value, position, other
+        )
+        try:
+            return self.relation_fillers[cache_key]
+        except KeyError:
+            pass
+        if position == 'object' and other is not ANY:
+            triples = self.network.find_by_subject_and_relation(triple_subject=other, triple_relation=relation.symbol)
+            if relation.duration_modifier_operator:
+                duration_ranges = self.duration_ranges(relation=relation)
+                triples = [
+                    triple for triple in triples
+                    if any(earliest <= triple.time_since_start <= latest for earliest, latest in duration_ranges)
+                ]
+            nouns = {triple.object for triple in triples}
+        elif position == 'object':
+            nouns = {triple.object for triple in self.find_by_duration(relation=relation)}
+        elif other is ANY:
+            nouns = {triple.subject for triple in self.find_by_duration(relation=relation)}
+        else:
+            nouns = {triple.subject for triple in self.find_by_duration(relation=relation) if triple.object == other}
+        self.relation_fillers[cache_key] = nouns
+        return nouns
+
+    def find_by_duration(self, relation):
+        """Return the triples in the network that have the name of the given relation and satisfy its duration
+        modifier, in the order in which they were added; the relation's negate field is not considered here.
+
+        Rather than checking every triple with the relation's name, this looks up the ranges of times since
+        start at which they must have been added (see duration_ranges()) in the time index of the network.
+        """
+        if not relation.duration_modifier_operator:
+            return self.network.find_by_relation(triple_relation=relation.symbol)
+        triples = []
+        for earliest, latest in self.duration_ranges(relation=relation):
+            triples += self.network.find_by_relation_and_time(
+                triple_relation=relation.symbol,
+                earliest=earliest,
+                latest=latest
+            )
+        return triples
+
+
+class TripleStore:
+    """A hash-indexed store for the triples making up a semantic network.
+
+    Triples are indexed on (subject, relation, object), on (subject, relation), and on relation,
+    so that lookups and deletions do not require a scan of the whole network. The triples with each
+    relation are further bucketed by the time since start at which they were added, with the times
+    of the buckets kept in ascending order, so that the triples added within a range of times may be
+    found by binary search (see TripleStore.find_by_relation_and_time()). Iterating over the
+    store yields its triples in the order in which they were (last) added, just as with the plain
+    list that previously backed the network.
+
+    A store may be forked (see TripleStore.fork()), in which case the fork shares the containers
+    holding the entries of each index (and the triples themselves, which are never modified) with
+    the original, and each store copies an entry's container only upon first modifying it. The
+    top-level indices mapping keys to those containers are copied, however, so forking takes time
+    linear in the number of index entries.
+    """
+
+    def __init__(self, triples=()):
+        """Initialize a TripleStore object."""
+        self._triples = {}  # Maps each triple to None; used as an insertion-ordered set
+        self._by_subject_relation_object = {}  # Maps (subject, relation, object) keys to lists of triples
+        self._by_subject_relation = {}  # Maps (subject, relation) keys to insertion-ordered sets of triples
+        self._by_relation = {}  # Maps relations to insertion-ordered sets of triples
+        # Maps (relation, time since start) keys to insertion-ordered sets of the triples added at those times
+        self._by_relation_and_time = {}
+        self._times_by_relation = {}  # Maps relations to ascending lists of the times of their nonempty buckets
+        # Once this store has been forked, the (index identity, key) pairs of the index entries whose containers
+        # have since come to belong to this store alone, and so may be modified in place; the containers of all
+        # other entries may be shared with forks. Until this store is forked, this is None, and all of its
+        # containers are its own.
+        self._owned_keys = None
+        for triple in triples:
+            self.append(triple)
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Triple Store ({len(self)} triples)"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def __iter__(self):
+        """Iterate over the triples in this store, in the order in which they were added."""
+        return iter(self._triples)
+
+    def __len__(self):
+        """Return the number of triples in this store."""
+        return len(self._triples)
+
+    def __contains__(self, triple):
+        """Return whether the given Triple object is in this store."""
+        return triple in self._triples
+
+    def fork(self):
+        """Return a copy of this store that shares the containers of its index entries until they are modified.
+
+        The top-level indices are copied, which copies references rather than triples or containers, but still
+        takes time linear in the number of index entries: about 0.1 microseconds per triple, or 15 milliseconds
+        for a store of 100,000 triples (see benchmarks.forking), against some 12 milliseconds to simulate a time
+        frame of the murder story. Sharing the indices themselves, as with a chain of overlays on frozen parents,
+        would make forking take constant time, but would add a lookup per overlay to every read of the store,
+        and a simulation reads its network far more often than it forks it.
+        """
+        forked = TripleStore()
+        forked._triples = self._triples.copy()
+        forked._by_subject_relation_object = self._by_subject_relation_object.copy()
+        forked._by_subject_relation = self._by_subject_relation.copy()
+        forked._by_relation = self._by_relation.copy()
+        forked._by_relation_and_time = self._by_relation_and_time.copy()
+        forked._times_by_relation = self._times_by_relation.copy()
+        # The containers are now shared, so neither store may modify them in place
+        self._owned_keys = set()
+        forked._owned_keys = set()
+        return forked
+
+    def _owned_entry(self, index, key, empty):
+        """Return the container of the given index entry, copying it first if it may be shared with a fork.
+
+        If the index has no such entry, one holding the given empty container is added.
+        """
+        # The keys of different indices may coincide (e.g., (subject, relation) and (relation, time) keys), so
+        # ownership is recorded per index; the indices of a store are never replaced, so their identities are stable
+        if self._owned_keys is None or (id(index), key) in self._owned_keys:
+            return index.setdefault(key, empty)
+        container = index.get(key, empty).copy()
+        index[key] = container
+        self._owned_keys.add((id(index), key))
+        return container
+
+    def append(self, triple):
+        """Add the given triple to this store."""
+        self._triples[triple] = None
+        key = (triple.subject, triple.relation, triple.object)
+        self._owned_entry(index=self._by_subject_relation_object, key=key, empty=[]).append(triple)
+        key = (triple.subject, triple.relation)
+        self._owned_entry(index=self._by_subject_relation, key=key, empty={})[triple] = None
+        self._owned_entry(index=self._by_relation, key=triple.relation, empty={})[triple] = None
+        key = (triple.relation, triple.time_since_start)
+        bucket = self._owned_entry(index=self._by_relation_and_time, key=key, empty={})
+        if not bucket:
+            # Triples are generally added in order of time, so the new bucket's time usually goes at the end
+            times = self._owned_entry(index=self._times_by_relation, key=triple.relation, empty=[])
+            bisect.insort(times, triple.time_since_start)
+        bucket[triple] = None
+
+    def find(self, triple_subject, triple_relation, triple_object):
+        """Return the triples with the given subject, relation, and object, in the order they were added."""
+        return self._by_subject_relation_object.get((triple_subject, triple_relation, triple_object), ())
+
+    def find_by_subject_and_relation(self, triple_subject, triple_relation):
+        """Return the triples with the given subject and relation, in the order they were added."""
+        return list(self._by_subject_relation.get((triple_subject, triple_relation), ()))
+
+    def find_by_relation(self, triple_relation):
+        """Return the triples with the given relation, in the order they were added."""
+        return list(self._by_relation.get(triple_relation, ()))
+
+    def find_by_relation_and_time(self, triple_relation, earliest, latest):
+        """Return the triples with the given relation that were added at a time since start within the given
+        inclusive bounds, in order of the times at which they were added.
+        """
+        times = self._times_by_relation.get(triple_relation, ())
+        triples = []
+        for time_since_start in times[bisect.bisect_left(times, earliest):bisect.bisect_right(times, latest)]:
+            triples += self._by_relation_and_time[(triple_relation, time_since_start)]
+        return triples
+
+    def remove(self, triple_subject, triple_relation, triple_object):
+        """Remove and return all triples with the given subject, relation, and object."""
+        removed_triples = self._by_subject_relation_object.pop((triple_subject, triple_relation, triple_object), [])
+        for triple in removed_triples:
+            del self._triples[triple]
+            subject_relation_key = (triple.subject, triple.relation)
+            triples_with_subject_and_relation = self._owned_entry(
+                index=self._by_subject_relation, key=subject_relation_key, empty={}
+            )
+            del triples_with_subject_and_relation[triple]
+            if not triples_with_subject_and_relation:
+                del self._by_subject_relation[subject_relation_key]
+            triples_with_relation = self._owned_entry(index=self._by_relation, key=triple.relation, empty={})
+            del triples_with_relation[triple]
+            if not triples_with_relation:
+                del self._by_relation[triple.relation]
+            relation_time_key = (triple.relation, triple.time_since_start)
+            bucket = self._owned_entry(index=self._by_relation_and_time, key=relation_time_key, empty={})
+            del bucket[triple]
+            if not bucket:
+                del self._by_relation_and_time[relation_time_key]
+                times = self._owned_entry(index=self._times_by_relation, key=triple.relation, empty=[])
+                del times[bisect.bisect_left(times, triple.time_since_start)]
+                if not times:
+                    del self._times_by_relation[triple.relation]
+        return removed_triples
+
+
+class History:
+    """A record of the states of a semantic network at previous time frames.
+
+    Rather than a full copy of the network per time frame, the history stores, for each time frame, the
+    triples added to and deleted from the network since the preceding one, along with a full snapshot every
+    snapshot_interval time frames. The state at any time frame is reconstructed on demand by replaying the
+    deltas that follow the nearest snapshot. The records are keyed by the time since the start of each time
+    frame, since the clock stops at midnight (see MESSY._advance_time()), after which plot times recur.
+
+    Indexing a History object with a plot time returns the state at the latest time frame recorded at that
+    plot time, as a list of triples in the order in which they were (last) added to the network, and iterating
+    over it yields the plot times recorded, once each, as a dictionary mapping plot times to states would.
+    """
+
+    def __init__(self, snapshot_interval):
+        """Initialize a History object."""
+        self.snapshot_interval = snapshot_interval  # The number of time frames between full snapshots
+        self.time_frames = []  # The times since the start of the recorded time frames, in increasing order
+        self.plot_times = {}  # Maps the times since the start of recorded time frames to their plot times
+        self.latest_time_frames = {}  # Maps recorded plot times to the time since the start of the latest at each
+        self.additions = {}  # Maps recorded time frames to lists of the triples added since the preceding one
+        self.deletions = {}  # Maps recorded time frames to lists of the triples deleted since the preceding one
+        self.snapshots = {}  # Maps some recorded time frames to the full lists of triples present at them
+        self._pending_additions = []  # Triples added to the network since the last recorded time frame
+        self._pending_deletions = []  # Triples deleted from the network since the last recorded time frame
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A History ({len(self.time_frames)} time frames)"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def __len__(self):
+        """Return the number of recorded plot times."""
+        return len(self.latest_time_frames)
+
+    def __iter__(self):
+        """Iterate over the recorded plot times, in the order in which they were first recorded."""
+        return iter(self.latest_time_frames)
+
+    def __contains__(self, time_frame):
+        """Return whether the given plot time has been recorded."""
+        return time_frame in self.latest_time_frames
+
+    def __getitem__(self, time_frame):
+        """Return the triples that made up the network at the latest time frame recorded at the given plot time."""
+        return self.state_at(time_since_start=self.latest_time_frames[time_frame])
+
+    def keys(self):
+        """Return the recorded plot times, in the order in which they were first recorded."""
+        return list(self.latest_time_frames)
+
+    def fork(self):
+        """Return a copy of this history that shares the records of the time frames recorded so far.
+
+        The record of a time frame is never modified once it is made, so only the indices of the records are
+        copied, and not the lists of triples making them up. This takes time linear in the number of time frames
+        recorded, though not in the number of triples they hold (see benchmarks.forking).
+        """
+        forked = History(snapshot_interval=self.snapshot_interval)
+        forked.time_frames = list(self.time_frames)
+        forked.plot_times = self.plot_times.copy()
+        forked.latest_time_frames = self.latest_time_frames.copy()
+        forked.additions = self.additions.copy()
+        forked.deletions = self.deletions.copy()
+        forked.snapshots = self.snapshots.copy()
+        forked._pending_additions = list(self._pending_additions)
+        forked._pending_deletions = list(self._pending_deletions)
+        return forked
+
+    @property
+    def has_pending_changes(self):
+        """Return whether changes to the network have been noted since the last recorded time frame."""
+        return bool(self._pending_additions or self._pending_deletions)
+
+    def note_addition(self, triple):
+        """Note that the given triple has been added to the network since the last recorded time frame."""
+        self._pending_additions.append(triple)
+
+    def note_removals(self, triples):
+        """Note that the given triples have been removed from the network since the last recorded time frame."""
+        self._pending_deletions += triples
+
+    def record(self, time_frame, time_since_start, network):
+        """Record the state of the given network at the given time frame, as a delta on the preceding state."""
+        if not self.time_frames or len(self.time_frames) % self.snapshot_interval == 0:
+            self.snapshots[time_since_start] = list(network)
+        if not self.time_frames:
+            # The initial triples are not noted as additions, so the first state is recorded in full
+            self._pending_additions = list(network)
+            self._pending_deletions = []
+        self.time_frames.append(time_since_start)
+        self.plot_times[time_since_start] = time_frame
+        self.latest_time_frames[time_frame] = time_since_start
+        self.additions[time_since_start] = self._pending_additions
+        self.deletions[time_since_start] = self._pending_deletions
+        self._pending_additions = []
+        self._pending_deletions = []
+
+    def discard_before(self, time_since_start, keep_states=True):
+        """Discard the records of all time frames recorded before the given one, to bound the memory held.
+
+        If keep_states is set, a snapshot of the state at the given time frame is taken first, if there is none,
+        so that the states at it and at every later time frame can still be reconstructed. Otherwise, which
+        saves copying the network, only the triples added and deleted at each remaining time frame are kept.
+        """
+        index = self._index(time_since_start=time_since_start)
+        if not index:
+            return
+        if keep_states and time_since_start not in self.snapshots:
+            self.snapshots[time_since_start] = self.state_at(time_since_start=time_since_start)
+        for discarded_time_frame in self.time_frames[:index]:
+            del self.additions[discarded_time_frame]
+            del self.deletions[discarded_time_frame]
+            self.snapshots.pop(discarded_time_frame, None)
+            plot_time = self.plot_times.pop(discarded_time_frame)
+            if self.latest_time_frames[plot_time] == discarded_time_frame:
+                del self.latest_time_frames[plot_time]
+        del self.time_frames[:index]
+
+    def state_at(self, time_since_start):
+        """Reconstruct the triples that made up the network at the given time frame."""
+        index = self._index(time_since_start=time_since_start)
+        snapshot_index = index
+        while self.time_frames[snapshot_index] not in self.snapshots:
+            if not snapshot_index:
+                raise Exception(f"The records needed to reconstruct time frame {time_since_start} were discarded")
+            snapshot_index -= 1
+        state = dict.fromkeys(self.snapshots[self.time_frames[snapshot_index]])  # Used as an insertion-ordered set
+        for intermediate_time_frame in self.time_frames[snapshot_index+1:index+1]:
+            for triple in self.deletions[intermediate_time_frame]:
+                del state[triple]
+            for triple in self.additions[intermediate_time_frame]:
+                state[triple] = None
+        return list(state)
+
+    def added_between(self, earlier_time_since_start, time_since_start):
+        """Return the triples present at the given time frame but not at the given earlier one (if any).
+
+        If the earlier time frame is the one recorded just before the given one, this is simply the triples
+        recorded as added at the given time frame.
+        """
+        if earlier_time_since_start is None:
+            return self.state_at(time_since_start=time_since_start)
+        index = self._index(time_since_start=time_since_start)
+        if index and self.time_frames[index-1] == earlier_time_since_start:
+            return self.additions[time_since_start]
+        earlier_state = set(self.state_at(time_since_start=earlier_time_since_start))
+        return [triple for triple in self.state_at(time_since_start=time_since_start) if triple not in earlier_state]
+
+    def _index(self, time_since_start):
+        """Return the position of the given recorded time frame among those recorded."""
+        index = bisect.bisect_left(self.time_frames, time_since_start)
+        if index == len(self.time_frames) or self.time_frames[index] != time_since_start:
+            raise KeyError(time_since_start)
+        return index
+
 
 class Triple:
-    """A triple in a semantic network."""
+    """A triple in a semantic network, whose subject, relation, and object are symbols (see SymbolTable).
+
+    A simulation creates many triples, and its history keeps every one of them, so triples have no
+    per-instance __dict__.
+    """
 
-    current_id = 0
+    __slots__ = ('id', 'subject', 'relation', 'object', 'time_frame', 'time_since_start')
 
-    def __init__(self, triple_subject, triple_relation, triple_object, time_frame, time_since_start):
+    def __init__(self, triple_id, triple_subject, triple_relation, triple_object, time_frame, time_since_start):
         """Initialize a Triple object."""
-        self.id = Triple.current_id
-        Triple.current_id += 1
+        self.id = triple_id  # Allocated by the universe, in the order in which its triples are created
         self.subject = triple_subject
         self.relation = triple_relation
-        self.object = triple_object
+        self.object = triple_object  # None if this is an attribute
         self.time_frame = time_frame  # The plot time at which this triple was (last) added to the network
         self.time_since_start = time_since_start
-        self.initial = self.time_frame == config.START_TIME
+
+    @property
+    def initial(self):
+        """Return whether this triple is one of the initial conditions of its universe."""
+        return self.time_since_start == 0
 
     def __str__(self):
         """Return string representation."""
-        if self.object:
-            return f"{self.subject} {self.relation} {self.object}"
-        return f"{self.subject} {self.relation}"
+        return self.describe(triple_subject=self.subject, triple_relation=self.relation, triple_object=self.object)
 
     def __repr__(self):
         """Return string representation."""
         return self.__str__()
+
+    @staticmethod
+    def describe(triple_subject, triple_relation, triple_object):
+        """Return a string representation of a triple with the given components (symbols)."""
+        triple_subject = SYMBOL_TABLE.decode(triple_subject)
+        triple_relation = SYMBOL_TABLE.decode(triple_relation)
+        if triple_object is not None:
+            return f"{triple_subject} {triple_relation} {SYMBOL_TABLE.decode(triple_object)}"
+        return f"{triple_subject} {triple_relation}"
@@ -1,29 +1,62 @@
-import config
+import gc
+import threading
+import contextlib
 
 
-def red(string):
-    """Return the given string, bookended with control codes for printing in red."""
-    if not config.OUTPUT_TO_FILE:
+# The number of contexts, across all threads, in which the cyclic garbage collector is currently paused, along
+# with whether it was enabled when the first of them was entered (see paused_garbage_collection())
+_garbage_collection_pauses = 0
+_garbage_collection_was_enabled = False
+_garbage_collection_pause_lock = threading.Lock()
+
+
+def red(string, colorize=True):
+    """Return the given string, bookended with control codes for printing in red, if colorize is True."""
+    if colorize:
         return f"\033[91m{string}\x1b[0m"
     return string
 
 
-def green(string):
-    """Return the given string, bookended with control codes for printing in green."""
-    if not config.OUTPUT_TO_FILE:
+def green(string, colorize=True):
+    """Return the given string, bookended with control codes for printing in green, if colorize is True."""
+    if colorize:
         return f"\033[92m{string}\x1b[0m"
     return string
 
 
-def blue(string):
-    """Return the given string, bookended with control codes for printing in blue."""
-    if not config.OUTPUT_TO_FILE:
+def blue(string, colorize=True):
+    """Return the given string, bookended with control codes for printing in blue, if colorize is True."""
+    if colorize:
         return f"\033[94m{string}\x1b[0m"
     return string
 
 
-def yellow(string):
-    """Return the given string, bookended with control codes for printing in yellow."""
-    if not config.OUTPUT_TO_FILE:
+def yellow(string, colorize=True):
+    """Return the given string, bookended with control codes for printing in yellow, if colorize is True."""
+    if colorize:
         return f"\033[93m{string}\x1b[0m"
     return string
+
+
+@contextlib.contextmanager
+def paused_garbage_collection():
+    """Pause the cyclic garbage collector for the duration of the context.
+
+    This is meant for building a great many long-lived objects at once (e.g., parsing a rules file), which would
+    otherwise trigger full collections over and over, to no avail, since none of the objects are garbage. The
+    collector is process-wide, so the contexts entered in all threads are counted, and the collector is only
+    re-enabled (if it was enabled to begin with) once the last of them is exited.
+    """
+    global _garbage_collection_pauses, _garbage_collection_was_enabled
+    with _garbage_collection_pause_lock:
+        if not _garbage_collection_pauses:
+            _garbage_collection_was_enabled = gc.isenabled()
+            gc.disable()
+        _garbage_collection_pauses += 1
+    try:
+        yield
+    finally:
+        with _garbage_collection_pause_lock:
+            _garbage_collection_pauses -= 1
+            if not _garbage_collection_pauses and _garbage_collection_was_enabled:
+                gc.enable()
@@ -0,0 +1,216 @@
+import numpy
+from compiler import Compiler
+from rules import TimeSentence, Variable
+
+# The outcomes of a rule under a binding, as recorded in the outcome grid of VectorizedRule.firings()
+UNDECIDED, ABANDON, TRIGGER = -1, 0, 1
+
+
+class VectorizedRule:
+    """A rule compiled for evaluation under all of its candidate bindings at once, using NumPy array operations.
+
+    The candidate bindings of a rule make up a grid, with an axis for each of its header references, and each
+    subrule is evaluated across the whole grid, with an additional axis for each variable local to it, which is
+    then reduced, since a subrule holds if some binding of its local variables satisfies its sentence list. A
+    relation is represented by the sorted keys of its triples (see relation_keys()), so that a sentence is
+    evaluated by a single membership test of the keys of the grid. The outcomes of the rule are then resolved
+    for all bindings at once by masking, with the first short-circuit in file order prevailing, just as in the
+    native callable emitted by Compiler._compile_rule(). Bindings under which no subrule short-circuits take a
+    random draw, from the universe's random-number generator and in the order in which Rule._join() would have
+    generated them, so that the stories generated are the same as under scalar evaluation.
+    """
+
+    def __init__(self, rule):
+        """Initialize a VectorizedRule object."""
+        self.rule = rule
+        self.header_names = list(rule.header_references)
+        # For each subrule, in file order: the subrule itself, the names of the variables local to it, and a
+        # callable evaluating its sentence list across a grid
+        self.subrules = []
+        for subrule in rule.subrules:
+            local_names = [name for name in subrule.domains if name not in rule.header_references]
+            condition = self._compile_sentence_list(sentence_list=subrule.sentence_list)
+            self.subrules.append((subrule, local_names, condition))
+        # Maps the indices of the subrules that may short-circuit to the outcomes of their true and false values,
+        # as compiled into the rule's short-circuit plan by Compiler._compile_rule()
+        self.short_circuits = {i: (true_value_short_circuit, false_value_short_circuit)
+                               for i, _, true_value_short_circuit, false_value_short_circuit in rule.short_circuit_plan}
+
+    def __str__(self):
+        """Return string representation."""
+        return f"A Vectorized Rule ({self.rule.action_list[0]})"
+
+    def __repr__(self):
+        """Return string representation."""
+        return self.__str__()
+
+    def firings(self, universe, binding_candidates, rule_profile):
+        """Generate the bindings under which the rule fires, given the candidate bindings for its header references.
+
+        Random draws are taken lazily, as the bindings are generated, so that a consumer that stops early (e.g.,
+        upon reaching a Y-restriction) consumes no more random numbers than scalar evaluation would. The bindings
+        enumerated, and the evaluations, matches, and short-circuits of each subrule, are counted in the given
+        rule profile, with every binding of the header references counted as enumerated.
+        """
+        candidates = [numpy.asarray(candidate_list, dtype=numpy.int64) for candidate_list in binding_candidates]
+        shape = tuple(len(candidate_array) for candidate_array in candidates)
+        if 0 in shape:
+            return
+        number_of_axes = len(shape)
+        axes = [
+            candidate_array.reshape(tuple(len(candidate_array) if axis == i else 1 for axis in range(number_of_axes)))
+            for i, candidate_array in enumerate(candidates)
+        ]
+        # Bindings in which two references are bound to the same noun are excluded (see Rule._join())
+        valid = numpy.ones(shape, dtype=bool)
+        for i in range(number_of_axes):
+            for j in range(i + 1, number_of_axes):
+                valid &= axes[i] != axes[j]
+        number_of_bindings = int(numpy.count_nonzero(valid))
+        rule_profile.bindings += number_of_bindings
+        outcomes = numpy.full(shape, UNDECIDED, dtype=numpy.int8)
+        probabilities = numpy.zeros(shape)
+        for i, (subrule, local_names, condition) in enumerate(self.subrules):
+            subrule_profile = rule_profile.subrules[i]
+            match_calls_before_evaluation = universe.match_calls
+            evaluations = self._evaluate_subrule(
+                universe=universe,
+                header_axes=axes,
+                subrule=subrule,
+                local_names=local_names,
+                condition=condition
+            )
+            subrule_profile.evaluations += number_of_bindings
+            subrule_profile.match_calls += universe.match_calls - match_calls_before_evaluation
+            true_value_short_circuit, false_value_short_circuit = self.short_circuits.get(i, (None, None))
+            if true_value_short_circuit is not None:
+                decided = (outcomes == UNDECIDED) & evaluations
+                outcomes[decided] = TRIGGER if true_value_short_circuit else ABANDON
+                subrule_profile.short_circuits += int(numpy.count_nonzero(decided & valid))
+            if false_value_short_circuit is not None:
+                decided = (outcomes == UNDECIDED) & ~evaluations
+                outcomes[decided] = TRIGGER if false_value_short_circuit else ABANDON
+                subrule_profile.short_circuits += int(numpy.count_nonzero(decided & valid))
+            # The increments are summed in file order, so that the probabilities match those of scalar evaluation
+            probabilities += numpy.where(evaluations, subrule.true_value, subrule.false_value)
+        indices = numpy.flatnonzero(valid & (outcomes != ABANDON))
+        positions = numpy.unravel_index(indices, shape)
+        flat_outcomes = outcomes.ravel()[indices].tolist()
+        flat_probabilities = probabilities.ravel()[indices].tolist()
+        candidate_lists = [candidate_array.tolist() for candidate_array in candidates]
+        position_lists = [axis_positions.tolist() for axis_positions in positions]
+        for k, outcome in enumerate(flat_outcomes):
+            if outcome == UNDECIDED:
+                universe.random_draws += 1
+                if not universe.random.random() < flat_probabilities[k]:
+                    continue
+            yield {
+                name: candidate_lists[axis][position_lists[axis][k]]
+                for axis, name in enumerate(self.header_names)
+            }
+
+    def _evaluate_subrule(self, universe, header_axes, subrule, local_names, condition):
+        """Return a grid of the evaluations of the given subrule under each binding of the header references."""
+        shape = tuple(len(axis.ravel()) for axis in header_axes)
+        number_of_local_axes = len(local_names)
+        full_shape = list(shape)
+        arrays = {}
+        for name, axis in zip(self.header_names, header_axes):
+            arrays[name] = axis.reshape(axis.shape + (1,) * number_of_local_axes)
+        for i, name in enumerate(local_names):
+            class_symbol, noun_symbol = subrule.domains[name]
+            if noun_symbol is None:
+                local_candidates = numpy.asarray(universe.classes[class_symbol], dtype=numpy.int64)
+            else:
+                local_candidates = numpy.array([noun_symbol], dtype=numpy.int64)
+            axis_shape = [1] * (len(shape) + number_of_local_axes)
+            axis_shape[len(shape) + i] = len(local_candidates)
+            arrays[name] = local_candidates.reshape(axis_shape)
+            full_shape.append(len(local_candidates))
+        evaluations = numpy.broadcast_to(condition(universe, arrays), full_shape)
+        if number_of_local_axes:
+            # The subrule holds under a binding of the header references if some binding of its locals satisfies it
+            evaluations = evaluations.any(axis=tuple(range(len(shape), len(full_shape))))
+        return evaluations
+
+    @classmethod
+    def _compile_sentence_list(cls, sentence_list):
+        """Return a callable evaluating the given sentence list across a grid, '&' binding more tightly than '/'."""
+        disjuncts = [[]]
+        for component in sentence_list:
+            if isinstance(component, str):
+                if component == '/':
+                    disjuncts.append([])
+                continue
+            if isinstance(component, list):
+                disjuncts[-1].append(cls._compile_sentence_list(sentence_list=component))
+            elif isinstance(component, TimeSentence):
+                disjuncts[-1].append(cls._compile_time_sentence(time_sentence=component))
+            else:
+                disjuncts[-1].append(cls._compile_sentence(sentence=component))
+        disjuncts = tuple(tuple(terms) for terms in disjuncts)
+
+        def evaluate_sentence_list(universe, arrays):
+            """Return a grid (or a single Boolean) of the evaluations of the sentence list."""
+            evaluations = False
+            for terms in disjuncts:
+                conjunction = True
+                for term in terms:
+                    conjunction = numpy.logical_and(conjunction, term(universe, arrays))
+                evaluations = numpy.logical_or(evaluations, conjunction)
+            return evaluations
+
+        return evaluate_sentence_list
+
+    @staticmethod
+    def _compile_time_sentence(time_sentence):
+        """Return a callable evaluating the given time sentence, which holds (or not) across an entire grid."""
+        condition = Compiler._compile_time_sentence(time_sentence=time_sentence)
+
+        def evaluate_time_sentence(universe, arrays):
+            """Return whether the time sentence holds, given the current time frame of the universe."""
+            return condition(universe, None)
+
+        return evaluate_time_sentence
+
+    @staticmethod
+    def _compile_sentence(sentence):
+        """Return a callable evaluating the given sentence across a grid."""
+        subject_key = sentence.subject.name if isinstance(sentence.subject, Variable) else sentence.subject
+        object_key = sentence.object.name if isinstance(sentence.object, Variable) else sentence.object
+        relation = sentence.relation
+        has_object = sentence.object is not None
+
+        def evaluate_sentence(universe, arrays):
+            """Return a grid of the evaluations of the sentence, given the current state of the universe."""
+            keys = arrays[subject_key] << 32
+            if has_object:
+                keys = keys | (arrays[object_key] + 1)
+            universe.match_calls += keys.size
+            held = numpy.isin(keys, relation_keys(universe=universe, relation=relation))
+            return ~held if relation.negate_field else held
+
+        return evaluate_sentence
+
+
+def relation_keys(universe, relation):
+    """Return the keys of the triples in the network of the given universe that satisfy the given relation.
+
+    The key of a triple packs the symbols of its subject and object (or 0, if it has none) into a single integer,
+    and a triple satisfies a relation if it has its name and satisfies its duration modifier, if any; note that
+    the relation's negate field is not considered here. The keys are cached in the universe until its next update.
+    """
+    cache_key = (relation.symbol, relation.duration_modifier_operator, relation.duration_modifier_time_value)
+    try:
+        return universe.relation_keys[cache_key]
+    except KeyError:
+        pass
+    triples = universe.find_by_duration(relation=relation)
+    keys = numpy.fromiter(
+        ((triple.subject << 32) | (triple.object + 1 if triple.object is not None else 0) for triple in triples),
+        dtype=numpy.int64,
+        count=len(triples)
+    )
+    keys.sort()
+    universe.relation_keys[cache_key] = keys
+    return keys